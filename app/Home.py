@@ -1,5 +1,4 @@
 import streamlit as st
-from PIL import Image
 import os
 
 # Page configuration
@@ -13,10 +12,13 @@ st.set_page_config(
 st.title("📊 GitHub Activity Dashboard")
 st.markdown("Welcome to the interactive GitHub Activity Dashboard built with **Streamlit**.")
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
-image_path = os.path.normpath(os.path.join(script_dir, "../assets/background-image.webp"))
-logo = Image.open(image_path)
-st.image(logo)
+# The image is served as a static file (see .streamlit/config.toml), so the browser gets
+# the stored WebP bytes; without static serving it is sent through st.image from its path
+if st.get_option("server.enableStaticServing"):
+    st.markdown("![GitHub Activity Dashboard](app/static/background-image.webp)")
+else:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    st.image(os.path.join(script_dir, "static", "background-image.webp"))
 
 # Project overview
 st.markdown("""
@@ -0,0 +1,163 @@
+"""
+Streaming aggregation of commit history.
+
+Commit pages are consumed as they arrive from the paginator: only the commit
+timestamps are taken from each page, and they are parsed in batches with numpy
+instead of one ``pd.to_datetime`` call per commit. The aggregator then keeps nothing
+but compact counters (commits per day, per weekday and hour, and per repository), so
+the history of an organization with millions of commits is never held in memory at
+once. Monthly counts are derived from the day counts.
+
+Timestamps are counted in the local time they were written with (the first 19
+characters of the ISO date), as the dashboards always did by slicing the date string.
+"""
+import threading
+from collections import Counter
+
+import numpy as np
+
+# Timestamps buffered before they are parsed together
+BATCH_SIZE = 10_000
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+class CommitAggregator:
+    """
+    Commits per day, per month, per weekday×hour and per repository.
+
+    The ``add_*`` methods may be called from several threads.
+
+    Args:
+        date_field (str): Date of a REST commit item that is counted, 'author' or 'committer'.
+    """
+
+    def __init__(self, date_field='author'):
+        self.date_field = date_field
+        self._lock = threading.Lock()
+        self._pending = []
+        # Days since 1970-01-01 -> commits
+        self._days = Counter()
+        # Row: weekday (Monday first), column: hour of the day
+        self._weekday_hours = np.zeros((7, 24), dtype=np.int64)
+        self._repos = Counter()
+
+    def add_pages(self, pages, repo=None):
+        """
+        Counts every commit of an iterable of REST commit pages.
+
+        Args:
+            pages (iterable): Lists of commit items, e.g. from ``github_client.iter_pages``.
+            repo (str, optional): Repository the commits are counted for.
+        """
+        if repo is not None:
+            # Repositories without commits are still listed by repo_counts
+            with self._lock:
+                self._repos[repo] += 0
+        for page in pages:
+            self.add_page(page, repo=repo)
+
+    def add_page(self, page, repo=None):
+        """Counts the commits of one REST commit page."""
+        field = self.date_field
+        self.add_dates([item['commit'][field]['date'] for item in page if item.get('commit')], repo=repo)
+
+    def add_dates(self, dates, repo=None):
+        """Counts commits given by their ISO 8601 timestamps."""
+        with self._lock:
+            self._pending.extend(date[:19] for date in dates)
+            if repo is not None:
+                self._repos[repo] += len(dates)
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+
+    def add_day_counts(self, day_counts, repo=None):
+        """
+        Adds already counted ``(day, commits)`` pairs, as the commit store returns them.
+
+        These carry no time of day, so they are not part of ``weekday_hours``.
+        """
+        day_counts = list(day_counts)
+        if not day_counts:
+            if repo is not None:
+                with self._lock:
+                    self._repos[repo] += 0
+            return
+        days, counts = zip(*day_counts)
+        ordinals = np.array(days, dtype='datetime64[D]').astype(np.int64)
+        with self._lock:
+            for day, count in zip(ordinals.tolist(), counts):
+                self._days[day] += count
+            if repo is not None:
+                self._repos[repo] += sum(counts)
+
+    def update(self, other):
+        """Adds the counts of another aggregator."""
+        with other._lock:
+            other._flush()
+            days, weekday_hours, repos = Counter(other._days), other._weekday_hours.copy(), Counter(other._repos)
+        with self._lock:
+            self._days.update(days)
+            self._weekday_hours += weekday_hours
+            self._repos.update(repos)
+
+    def _flush(self):
+        # Called with the lock held
+        if not self._pending:
+            return
+        timestamps = np.array(self._pending, dtype='datetime64[s]')
+        self._pending = []
+
+        days = timestamps.astype('datetime64[D]')
+        ordinals = days.astype(np.int64)
+        first = ordinals.min()
+        for offset, count in enumerate(np.bincount(ordinals - first).tolist()):
+            if count:
+                self._days[int(first) + offset] += count
+
+        # 1970-01-01 was a Thursday
+        weekdays = (ordinals + 3) % 7
+        hours = (timestamps - days).astype('timedelta64[h]').astype(np.int64)
+        self._weekday_hours += np.bincount(weekdays * 24 + hours, minlength=7 * 24).reshape(7, 24)
+
+    @property
+    def total(self):
+        """Number of commits counted."""
+        with self._lock:
+            self._flush()
+            return sum(self._days.values())
+
+    def day_counts(self):
+        """Returns the ``(day, commits)`` pairs, oldest first, with days as 'YYYY-MM-DD'."""
+        with self._lock:
+            self._flush()
+            items = sorted(self._days.items())
+        if not items:
+            return []
+        ordinals, counts = zip(*items)
+        days = np.array(ordinals, dtype='datetime64[D]').astype(str).tolist()
+        return list(zip(days, counts))
+
+    def month_counts(self):
+        """Returns the commits per month ('YYYY-MM'), oldest first."""
+        with self._lock:
+            self._flush()
+            items = list(self._days.items())
+        if not items:
+            return {}
+        ordinals, counts = zip(*items)
+        months = np.array(ordinals, dtype='datetime64[D]').astype('datetime64[M]')
+        unique, inverse = np.unique(months, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts).astype(np.int64)
+        return dict(zip(unique.astype(str).tolist(), totals.tolist()))
+
+    def repo_counts(self):
+        """Returns the commits per repository, for the commits added with a ``repo``."""
+        with self._lock:
+            return dict(self._repos)
+
+    def weekday_hours(self):
+        """Returns a copy of the 7×24 array of commits per weekday (Monday first) and hour."""
+        with self._lock:
+            self._flush()
+            return self._weekday_hours.copy()
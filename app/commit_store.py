@@ -0,0 +1,252 @@
+"""
+Local store of per-repository commit history.
+
+Commit history only grows, so instead of downloading it again on every refresh the
+store keeps daily commit counts per repository together with a watermark: the newest
+committer date up to which the stored history is complete. A sync asks GitHub only for
+commits ``since`` that watermark and merges them into the stored counts, so repeat
+views of a large repository cost one small request. Commits sharing the watermark
+timestamp are remembered by SHA because ``since`` is inclusive.
+
+Commits arrive newest first and are merged page by page. Until a sync reaches the
+watermark, the store also keeps a cursor (the oldest committer date merged so far), so
+a sync cut short by ``max_items`` or a failed request is resumed with
+``since=<watermark>&until=<cursor>`` instead of starting over, and the watermark only
+moves once the history below it is complete. Every page is merged in one
+``BEGIN IMMEDIATE`` transaction that first checks the sync state is still the one the
+sync started from: when another process moved it, the page is dropped and the sync
+starts again from the new state. Syncs of the same repository within a process run
+one at a time.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional
+
+# Times a sync starts again after another process changed the stored history under it
+SYNC_ATTEMPTS = 3
+
+
+class SyncConflict(Exception):
+    """Raised when the sync state of a repository changed since a sync read it."""
+
+
+class SyncState(NamedTuple):
+    """
+    Sync state of a repository.
+
+    ``watermark`` is the newest committer date of the complete history and
+    ``boundary_shas`` the SHAs committed at exactly that date. While a sync is in
+    progress, ``pending`` is the newest committer date it has merged, where the
+    watermark moves once it completes, and ``cursor`` the oldest one, with the SHAs
+    committed at each.
+    """
+    watermark: Optional[str] = None
+    boundary_shas: frozenset = frozenset()
+    pending: Optional[str] = None
+    pending_shas: frozenset = frozenset()
+    cursor: Optional[str] = None
+    cursor_shas: frozenset = frozenset()
+
+
+class CommitStore:
+    """
+    SQLite-backed daily commit counts and sync watermarks.
+
+    Args:
+        path (str): Path of the SQLite database file (created if missing).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._repo_locks = defaultdict(threading.Lock)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS commit_days ("
+            " repo TEXT NOT NULL, day TEXT NOT NULL, commits INTEGER NOT NULL, PRIMARY KEY (repo, day))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS commit_sync ("
+            " repo TEXT PRIMARY KEY, watermark TEXT, boundary_shas TEXT NOT NULL, synced_at REAL NOT NULL)"
+        )
+        # Columns of the sync in progress, added to stores created before syncs were resumable
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(commit_sync)")}
+        for column in ('pending', 'pending_shas', 'cursor', 'cursor_shas'):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE commit_sync ADD COLUMN {column} TEXT")
+        self._conn.commit()
+
+    def _read_state(self, repo):
+        row = self._conn.execute(
+            "SELECT watermark, boundary_shas, pending, pending_shas, cursor, cursor_shas FROM commit_sync"
+            " WHERE repo = ?", (repo,)
+        ).fetchone()
+        if row is None:
+            return SyncState()
+        watermark, boundary_shas, pending, pending_shas, cursor, cursor_shas = row
+        return SyncState(
+            watermark, frozenset(json.loads(boundary_shas)),
+            pending, frozenset(json.loads(pending_shas or '[]')),
+            cursor, frozenset(json.loads(cursor_shas or '[]')),
+        )
+
+    def state(self, repo):
+        """Returns the SyncState of ``repo`` (an empty one if it was never synced)."""
+        with self._lock:
+            return self._read_state(repo)
+
+    def _write(self, repo, expected, state, day_counts):
+        """
+        Adds ``day_counts`` to the stored counts of ``repo`` and stores its new sync state.
+
+        Raises:
+            SyncConflict: If the stored state is no longer ``expected``; nothing is written.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._read_state(repo) != expected:
+                    raise SyncConflict(repo)
+                self._conn.executemany(
+                    "INSERT INTO commit_days (repo, day, commits) VALUES (?, ?, ?)"
+                    " ON CONFLICT (repo, day) DO UPDATE SET commits = commits + excluded.commits",
+                    [(repo, day, count) for day, count in day_counts.items()],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO commit_sync"
+                    " (repo, watermark, boundary_shas, synced_at, pending, pending_shas, cursor, cursor_shas)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (repo, state.watermark, json.dumps(sorted(state.boundary_shas)), time.time(),
+                     state.pending, json.dumps(sorted(state.pending_shas)),
+                     state.cursor, json.dumps(sorted(state.cursor_shas))),
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def daily_counts(self, repo):
+        """Returns the stored ``(day, commits)`` pairs of ``repo``, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT day, commits FROM commit_days WHERE repo = ? ORDER BY day", (repo,)
+            ).fetchall()
+
+    def sync(self, repo, fetch_pages, max_items=None):
+        """
+        Brings the stored history of ``repo`` up to date, or closer to it.
+
+        Every page is merged as soon as it is read, so a sync that fails or stops at
+        ``max_items`` keeps its progress and the next sync resumes from it.
+
+        Args:
+            repo (str): Full name of the repository ("owner/repo").
+            fetch_pages (callable): Called with ``since`` and ``until`` committer dates
+                (None for no bound, both inclusive), returns an iterable of commit pages,
+                newest first.
+            max_items (int, optional): Maximum number of commits merged by this sync.
+
+        Returns:
+            int: Number of new commits merged into the store.
+
+        Raises:
+            Exception: Any error raised by ``fetch_pages``; the pages read before it stay merged.
+        """
+        with self._lock:
+            repo_lock = self._repo_locks[repo]
+
+        merged = 0
+        with repo_lock:
+            for _ in range(SYNC_ATTEMPTS):
+                state = self.state(repo)
+                try:
+                    while max_items is None or merged < max_items:
+                        resumed = state.cursor is not None
+                        budget = None if max_items is None else max_items - merged
+                        state, count, complete = self._sync_pass(repo, state, fetch_pages, budget)
+                        merged += count
+                        # A completed resume is followed by the commits pushed since the sync started
+                        if not complete or not resumed:
+                            break
+                    return merged
+                except SyncConflict:
+                    continue
+        return merged
+
+    def _sync_pass(self, repo, state, fetch_pages, budget):
+        """
+        Merges the commits between the watermark and the cursor (or the newest commit).
+
+        Returns:
+            tuple: The new SyncState, the number of commits merged and whether the pass
+            reached the watermark (False if it stopped at ``budget`` commits).
+
+        Raises:
+            SyncConflict: If the stored state changed while the pass ran.
+        """
+        skip = state.boundary_shas | state.cursor_shas
+        pending, pending_shas = state.pending, set(state.pending_shas)
+        cursor, cursor_shas = state.cursor, set(state.cursor_shas)
+        merged, complete = 0, True
+
+        for page in fetch_pages(state.watermark, state.cursor):
+            day_counts = Counter()
+            for item in page:
+                if 'commit' not in item or item.get('sha') in skip:
+                    continue
+                if budget is not None and merged >= budget:
+                    complete = False
+                    break
+                day_counts[item['commit']['author']['date'][:10]] += 1
+                merged += 1
+
+                sha, committed = item.get('sha'), item['commit']['committer']['date']
+                if pending is None or committed > pending:
+                    pending, pending_shas = committed, {sha}
+                elif committed == pending:
+                    pending_shas.add(sha)
+                if cursor is None or committed < cursor:
+                    cursor, cursor_shas = committed, {sha}
+                elif committed == cursor:
+                    cursor_shas.add(sha)
+
+            if day_counts:
+                next_state = state._replace(
+                    pending=pending, pending_shas=frozenset(pending_shas),
+                    cursor=cursor, cursor_shas=frozenset(cursor_shas),
+                )
+                self._write(repo, state, next_state, day_counts)
+                state = next_state
+            # Stop before the next page is requested rather than on its first commit
+            if not complete or (budget is not None and merged >= budget):
+                return state, merged, False
+
+        # Every commit above the watermark is stored, so it moves to the newest one
+        watermark, boundary_shas = state.watermark, state.boundary_shas
+        if pending is not None and (watermark is None or pending > watermark):
+            watermark, boundary_shas = pending, frozenset(pending_shas)
+        elif pending is not None and pending == watermark:
+            boundary_shas = boundary_shas | pending_shas
+        done = SyncState(watermark, boundary_shas)
+        self._write(repo, state, done, {})
+        return done, merged, True
+
+    def clear(self, repo=None):
+        """Forgets the history of ``repo``, or of every repository."""
+        with self._lock:
+            if repo is None:
+                self._conn.execute("DELETE FROM commit_days")
+                self._conn.execute("DELETE FROM commit_sync")
+            else:
+                self._conn.execute("DELETE FROM commit_days WHERE repo = ?", (repo,))
+                self._conn.execute("DELETE FROM commit_sync WHERE repo = ?", (repo,))
+            self._conn.commit()
@@ -1,83 +1,189 @@
-from collections import Counter
+import numpy as np
 import pandas as pd
 import pytz
 from datetime import datetime
 
+from commit_aggregator import CommitAggregator
+from metrics import timed
+from records import Repository
+
+# Fields of a repository search item used by the dashboards, with their display names
+REPOSITORY_COLUMNS = {
+    'name': 'Repository Name',
+    'stargazers_count': 'Stars',
+    'forks_count': 'Forks',
+    'language': 'Language',
+    'html_url': 'Repository URL',
+    'created_at': 'Created At',
+    'updated_at': 'Updated At',
+    'year': 'Year',
+}
+
+@timed('preprocess')
+def normalize_repositories(items, year):
+    """
+    Builds a DataFrame from repository search records (records.Repository), which hold
+    only the fields in REPOSITORY_COLUMNS instead of every nested owner/license field.
+    """
+    df = pd.DataFrame(items, columns=list(Repository._fields))
+    df['year'] = year
+    return df
+
+@timed('preprocess')
 def preprocess_data(df):
     """
     Selects and renames relevant columns for display, drop null columns and manage type of column.
+
+    Only the needed columns are copied, and the output uses compact dtypes: int32 counts,
+    float32 rates, int16 year and a categorical language.
     """
     if df is None or df.empty:
         return pd.DataFrame()
 
-    # Subsetting the columns
-    df = df[['name','stargazers_count', 'forks_count', 'language', 'html_url', 'created_at', 'updated_at','year']]
-
-    # Renaming columns for better readability
-    df = df.rename(columns={
-        'name': 'Repository Name',
-        'stargazers_count': 'Stars',
-        'forks_count': 'Forks',
-        'language': 'Language',
-        'html_url': 'Repository URL',
-        'created_at': 'Created At',
-        'updated_at': 'Updated At',
-        'year': 'Year'
-    })
-
-    # Converting 'created_at' and 'updated_at' to datetime
-    df['Created At'] = pd.to_datetime(df['Created At']).dt.tz_convert(pytz.utc)
-    df['Updated At'] = pd.to_datetime(df['Updated At']).dt.tz_convert(pytz.utc)
+    # Subsetting and renaming the columns, without copying the rest of the frame
+    df = pd.DataFrame({new: df[old] for old, new in REPOSITORY_COLUMNS.items()})
+
+    # Remove rows with null values
+    df = df.dropna()
+
+    # Converting 'created_at' and 'updated_at' to UTC datetime
+    df['Created At'] = pd.to_datetime(df['Created At'], utc=True)
+    df['Updated At'] = pd.to_datetime(df['Updated At'], utc=True)
 
     # Getting current date and making timezone aware
     today_date = pd.Timestamp(datetime.now(pytz.utc))
 
-    df['Repo age days'] = (today_date - df['Created At']).dt.days
-    df['Repo age years'] = df['Repo age days']/365
+    age_days = (today_date - df['Created At']).dt.days.to_numpy()
+    df['Repo age days'] = age_days.astype('int32')
+    df['Repo age years'] = (age_days / 365).astype('float32')
 
-    # Star and Fork growth rates
-    df['Star Growth Rate'] = df['Stars'] / df['Repo age years']
-    df['Fork Growth Rate'] = df['Forks'] / df['Repo age years']
+    # Star and Fork growth rates, repositories created today count as one day old
+    growth_years = np.maximum(age_days, 1) / 365
+    star_growth = df['Stars'].to_numpy() / growth_years
+    fork_growth = df['Forks'].to_numpy() / growth_years
+    df['Star Growth Rate'] = star_growth.astype('float32')
+    df['Fork Growth Rate'] = fork_growth.astype('float32')
 
     # Calculating activity score
-    df['Activity Score'] = df['Star Growth Rate'] * 0.7 + df['Fork Growth Rate'] * 0.3
+    df['Activity Score'] = (star_growth * 0.7 + fork_growth * 0.3).astype('float32')
 
-    # Remove rows with null values
-    df = df.dropna()
-
-    return df
+    return df.astype({'Stars': 'int32', 'Forks': 'int32', 'Year': 'int16', 'Language': 'category'})
 
+@timed('preprocess')
 def repo_counts_per_language_per_year(df):
     '"Counts the number of repositories per language per year and returns a DataFrame."'
     if df is None or df.empty:
         return pd.DataFrame()
     
     # Grouping by language and year, then counting repositories
-    df= df.groupby(['Language', 'Year']).size().reset_index(name='Repo Count')
+    df= df.groupby(['Language', 'Year'], observed=True).size().reset_index(name='Repo Count')
     
     df = df.sort_values(by=['Year', 'Repo Count'], ascending=[True, False])
 
     return df
 
-def preprocess_issues_pulls(response):
-    df = pd.DataFrame({
-                'Title': [pr['title'] for pr in response],
-                'Created At': pd.to_datetime([pr['created_at'] for pr in response])
-            })
-    df['Count'] = 1
-    df = df.sort_values('Created At')
+# Aggregates of the language x year cube, summed over the repositories of each cell
+CUBE_SUMS = ['Stars', 'Forks', 'Star Growth Rate', 'Fork Growth Rate', 'Activity Score']
+
+@timed('preprocess')
+def language_year_cube(df):
+    """
+    Aggregates processed repositories into one row per (Language, Year): the repository
+    count and the sums of CUBE_SUMS. The Language Trends charts read these rows instead
+    of grouping the row-level frame on every rerun.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['Language', 'Year', 'Repo Count'] + CUBE_SUMS)
+
+    grouped = df.groupby(['Language', 'Year'], observed=True)
+    cube = grouped[CUBE_SUMS].sum().astype('float64')
+    cube.insert(0, 'Repo Count', grouped.size())
+    cube = cube.reset_index()
+    cube['Language'] = cube['Language'].astype(str)
+    return cube.astype({'Year': 'int16', 'Repo Count': 'int32', 'Stars': 'int64', 'Forks': 'int64'})
+
+@timed('preprocess')
+def update_cube(cube, update):
+    """Replaces the (Language, Year) cells of ``cube`` present in ``update`` and adds the new ones."""
+    if cube is None or cube.empty:
+        return update.reset_index(drop=True)
+    keys = pd.MultiIndex.from_frame(update[['Language', 'Year']])
+    kept = cube[~pd.MultiIndex.from_frame(cube[['Language', 'Year']]).isin(keys)]
+    return pd.concat([kept, update], ignore_index=True).sort_values(['Year', 'Language'], ignore_index=True)
+
+@timed('preprocess')
+def popularity_density(df, bins=64, max_outliers=1000, sparse_count=2):
+    """
+    Bins repositories on log-scaled Stars and Forks axes for the popularity vs
+    collaboration scatter, so the chart payload does not grow with the dataset.
+
+    Zero stars or forks are placed at 1 on the log axes.
+
+    Args:
+        df (pd.DataFrame): Processed repositories.
+        bins (int): Number of bins per axis.
+        max_outliers (int): Maximum number of repositories kept as individual points.
+        sparse_count (int): Repositories in cells holding at most this many rows are outliers.
+
+    Returns:
+        tuple: ``(counts, star_edges, fork_edges, outliers)``; ``counts[i, j]`` is the number
+        of repositories in fork bin ``i`` and star bin ``j``, the edges are in Stars/Forks
+        units, and ``outliers`` holds the sparse-cell rows, most starred first.
+    """
+    stars = np.log10(np.maximum(df['Stars'].to_numpy(dtype='float64'), 1))
+    forks = np.log10(np.maximum(df['Forks'].to_numpy(dtype='float64'), 1))
+    star_edges = np.linspace(0, max(stars.max(), 1e-6), bins + 1)
+    fork_edges = np.linspace(0, max(forks.max(), 1e-6), bins + 1)
+
+    star_bin = np.minimum(np.searchsorted(star_edges, stars, side='right') - 1, bins - 1)
+    fork_bin = np.minimum(np.searchsorted(fork_edges, forks, side='right') - 1, bins - 1)
+    cell = fork_bin * bins + star_bin
+    counts = np.bincount(cell, minlength=bins * bins)
+
+    sparse = counts[cell] <= sparse_count
+    outliers = df[sparse].nlargest(max_outliers, 'Stars')
+    return counts.reshape(bins, bins), 10 ** star_edges, 10 ** fork_edges, outliers
+
+@timed('preprocess')
+def cumulative_counts(day_counts):
+    """
+    Builds the 'Created At' / 'Count' / 'Cumulative Count' DataFrame plotted for open issues
+    and pull requests from (day, count) pairs, oldest first.
+    """
+    df = pd.DataFrame(day_counts, columns=['Created At', 'Count'])
+    df['Created At'] = pd.to_datetime(df['Created At'])
     df['Cumulative Count'] = df['Count'].cumsum()
 
     return df
 
+@timed('preprocess')
 def count_commits_by_date(commits):
-    dates = [commit['commit']['committer']['date'][:10] for commit in commits]
-    date_counts = Counter(dates)
-    df = pd.DataFrame(date_counts.items(), columns=['Date', 'Commits'])
+    aggregator = CommitAggregator(date_field='committer')
+    aggregator.add_page(commits)
+    df = pd.DataFrame(aggregator.day_counts(), columns=['Date', 'Commits'])
     df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values(by='Date')
     return df
 
+@timed('preprocess')
+def commits_per_day(pages):
+    """
+    Counts commits per day (author date) from a stream of commit pages.
+
+    Pages are consumed one at a time by a CommitAggregator, so they can come straight
+    from the API paginator.
+    """
+    aggregator = CommitAggregator()
+    aggregator.add_pages(pages)
+    return daily_commits_frame(aggregator.day_counts())
+
+@timed('preprocess')
+def daily_commits_frame(day_counts):
+    """Builds the 'day' / 'commits' DataFrame plotted by the Repository page from (day, count) pairs."""
+    df = pd.DataFrame(day_counts, columns=['day', 'commits'])
+    df['day'] = pd.to_datetime(df['day']).dt.date
+    return df
+
+@timed('preprocess')
 def prepare_donut_data(user):
     repos = fetch_all_repos(user)
     data = []
@@ -0,0 +1,118 @@
+"""
+Shared store of fetched dashboard data.
+
+The shared backend of the fetcher cache (fetch_cache.py): results fetched by any
+server process, and by the background refresher (refresher.py) for its watch list,
+are written to this SQLite store, and the pages read from it before fetching live
+from GitHub. Entries are keyed by schema version, fetcher name and normalized call
+arguments, so a page call and a refresher call with the same arguments map to the
+same entry however they were passed, and entries of an older result type are never read.
+Entries not written for ``max_age`` seconds are deleted, and so are the oldest ones
+above ``max_entries``, every ``PRUNE_EVERY`` writes, so arbitrary names typed into
+the pages do not grow the file without limit.
+"""
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# Version of the stored result types, part of every key. Bump it when a fetcher
+# changes the type or fields of its result (e.g. the records of records.py), so a
+# deploy reads fresh entries instead of unpickling the previous shape.
+SCHEMA_VERSION = 2
+
+# Number of writes between two prunes of old entries
+PRUNE_EVERY = 100
+
+
+class DataStore:
+    """
+    SQLite-backed key-value store of fetcher results.
+
+    Args:
+        path (str): Path of the SQLite database file (created if missing).
+        max_age (float, optional): Seconds after which an entry is no longer served and
+            is deleted, None to keep entries.
+        max_entries (int, optional): Number of entries kept, the least recently written
+            are deleted above it, None for no limit.
+    """
+
+    def __init__(self, path, max_age=86400, max_entries=None):
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.pruned = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_updated_at ON entries (updated_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(func, args, kwargs):
+        """Builds the key of a call from the schema version, the fetcher name and its bound arguments."""
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        return f"v{SCHEMA_VERSION}:{func.__name__}:{json.dumps(bound.arguments, sort_keys=True, default=str)}"
+
+    def get(self, key, max_age=None):
+        """
+        Returns the stored result for ``key``.
+
+        Args:
+            key (str): Entry key (see ``key``).
+            max_age (float, optional): Maximum age of the entry, defaults to ``max_age`` of the
+                store (None for any age).
+
+        Returns:
+            tuple: ``(value, updated_at)``, or None if missing or too old.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute("SELECT value, updated_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def put(self, key, value):
+        """Stores ``value`` under ``key``."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, updated_at) VALUES (?, ?, ?)", (key, blob, time.time())
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune()
+            self._conn.commit()
+
+    def prune(self):
+        """Deletes the entries older than ``max_age`` and the oldest above ``max_entries``."""
+        with self._lock:
+            self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        deleted = 0
+        if self.max_age is not None:
+            deleted += self._conn.execute(
+                "DELETE FROM entries WHERE updated_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+        if self.max_entries is not None:
+            deleted += self._conn.execute(
+                "DELETE FROM entries WHERE key IN"
+                " (SELECT key FROM entries ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        self.pruned += deleted
@@ -0,0 +1,268 @@
+"""
+Cache of fetcher results shared by all sessions of a server.
+
+``st.cache_data`` kept an unbounded copy of every result per process, with one TTL
+for every fetcher. Here results are pickled into an in-process LRU that evicts the
+least recently used entries once their total size passes ``max_bytes``, and every
+fetcher has its own TTL. An optional shared backend (the SQLite data store, see
+data_store.py) sits behind the LRU, so server replicas on the same volume and the
+background refresher read each other's results.
+
+Entries are keyed by fetcher name and normalized call arguments (see DataStore.key).
+Concurrent calls with the same key are coalesced: the first caller runs the fetcher,
+the others wait for it and share its result, or its exception. Failed fetches (None
+results and exceptions) are not stored, but are kept in this process for a short
+``negative_ttl`` so a burst of callers for a missing repository makes one request.
+Partial results (e.g. a commit history still syncing) are returned to the callers of
+the fetch but not stored, so the next call continues the fetch.
+"""
+import functools
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import metrics
+from data_store import DataStore
+
+
+class LRUCache:
+    """
+    In-process LRU of pickled values, bounded by their total size in bytes.
+
+    Args:
+        max_bytes (int): Size above which the least recently used entries are evicted.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, max_age):
+        """Returns the pickled value stored under ``key`` if younger than ``max_age``, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            blob, stored_at = entry
+            if time.time() - stored_at > max_age:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return blob
+
+    def put(self, key, blob, stored_at=None):
+        """Stores a pickled value, evicting old entries to stay within ``max_bytes``."""
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (blob, time.time() if stored_at is None else stored_at)
+            self.bytes += len(blob)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        blob, _ = self._entries.pop(key)
+        self.bytes -= len(blob)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Flight:
+    """A fetcher call in progress, waited on by the callers coalesced into it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.blob = None
+        self.error = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        # Every waiting caller gets its own copy of the result
+        return None if self.blob is None else pickle.loads(self.blob)
+
+
+class FetchCache:
+    """
+    Two-level cache of fetcher results: an in-process LRU, then an optional shared store.
+
+    Args:
+        max_bytes (int): Size limit of the in-process LRU.
+        shared (DataStore, optional): Store shared with other processes, None for none.
+        negative_ttl (float): Seconds a failed fetch is returned again instead of retried.
+    """
+
+    def __init__(self, max_bytes, shared=None, negative_ttl=30):
+        self.memory = LRUCache(max_bytes)
+        self.shared = shared
+        self.negative_ttl = negative_ttl
+        self._counts = defaultdict(
+            lambda: {'hits': 0, 'shared_hits': 0, 'negative_hits': 0, 'coalesced': 0, 'misses': 0}
+        )
+        self._lock = threading.Lock()
+        # In-flight calls, and recently failed ones as (failed_at, flight), by key
+        self._flights = {}
+        self._failures = {}
+
+    def _count(self, name, outcome):
+        with self._lock:
+            self._counts[name][outcome] += 1
+        metrics.inc('fetch_cache_total', function=name, outcome=outcome)
+
+    def memoize(self, ttl, shared=True, complete=None):
+        """
+        Decorates a fetcher so its results are served from the cache for ``ttl`` seconds.
+
+        The decorated function gains ``refresh(*args, **kwargs)``, which always calls
+        the fetcher and stores a successful (not None) and complete result.
+
+        Args:
+            ttl (float): Seconds a result is served before the fetcher runs again.
+            shared (bool): Also read and write the shared store.
+            complete (callable, optional): Called with a result and the call arguments,
+                returns False for a partial result, which is not stored.
+        """
+        def decorator(func):
+            name = func.__name__
+            store = self.shared if shared else None
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = DataStore.key(func, args, kwargs)
+                blob = self.memory.get(key, ttl)
+                if blob is not None:
+                    self._count(name, 'hits')
+                    # Every caller gets its own copy, as with st.cache_data
+                    return pickle.loads(blob)
+
+                with self._lock:
+                    failure = self._failures.get(key)
+                    if failure is not None and time.time() - failure[0] <= self.negative_ttl:
+                        flight, outcome = failure[1], 'negative_hits'
+                    else:
+                        flight = self._flights.get(key)
+                        outcome = None if flight is None else 'coalesced'
+                        if flight is None:
+                            # A flight may have landed since the lookup above
+                            blob = self.memory.get(key, ttl)
+                            if blob is not None:
+                                outcome = 'hits'
+                            else:
+                                flight = self._flights[key] = _Flight()
+                if outcome == 'hits':
+                    self._count(name, outcome)
+                    return pickle.loads(blob)
+                if outcome is not None:
+                    self._count(name, outcome)
+                    return flight.result()
+
+                value = None
+                try:
+                    value, flight.blob = self._load(name, key, ttl, store, complete, func, args, kwargs)
+                except Exception as e:
+                    flight.error = e
+                    raise
+                finally:
+                    self._land(key, flight)
+                return value
+
+            def refresh(*args, **kwargs):
+                value = func(*args, **kwargs)
+                if value is not None and (complete is None or complete(value, *args, **kwargs)):
+                    self._save(DataStore.key(func, args, kwargs), value, store)
+                return value
+
+            wrapper.refresh = refresh
+            return wrapper
+        return decorator
+
+    def _load(self, name, key, ttl, store, complete, func, args, kwargs):
+        """
+        Reads ``key`` from the shared store, or runs the fetcher and stores a successful, complete result.
+
+        Returns:
+            tuple: ``(value, pickled value)``, ``(None, None)`` if the fetch failed.
+        """
+        entry = store.get(key, max_age=ttl) if store is not None else None
+        if entry is not None:
+            self._count(name, 'shared_hits')
+            value, stored_at = entry
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self.memory.put(key, blob, stored_at)
+            return value, blob
+
+        self._count(name, 'misses')
+        value = func(*args, **kwargs)
+        if value is None:
+            return None, None
+        if complete is not None and not complete(value, *args, **kwargs):
+            # Shared with the callers waiting on this fetch only
+            return value, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return value, self._save(key, value, store)
+
+    def _save(self, key, value, store):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.memory.put(key, blob)
+        if store is not None:
+            store.put(key, value)
+        return blob
+
+    def _land(self, key, flight):
+        """Ends an in-flight call, remembering it for ``negative_ttl`` if it failed."""
+        now = time.time()
+        with self._lock:
+            del self._flights[key]
+            if flight.blob is None:
+                self._failures[key] = (now, flight)
+                if len(self._failures) > 1000:
+                    self._failures = {
+                        k: failure for k, failure in self._failures.items() if now - failure[0] <= self.negative_ttl
+                    }
+            else:
+                self._failures.pop(key, None)
+        flight.done.set()
+
+    def stats(self):
+        """
+        Returns the memory use of the LRU and the hit ratio of every fetcher.
+
+        Returns:
+            dict: ``entries``, ``bytes``, ``max_bytes``, ``evictions`` and ``functions``: the
+            hits, shared store hits, negative hits, coalesced calls, misses and hit ratio
+            (calls that did not run the fetcher) by fetcher name.
+        """
+        functions = {}
+        with self._lock:
+            counts_by_name = {name: dict(counts) for name, counts in self._counts.items()}
+        for name, counts in counts_by_name.items():
+            calls = sum(counts.values())
+            ratio = (calls - counts['misses']) / calls if calls else 0.0
+            functions[name] = dict(counts, hit_ratio=ratio)
+        return {
+            'entries': len(self.memory),
+            'bytes': self.memory.bytes,
+            'max_bytes': self.memory.max_bytes,
+            'evictions': self.memory.evictions,
+            'functions': functions,
+        }
+
+    def clear(self):
+        """Empties the LRU and forgets recent failures and counters (the shared store is kept)."""
+        self.memory.clear()
+        with self._lock:
+            self._failures.clear()
+            self._counts.clear()
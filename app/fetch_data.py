@@ -1,66 +1,168 @@
-import requests
+import functools
 import os
-from dotenv import load_dotenv
 import pandas as pd
 import streamlit as st
 from collections import defaultdict
-import requests
-import time
-from datetime import datetime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import threading
 
+import github_client
+import graphql_backend
+import issue_counts
+import parquet_store
+import records
+import repo_search
+from commit_aggregator import CommitAggregator
+from commit_store import CommitStore
+from data_store import DataStore
+from fetch_cache import FetchCache
+from metrics import timed
+from data_preprocess import commits_per_day, cumulative_counts, daily_commits_frame, normalize_repositories, preprocess_data
+from github_client import CACHE_DIR, HTTP_CACHE_TTL, MAX_PER_HOST, MAX_WORKERS, GitHubError
+from parquet_store import DATASET_MAX_AGE
 
-load_dotenv()
-GITHUB_PAT = os.getenv('PAT_TOKEN')
+# Local commit history, set GITHUB_COMMIT_STORE=off to always download full histories
+COMMIT_STORE_PATH = os.getenv('GITHUB_COMMIT_STORE', os.path.join(CACHE_DIR, 'commits.sqlite'))
+commit_store = CommitStore(COMMIT_STORE_PATH) if COMMIT_STORE_PATH != 'off' else None
 
+# Results shared with other server processes and the background refresher,
+# set GITHUB_DATA_STORE=off to keep results in this process only
+DATA_STORE_PATH = os.getenv('GITHUB_DATA_STORE', os.path.join(CACHE_DIR, 'data_store.sqlite'))
+# Stored results are deleted after the longest fetcher TTL, and the oldest above the entry limit
+DATA_STORE_MAX_AGE = float(os.getenv('GITHUB_DATA_STORE_MAX_AGE', '86400'))
+DATA_STORE_MAX_ENTRIES = int(os.getenv('GITHUB_DATA_STORE_MAX_ENTRIES', '50000'))
+data_store = DataStore(
+    DATA_STORE_PATH, max_age=DATA_STORE_MAX_AGE, max_entries=DATA_STORE_MAX_ENTRIES
+) if DATA_STORE_PATH != 'off' else None
 
-# Fetch GitHub repositories over a range of years for a given language
-@st.cache_data(show_spinner=True)
-def fetch_github_data(start_year=None, end_year=None, top_n=100, github_token=None):
+# In-process cache of fetcher results, in front of the data store
+MEMORY_CACHE_MB = float(os.getenv('GITHUB_MEMORY_CACHE_MB', '256'))
+# Seconds a failed fetch is returned to new callers before it is tried again
+NEGATIVE_CACHE_TTL = float(os.getenv('GITHUB_NEGATIVE_CACHE_TTL', '30'))
+fetch_cache = FetchCache(int(MEMORY_CACHE_MB * 1024 * 1024), shared=data_store, negative_ttl=NEGATIVE_CACHE_TTL)
+
+# Fetchers whose results the refresher can write to the data store, by name
+STORED_FETCHERS = {}
+
+# Open issues or pull requests above which they are counted by search windows instead of listed
+OPEN_ITEMS_LIST_LIMIT = int(os.getenv('GITHUB_OPEN_ITEMS_LIST_LIMIT', '1000'))
+# Months per search window when counting open issues or pull requests
+OPEN_ITEMS_BUCKET_MONTHS = int(os.getenv('GITHUB_OPEN_ITEMS_BUCKET_MONTHS', '12'))
+
+# Status of the commit list of an empty repository
+EMPTY_REPOSITORY = 409
+
+# Default backend of the fetchers that support both: 'rest' or 'graphql' (needs a token)
+GITHUB_BACKEND = os.getenv('GITHUB_BACKEND', 'rest')
+
+# Commits synced into the commit store per repository by one call of the commit fetchers,
+# 0 for no limit. The next call continues where the last one stopped; without the store
+# (or with the GraphQL backend) there is nothing to continue, so histories are not capped.
+COMMIT_FETCH_LIMIT = int(os.getenv('GITHUB_COMMIT_FETCH_LIMIT', '5000'))
+
+
+# Serve a fetcher from the fetch cache for ttl seconds
+def cached(ttl, show_spinner=True, shared=True, complete=None):
     """
-    Fetch GitHub repositories over a range of years for a given language.
+    Decorates a fetcher with the fetch cache (see fetch_cache.py).
 
     Args:
-        language (str): The programming language to filter by.
-        start_year (int): Starting year of the range.
-        end_year (int): Ending year of the range.
-        top_n (int): Max number of repositories per year (max 100 per GitHub API page).
-        github_token (str, optional): GitHub personal access token for authenticated requests.
+        ttl (float): Seconds a result is served before the fetcher runs again.
+        show_spinner (bool): Show a spinner on the page while the fetcher runs.
+        shared (bool): Share results through the data store; shared fetchers can be
+            refreshed by the background refresher.
+        complete (callable, optional): Called with a result and the call arguments,
+            returns False for a partial result, which is not cached.
+    """
+    def decorator(func):
+        memoized = fetch_cache.memoize(ttl, shared=shared, complete=complete)(func)
+        wrapper = memoized
+        if show_spinner:
+            # The spinner only appears if the call takes longer than half a second
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with st.spinner(f"Running `{func.__name__}`..."):
+                    return memoized(*args, **kwargs)
+            wrapper.refresh = memoized.refresh
+        # Cached calls without the spinner, for batch callers that report progress themselves
+        wrapper.memoized = memoized
+        if shared:
+            STORED_FETCHERS[func.__name__] = wrapper
+        return wrapper
+    return decorator
+
+
+# Run several fetchers at once from a page script
+def fetch_concurrently(*calls):
+    """
+    Runs several fetchers concurrently so a page waits for the slowest one only.
+
+    Args:
+        *calls: Tuples of ``(fetcher, *args)``.
 
     Returns:
-        pd.DataFrame: Combined DataFrame with repository data.
+        list: The result of each fetcher, in the order the calls were given.
     """
+    ctx = get_script_run_ctx()
 
-    base_url = "https://api.github.com/search/repositories"
-    headers = {
-    "Authorization":f"Bearer {GITHUB_PAT}",
-    "Accept":"application/vnd.github.v3+json"}
+    def with_ctx(func, *args):
+        # Cached fetchers report spinners and cache state through the script context
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args)
 
-    all_data = []
+    return github_client.gather(*[(with_ctx, *call) for call in calls])
 
-    for year in range(start_year, end_year + 1):
-        query = f"stars:>0"
 
-        query += f" created:{year}-01-01..{year}-12-31"
+# Fetch the most starred repositories of one language created in one year
+@cached(ttl=DATASET_MAX_AGE, show_spinner=False)
+@timed('fetch')
+def fetch_repositories_for_year(year, language=None, top_n=100):
+    """
+    Fetches the most starred repositories created in ``year``, using a ``language:``
+    qualified search so only repositories of that language are transferred.
 
-        params = {
-            "q": query,
-            "sort": "stars",
-            "order": "desc",
-            "per_page": min(top_n, 100)  
-        }
-    
-        response = requests.get(base_url, headers=headers, params=params)
+    Args:
+        year (int): Creation year of the repositories.
+        language (str, optional): Programming language, None for every language.
+        top_n (int, optional): Max number of repositories, None for all (see repo_search).
 
-        if response.status_code == 200:
-            data = response.json()
-            df_year = pd.json_normalize(data['items'])  
-            df_year['year'] = year  
-            all_data.append(df_year)
-        else:
-            print(f"Error: {response.status_code} - {response.text}")
-            continue
+    Returns:
+        pd.DataFrame: Repository data with a 'year' column, or None if the search failed.
+    """
+    try:
+        items = repo_search.search_year(repo_search.language_query(language), year, top_n)
+    except GitHubError:
+        return None
+
+    return normalize_repositories(items, year)
+
+# Fetch GitHub repositories over a range of years for the given languages
+@timed('fetch')
+def fetch_github_data(start_year=None, end_year=None, top_n=100, github_token=None, languages=None):
+    """
+    Fetch GitHub repositories over a range of years for the given languages.
+
+    Every (language, year) shard is searched concurrently and cached on its own, so
+    adding a language or widening the year range only fetches the new shards.
+
+    Args:
+        start_year (int): Starting year of the range.
+        end_year (int): Ending year of the range.
+        top_n (int, optional): Max number of most starred repositories per language and year, None for all.
+        github_token (str, optional): Unused, the token is read from the environment by github_client.
+        languages (list, optional): Programming languages to fetch, None for every language.
+
+    Returns:
+        pd.DataFrame: Combined DataFrame with repository data.
+    """
 
-        time.sleep(1)
+    shards = [
+        (fetch_repositories_for_year, year, language, top_n)
+        for language in (languages or [None])
+        for year in range(start_year, end_year + 1)
+    ]
+    all_data = [df for df in fetch_concurrently(*shards) if df is not None and not df.empty]
 
     if all_data:
         df_all = pd.concat(all_data, ignore_index=True)
@@ -68,196 +170,371 @@ def fetch_github_data(start_year=None, end_year=None, top_n=100, github_token=No
     else:
         return pd.DataFrame()
 
-# Fetch user details 
-@st.cache_data(show_spinner=True)   
+# Load processed repositories from the Parquet dataset, fetching missing partitions first
+@cached(ttl=HTTP_CACHE_TTL, shared=False)
+@timed('fetch')
+def load_repository_dataset(start_year, end_year, languages, top_n=100):
+    """
+    Loads processed repository data for the selected years and languages.
+
+    (language, year) partitions missing from the Parquet dataset (or older than
+    DATASET_MAX_AGE) are fetched, preprocessed and written to it first; the rows are
+    then read back with the year range and languages pushed down to the partitions.
+
+    Args:
+        start_year (int): Starting year of the range.
+        end_year (int): Ending year of the range.
+        languages (list): Programming languages to load.
+        top_n (int, optional): Max number of repositories per language and year when fetching.
+
+    Returns:
+        pd.DataFrame: Processed repository data (see preprocess_data).
+    """
+    fetch_missing_partitions(start_year, end_year, languages, top_n)
+    return parquet_store.load_dataset(years=(start_year, end_year), languages=list(languages))
+
+# Load the language x year aggregates the Language Trends charts are drawn from
+@cached(ttl=HTTP_CACHE_TTL, show_spinner=False, shared=False)
+@timed('fetch')
+def load_language_cube(start_year, end_year, languages, top_n=100):
+    """
+    Loads the per (Language, Year) repository counts and sums of the selected years
+    and languages (see parquet_store.load_cube), fetching missing partitions first.
+
+    Returns:
+        pd.DataFrame: One row per (Language, Year), see data_preprocess.language_year_cube.
+    """
+    fetch_missing_partitions(start_year, end_year, languages, top_n)
+    return parquet_store.load_cube(years=(start_year, end_year), languages=list(languages))
+
+@timed('fetch')
+def fetch_missing_partitions(start_year, end_year, languages, top_n=100):
+    """Fetches and writes the (language, year) partitions missing from the Parquet dataset."""
+    missing = parquet_store.missing_partitions((start_year, end_year), languages)
+    if missing:
+        shards = [(fetch_repositories_for_year, year, language, top_n) for language, year in missing]
+        write_partitions(fetch_concurrently(*shards))
+
+def write_partitions(frames):
+    """Preprocesses results of ``fetch_repositories_for_year`` and writes them to the Parquet dataset."""
+    fetched = [df for df in frames if df is not None and not df.empty]
+    if fetched:
+        parquet_store.write_dataset(preprocess_data(pd.concat(fetched, ignore_index=True)))
+
+# Fetch user details
+@cached(ttl=3600)
+@timed('fetch')
 def fetch_user_data(username):
     """
     Fetches user data from GitHub API.
-    
+
     Args:
         username (str): The GitHub username to fetch data for.
-    
+
     Returns:
-        dict: A dictionary containing user data.
+        pd.DataFrame: One row with the fields of records.User.
     """
-    
-    url = f"https://api.github.com/users/{username}"
-    headers = {
-        "Authorization": f"token {GITHUB_PAT}"
-    }
-    
-    response = requests.get(url, headers=headers)
-    
+
+    response = github_client.get(f"users/{username}")
+
     if response.status_code == 200:
-        data = response.json()
-        df = pd.DataFrame([data])
+        df = pd.DataFrame(records.project([response.json()], records.User))
         return df
     else:
-        print(f"Error: {response.status_code} - {response.text}")
+        return None
+
+# Members of an organization or of one of its teams
+@cached(ttl=3600)
+@timed('fetch')
+def fetch_org_members(org, team=None, max_items=None):
+    """
+    Fetches the logins of the members of an organization, or of one of its teams.
+
+    Args:
+        org (str): The organization login.
+        team (str, optional): Slug of a team of the organization.
+        max_items (int, optional): Maximum number of members to fetch.
+
+    Returns:
+        list: Member logins, or None if they could not be fetched.
+    """
+    path = f"orgs/{org}/teams/{team}/members" if team else f"orgs/{org}/members"
+    try:
+        return [member['login'] for page in github_client.iter_pages(path, max_items=max_items) for member in page]
+    except GitHubError:
         return None
 
 # Fetch data about user most used programming language
-@st.cache_data(show_spinner=True)
-def fetch_user_most_used_languages(username):
+@cached(ttl=3600)
+@timed('fetch')
+def fetch_user_most_used_languages(username, max_workers=None, backend=None):
     """
     Fetches the most used programming languages by a GitHub user.
-    
+
+    The per-repository language requests are issued concurrently through the
+    shared client, with at most ``max_workers`` requests in flight; every request to
+    the API host also holds one of its MAX_PER_HOST slots, so ``max_workers`` is
+    clamped to that limit. The GraphQL
+    backend gets every repository's languages in one query per 100 repositories.
+
     Args:
         username (str): The GitHub username.
-    
+        max_workers (int, optional): Concurrent language requests (defaults to MAX_WORKERS,
+            at most MAX_PER_HOST).
+        backend (str, optional): 'rest' or 'graphql' (defaults to GITHUB_BACKEND).
+
     Returns:
-        dict: A dictionary with languages as keys and total bytes of code as values.
+        dict: A dictionary with languages as keys and total bytes of code as values, or
+        None if the repositories or any of their languages could not be fetched.
     """
 
-    url = f"https://api.github.com/users/{username}/repos"
-    headers = {
-        "Authorization": f"token {GITHUB_PAT}"
-    }
+    if (backend or GITHUB_BACKEND) == 'graphql':
+        try:
+            return graphql_backend.user_most_used_languages(username)
+        except GitHubError:
+            return None
 
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        repos_data = response.json()
-
-        language_totals = defaultdict(int)
-
-        for repo in repos_data:
-            languages_url = repo.get('languages_url')
-            if languages_url:
-                lang_response = requests.get(languages_url, headers=headers)
-                if lang_response.status_code == 200:
-                    languages_data = lang_response.json()
-                    for lang, bytes_count in languages_data.items():
-                        language_totals[lang] += bytes_count
-                else:
-                    print(f"Failed to fetch languages for {repo.get('name')}: {lang_response.status_code}")
-        
-        return dict(language_totals)
-    else:
-        print(f"Error fetching repos for user {username}: {response.status_code} - {response.text}")
+    try:
+        repos_data = [repo for page in github_client.iter_pages(f"users/{username}/repos") for repo in page]
+    except GitHubError:
         return None
-    
+
+    calls = [(github_client.get, repo['languages_url']) for repo in repos_data if repo.get('languages_url')]
+    language_totals = defaultdict(int)
+
+    # More threads than host slots would only wait on the per-host semaphore
+    workers = min(max_workers or MAX_WORKERS, MAX_PER_HOST)
+    for lang_response in github_client.gather(*calls, max_workers=workers):
+        # A partial total would be cached as if it were complete
+        if lang_response.status_code != 200:
+            return None
+        for lang, bytes_count in lang_response.json().items():
+            language_totals[lang] += bytes_count
+
+    return dict(language_totals)
+
 # Single repository details
-@st.cache_data(show_spinner=True)
+@cached(ttl=1800)
+@timed('fetch')
 def fetch_repository_details(repo_name):
     """
     Fetches details of a specific GitHub repository.
-    
+
     Args:
         repo_name (str): The full name of the repository (e.g., "owner/repo").
-    
+
     Returns:
-        dict: A dictionary containing repository details.
+        records.RepositoryDetails: The repository fields the dashboard shows.
     """
-    
-    url = f"https://api.github.com/repos/{repo_name}"
-    headers = {
-        "Authorization": f"token {GITHUB_PAT}"
-    }
-    
-    response = requests.get(url, headers=headers)
-    
+
+    response = github_client.get(f"repos/{repo_name}")
+
     if response.status_code == 200:
-        data = response.json()
-        return data
+        return records.project([response.json()], records.RepositoryDetails)[0]
     else:
-        print(f"Error: {response.status_code} - {response.text}")
         return None
-    
+
 # Fetch repository contributions
-@st.cache_data(show_spinner=True)
-def fetch_repository_contributions(repo_contributors_url):
-    headers = {
-        "Authorization": f"token {GITHUB_PAT}"
-    }
-    response = requests.get(repo_contributors_url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
-        contributions = []
-        for contributor in data:
-            contributions.append({
-                "login": contributor.get("login"),
-                "contributions": contributor.get("contributions"),
-            })
-        return contributions
-    else:
-        print(f"Error: {response.status_code} - {response.text}")
+@cached(ttl=3600)
+@timed('fetch')
+def fetch_repository_contributions(repo_contributors_url, max_items=None):
+    contributions = []
+    try:
+        for page in github_client.iter_pages(repo_contributors_url, max_items=max_items, record=records.Contributor):
+            contributions.extend(page)
+    except GitHubError:
         return None
-    
+    return contributions
+
 # Fetch repository issues and pull requests\
-@st.cache_data(show_spinner=True)
-def fetch_repository_issues_pulls(repo_name, type='issues'):
+@cached(ttl=1800)
+@timed('fetch')
+def fetch_repository_issues_pulls(repo_name, type='issues', max_items=None, since=None):
     """
     Fetches issues or pull requests for a specific GitHub repository.
-    
+
+    Every page is read, but only the fields the dashboard uses are kept (records.Issue).
+
     Args:
         repo_name (str): The full name of the repository (e.g., "owner/repo").
         issue_type (str): 'issues' or 'pulls' to specify the type of data to fetch.
-    
+        max_items (int, optional): Maximum number of items to fetch.
+        since (str, optional): Only items updated at or after this ISO 8601 timestamp (issues only).
+
     Returns:
         list: A list of issues or pull requests.
     """
-    
-    url = f"https://api.github.com/repos/{repo_name}/{type}"
-    headers = {
-        "Authorization": f"token {GITHUB_PAT}"
-    }
-    
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        data = response.json()
-        return data
-    else:
-        print(f"Error: {response.status_code} - {response.text}")
+
+    items = []
+    try:
+        for page in github_client.iter_pages(f"repos/{repo_name}/{type}", max_items=max_items, since=since):
+            if type == 'issues':
+                # The issues list also returns the pull requests
+                page = [item for item in page if 'pull_request' not in item]
+            items.extend(records.project(page, records.Issue))
+    except GitHubError:
         return None
-    
-@st.cache_data(show_spinner=True)
-def total_commits_over_time(repo_name):
-    url = f"https://api.github.com/repos/{repo_name}/commits"
-    headers={
-        "Authorization": f"token {GITHUB_PAT}"
-    }
-    response = requests.get(url,headers=headers)
+    return items
 
-    if response.status_code == 200:
-        data = response.json()
+# Open issues or pull requests over time, counted by GitHub
+@cached(ttl=1800)
+@timed('fetch')
+def fetch_open_item_counts(repo_name, type='issues'):
+    """
+    Counts the open issues or pull requests of a repository by creation date.
 
-        dates = [item["commit"]["author"]["date"] for item in data if "commit" in item]
-        df = pd.DataFrame({"date": pd.to_datetime(dates)})
-        df["day"] = df["date"].dt.date
+    Pull requests are not counted as issues. Repositories with up to
+    OPEN_ITEMS_LIST_LIMIT open items list them with ``state=open``; larger ones are
+    counted with one search request per OPEN_ITEMS_BUCKET_MONTHS months, without
+    fetching the items (see issue_counts.py).
 
-        commit_counts = df.groupby("day").size().reset_index(name="commits")
-        return commit_counts
-    else:
-        print(f"Error: {response.status_code} - {response.text}")
+    Args:
+        repo_name (str): The full name of the repository (e.g., "owner/repo").
+        type (str): 'issues' or 'pulls'.
+
+    Returns:
+        pd.DataFrame: Cumulative open item counts (see data_preprocess.cumulative_counts),
+        or None if they could not be fetched.
+    """
+    try:
+        day_counts = issue_counts.open_item_counts(
+            repo_name, type, list_limit=OPEN_ITEMS_LIST_LIMIT, bucket_months=OPEN_ITEMS_BUCKET_MONTHS
+        )
+    except GitHubError:
         return None
-    
+    return cumulative_counts(day_counts)
+
+def commit_limit(max_items):
+    """Returns ``max_items``, or COMMIT_FETCH_LIMIT (None for no limit) if it is not given."""
+    if max_items is not None:
+        return max_items
+    return COMMIT_FETCH_LIMIT or None
+
+def commit_history_pending(*repo_full_names):
+    """
+    Tells whether the stored history of any of the repositories is still being synced:
+    a sync stopped at COMMIT_FETCH_LIMIT commits and the next one continues it.
+    """
+    return commit_store is not None and any(commit_store.state(repo).cursor is not None for repo in repo_full_names)
+
+# Bring the stored commit history of a repository up to date
+@timed('fetch')
+def sync_commit_history(repo_full_name, max_items=None):
+    """
+    Fetches the commits missing from the stored history of a repository.
+
+    Args:
+        repo_full_name (str): The full name of the repository (e.g., "owner/repo").
+        max_items (int, optional): Maximum number of commits fetched by this sync; the
+            next sync continues where it stopped.
+
+    Returns:
+        bool: False if the commits could not be fetched.
+    """
+    def fetch_pages(since, until):
+        params = {"until": until} if until is not None else None
+        return github_client.iter_pages(f"repos/{repo_full_name}/commits", params=params, since=since)
+
+    try:
+        commit_store.sync(repo_full_name, fetch_pages, max_items=max_items)
+    except GitHubError as e:
+        # GitHub answers 409 for the commits of an empty repository
+        return e.status_code == EMPTY_REPOSITORY
+    return True
+
+def commits_complete(commits, repo_name, *args, **kwargs):
+    """Tells whether a result of total_commits_over_time covers the whole history."""
+    return not commit_history_pending(repo_name)
+
+@cached(ttl=1800, complete=commits_complete)
+@timed('fetch')
+def total_commits_over_time(repo_name, max_items=None, backend=None):
+    if (backend or GITHUB_BACKEND) == 'graphql':
+        try:
+            return graphql_backend.commits_over_time(repo_name, max_items=max_items)
+        except GitHubError:
+            return None
+
+    if commit_store is None:
+        try:
+            return commits_per_day(github_client.iter_pages(f"repos/{repo_name}/commits", max_items=max_items))
+        except GitHubError:
+            return None
+
+    if not sync_commit_history(repo_name, max_items=commit_limit(max_items)):
+        return None
+    return daily_commits_frame(commit_store.daily_counts(repo_name))
+
+
+def activity_complete(activity, username, *args, **kwargs):
+    """Tells whether a result of fetch_commit_activity covers the whole history of every repository."""
+    by_repo, _ = activity
+    return not commit_history_pending(*[f"{username}/{repo_name}" for repo_name in by_repo])
+
+@cached(ttl=3600, complete=activity_complete)
+@timed('fetch')
+def fetch_commit_activity(username, max_items=None, backend=None):
+    """
+    Counts the commits of every repository owned by a user, per repository and per month.
+
+    Commit pages of all repositories are streamed into one CommitAggregator, which keeps
+    only its counters, so the raw commits are never held at once.
+
+    Args:
+        username (str): The GitHub username.
+        max_items (int, optional): Maximum number of commits fetched per repository
+            (defaults to COMMIT_FETCH_LIMIT with the commit store, no limit without it).
+        backend (str, optional): 'rest' or 'graphql' (defaults to GITHUB_BACKEND).
+
+    Returns:
+        tuple: Commits per repository name and commits per month ('YYYY-MM'), or None if
+        the repositories or the commits of any of them could not be fetched. While a
+        history is still being synced (see ``commit_history_pending``) the counts are
+        partial and are not cached.
+    """
+    if (backend or GITHUB_BACKEND) == 'graphql':
+        try:
+            return graphql_backend.commit_activity(username, max_items=max_items)
+        except GitHubError:
+            return None
 
-@st.cache_data(show_spinner=True)
-def fetch_commit_activity(username):
     # Get repos
-    repos_url = f"https://api.github.com/users/{username}/repos?per_page=100&type=owner"
-    headers = {
-        "Authorization": f"token {GITHUB_PAT}"
-    }
-    
-    repos = requests.get(repos_url,headers=headers).json()
-
-    activity_by_repo = {}
-    monthly_commit_data = defaultdict(int)
-
-    for repo in repos:
-        repo_name = repo['name']
-        commits_url = f"https://api.github.com/repos/{username}/{repo_name}/commits?per_page=100"
-        commits = requests.get(commits_url,headers=headers).json()
-        
-        if isinstance(commits, list):
-            activity_by_repo[repo_name] = len(commits)
-            for commit in commits:
-                if commit.get('commit'):
-                    date = commit['commit']['author']['date']
-                    month = pd.to_datetime(date).strftime('%Y-%m')
-                    monthly_commit_data[month] += 1
-
-    return activity_by_repo, dict(monthly_commit_data)
\ No newline at end of file
+    try:
+        repos = [
+            repo for page in github_client.iter_pages(f"users/{username}/repos", params={"type": "owner"})
+            for repo in page
+        ]
+    except GitHubError:
+        return None
+
+    aggregator = CommitAggregator()
+    failed = []
+
+    def count_repo_commits(repo_name):
+        repo_full_name = f"{username}/{repo_name}"
+        if commit_store is None:
+            # Counted into a repository aggregator first, so a failed fetch adds nothing
+            repo_aggregator = CommitAggregator()
+            try:
+                repo_aggregator.add_pages(
+                    github_client.iter_pages(f"repos/{repo_full_name}/commits", max_items=max_items), repo=repo_name
+                )
+            except GitHubError as e:
+                if e.status_code != EMPTY_REPOSITORY:
+                    failed.append(repo_name)
+                return
+            aggregator.update(repo_aggregator)
+            return
+
+        if sync_commit_history(repo_full_name, max_items=commit_limit(max_items)):
+            aggregator.add_day_counts(commit_store.daily_counts(repo_full_name), repo=repo_name)
+        else:
+            failed.append(repo_name)
+
+    # Commits of every repository are synced concurrently
+    github_client.gather(*[(count_repo_commits, repo['name']) for repo in repos])
+
+    # Counts missing some repositories would be cached as if they were complete
+    if failed:
+        return None
+    return aggregator.repo_counts(), aggregator.month_counts()
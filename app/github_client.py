@@ -0,0 +1,338 @@
+"""
+Shared GitHub API client.
+
+Every fetcher goes through this module so that they all share one connection pool
+(HTTP keep-alive, gzip), the same authentication headers and a per-host limit on
+requests in flight. Concurrency is provided by threads behind a synchronous facade:
+``gather`` runs several calls at once and returns their results in order, so the
+Streamlit pages keep calling plain functions.
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.utils import parse_header_links
+
+import metrics
+import records
+from http_cache import ResponseCache
+from rate_limit import RateLimiter, RateLimitExceeded
+
+load_dotenv()
+GITHUB_PAT = os.getenv('PAT_TOKEN')
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+GITHUB_GRAPHQL_URL = os.getenv('GITHUB_GRAPHQL_URL', f"{GITHUB_API_URL}/graphql")
+
+# Number of concurrent requests used when fanning out over several calls
+MAX_WORKERS = int(os.getenv('GITHUB_MAX_WORKERS', '8'))
+
+# Maximum number of requests in flight against a single host
+MAX_PER_HOST = int(os.getenv('GITHUB_MAX_PER_HOST', str(MAX_WORKERS)))
+
+REQUEST_TIMEOUT = float(os.getenv('GITHUB_REQUEST_TIMEOUT', '30'))
+
+# Directory holding the on-disk caches and stores
+CACHE_DIR = os.getenv(
+    'GITHUB_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache'),
+)
+
+# On-disk response cache, set GITHUB_HTTP_CACHE=off to disable it
+HTTP_CACHE_PATH = os.getenv('GITHUB_HTTP_CACHE', os.path.join(CACHE_DIR, 'github_http.sqlite'))
+
+# Seconds a cached response is served before it is revalidated with GitHub
+HTTP_CACHE_TTL = float(os.getenv('GITHUB_HTTP_CACHE_TTL', '300'))
+
+# Cached responses not revalidated for this many seconds are deleted (default one week)
+HTTP_CACHE_MAX_AGE = float(os.getenv('GITHUB_HTTP_CACHE_MAX_AGE', str(7 * 86400)))
+
+# Largest number of cached responses, the oldest are deleted above it
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv('GITHUB_HTTP_CACHE_MAX_ENTRIES', '50000'))
+
+# Number of times a rate-limited request is retried after backing off
+MAX_RETRIES = int(os.getenv('GITHUB_MAX_RETRIES', '3'))
+
+logger = logging.getLogger(__name__)
+
+# Shared keep-alive session, its pool is sized so every worker can hold a connection
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_PER_HOST))
+session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_PER_HOST))
+session.headers.update({
+    "Accept": "application/vnd.github+json",
+    "Accept-Encoding": "gzip, deflate",
+    "X-GitHub-Api-Version": "2022-11-28",
+})
+if GITHUB_PAT:
+    session.headers["Authorization"] = f"Bearer {GITHUB_PAT}"
+
+# Shared by every request so all fetchers draw from the same budgets
+rate_limiter = RateLimiter(authenticated=bool(GITHUB_PAT))
+
+response_cache = ResponseCache(
+    HTTP_CACHE_PATH, ttl=HTTP_CACHE_TTL, max_age=HTTP_CACHE_MAX_AGE, max_entries=HTTP_CACHE_MAX_ENTRIES,
+) if HTTP_CACHE_PATH != 'off' else None
+
+_host_limits = defaultdict(lambda: threading.BoundedSemaphore(MAX_PER_HOST))
+_host_limits_lock = threading.Lock()
+
+
+class GitHubError(Exception):
+    """Raised by ``iter_pages`` and ``graphql`` when a request does not succeed."""
+
+    def __init__(self, response):
+        super().__init__(f"{response.status_code} - {response.text}")
+        self.status_code = response.status_code
+
+
+class GitHubResponse:
+    """
+    Decoded response returned by the client.
+
+    Mirrors the parts of ``requests.Response`` the fetchers use: ``status_code``,
+    ``headers``, ``text`` and ``json()``. Network failures are reported with a
+    ``status_code`` of 0 instead of raising. ``cache`` tells whether the body came
+    from the response cache ('hit', 'revalidated') or from GitHub ('miss').
+    """
+
+    def __init__(self, status_code, headers=None, data=None, text='', cache='miss'):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.data = data
+        self.text = text
+        self.cache = cache
+
+    @property
+    def ok(self):
+        return self.status_code == 200
+
+    @property
+    def next_url(self):
+        """URL of the next page from the ``Link`` header, or None on the last page."""
+        for link in parse_header_links(self.headers.get('Link', '')):
+            if link.get('rel') == 'next':
+                return link['url']
+        return None
+
+    def json(self):
+        return self.data
+
+
+def api_url(path):
+    """Returns the absolute API URL for ``path``, leaving absolute URLs untouched."""
+    if path.startswith('http://') or path.startswith('https://'):
+        return path
+    return f"{GITHUB_API_URL}/{path.lstrip('/')}"
+
+
+def _host_limit(url):
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        return _host_limits[host]
+
+
+def _send(method, url, **kwargs):
+    """
+    Sends a request under the rate limiter, retrying rate-limited responses.
+
+    Returns:
+        requests.Response, or a GitHubResponse when the request could not be sent.
+    """
+    resource = rate_limiter.resource_for(url)
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            rate_limiter.acquire(resource)
+        except RateLimitExceeded as e:
+            logger.warning("Skipping request to %s: %s", url, e)
+            return GitHubResponse(429, text=str(e))
+
+        with _host_limit(url):
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+            except requests.RequestException as e:
+                rate_limiter.release(resource)
+                metrics.inc('github_requests_total', resource=resource, status='error')
+                logger.warning("Request to %s failed: %s", url, e)
+                return GitHubResponse(0, text=str(e))
+
+        _record(resource, response, time.perf_counter() - start)
+        rate_limiter.update(resource, response.headers)
+
+        # A back-off blocks the resource, so the next acquire() waits it out
+        delay = rate_limiter.backoff(resource, response, attempt)
+        if delay is None or attempt == MAX_RETRIES:
+            break
+
+    return response
+
+
+def _record(resource, response, seconds):
+    metrics.observe('github_request_seconds', seconds, resource=resource)
+    metrics.inc('github_requests_total', resource=resource, status=response.status_code)
+    metrics.inc('github_response_bytes_total', len(response.content), resource=resource)
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is not None:
+        metrics.set_gauge('github_rate_limit_remaining', int(remaining), resource=resource)
+
+
+def get(path, params=None):
+    """
+    Sends a GET request to the GitHub API.
+
+    Args:
+        path (str): API path (e.g. "users/octocat") or an absolute URL returned by the API.
+        params (dict, optional): Query string parameters.
+
+    Returns:
+        GitHubResponse: The decoded response.
+    """
+    url = api_url(path)
+
+    cache_key = cached = None
+    if response_cache is not None:
+        cache_key = response_cache.key(url, params)
+        cached = response_cache.lookup(cache_key)
+        if cached is not None and cached.is_fresh(response_cache.ttl):
+            response_cache.record('hit')
+            metrics.inc('github_http_cache_total', outcome='hit')
+            return GitHubResponse(200, cached.headers, records.loads(cached.body), cached.body, cache='hit')
+        conditional_headers = response_cache.conditional_headers(cached)
+    else:
+        conditional_headers = {}
+
+    response = _send('GET', url, params=params, headers=conditional_headers)
+    if isinstance(response, GitHubResponse):
+        return response
+
+    if response.status_code == 304 and cached is not None:
+        response_cache.touch(cache_key)
+        response_cache.record('revalidated')
+        metrics.inc('github_http_cache_total', outcome='revalidated')
+        headers = {**cached.headers, **response.headers}
+        return GitHubResponse(200, headers, records.loads(cached.body), cached.body, cache='revalidated')
+
+    data = None
+    if response.status_code == 200:
+        data = records.loads(response.content)
+        if response_cache is not None:
+            response_cache.record('miss')
+            metrics.inc('github_http_cache_total', outcome='miss')
+            response_cache.store(cache_key, response.text, response.headers)
+    else:
+        logger.warning("GitHub API error for %s: %s - %s", url, response.status_code, response.text)
+
+    return GitHubResponse(response.status_code, response.headers, data, response.text)
+
+
+def graphql(query, variables=None):
+    """
+    Sends a query to the GitHub GraphQL API.
+
+    Args:
+        query (str): The GraphQL query.
+        variables (dict, optional): Values of the query variables.
+
+    Returns:
+        dict: The ``data`` of the response.
+
+    Raises:
+        GitHubError: If the request fails or the response reports errors.
+    """
+    response = _send('POST', GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables or {}})
+    if isinstance(response, GitHubResponse):
+        raise GitHubError(response)
+
+    body = records.loads(response.content) if response.status_code == 200 else None
+    if body is None or body.get('errors'):
+        logger.warning("GitHub GraphQL error: %s - %s", response.status_code, response.text)
+        raise GitHubError(GitHubResponse(response.status_code, response.headers, body, response.text))
+    return body['data']
+
+
+def iter_pages(path, params=None, max_items=None, since=None, per_page=100, record=None):
+    """
+    Streams the pages of a paginated endpoint by following ``Link: rel=next`` headers.
+
+    Only one page is held at a time, so callers can aggregate arbitrarily long lists
+    (e.g. 100k+ commits) in bounded memory.
+
+    Args:
+        path (str): API path or absolute URL of the first page.
+        params (dict, optional): Query string parameters of the first page.
+        max_items (int, optional): Stop once this many items have been yielded.
+        since (str, optional): ISO 8601 timestamp passed as the ``since`` parameter.
+        per_page (int): Items per page (GitHub allows at most 100).
+        record (type, optional): NamedTuple of records.py the items are projected onto.
+
+    Yields:
+        list: The items of each page (the ``items`` of search responses), as ``record``
+        instances if given.
+
+    Raises:
+        GitHubError: If a page cannot be fetched.
+    """
+    params = dict(params or {})
+    # URLs taken from a Link header already carry their query string
+    if '?' not in path:
+        params.setdefault("per_page", per_page)
+    if since is not None:
+        params["since"] = since
+
+    url, count = path, 0
+    while url:
+        response = get(url, params=params)
+        if response.status_code != 200:
+            raise GitHubError(response)
+
+        data = response.json()
+        items = data.get('items', []) if isinstance(data, dict) else data
+        if record is not None:
+            items = records.project(items, record)
+        if max_items is not None and count + len(items) >= max_items:
+            yield items[:max_items - count]
+            return
+        count += len(items)
+        yield items
+
+        # The next link already carries every query parameter
+        url, params = response.next_url, None
+
+
+def rate_limit_budget():
+    """Returns the current state of the shared rate-limit budgets (see RateLimiter.budget)."""
+    return rate_limiter.budget()
+
+
+def cache_stats():
+    """Returns the hit / revalidated / miss counters of the response cache."""
+    if response_cache is None:
+        return {}
+    return response_cache.stats()
+
+
+def gather(*calls, max_workers=None):
+    """
+    Runs several calls concurrently and returns their results in order.
+
+    Args:
+        *calls: Tuples of ``(function, *args)``.
+        max_workers (int, optional): Number of threads (defaults to MAX_WORKERS).
+
+    Returns:
+        list: The return value of each call, in the order the calls were given.
+    """
+    if not calls:
+        return []
+    workers = min(len(calls), max_workers or MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, *args) for func, *args in calls]
+        return [future.result() for future in futures]
@@ -0,0 +1,161 @@
+"""
+GraphQL (v4) backend for the profile and repository fetchers.
+
+The REST fetchers need one request per repository for languages and at least one
+per repository for commits. Here a single cursor-paginated query returns up to 100
+repositories with their language sizes, or with their commit history count and the
+first 100 commit dates; only repositories with longer histories need follow-up
+queries. Results have exactly the shapes the REST fetchers return, and an unknown
+user or repository raises GitHubError (404) as the REST routes do.
+
+Contributor lists have no GraphQL equivalent and stay on REST.
+"""
+from collections import defaultdict
+
+import github_client
+from commit_aggregator import CommitAggregator
+from data_preprocess import daily_commits_frame
+from github_client import GitHubError, GitHubResponse
+
+USER_LANGUAGES_QUERY = """
+query($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        languages(first: 100) { edges { size node { name } } }
+      }
+    }
+  }
+}
+"""
+
+USER_COMMITS_QUERY = """
+query($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 50, after: $cursor, ownerAffiliations: OWNER) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(first: 100) {
+                totalCount
+                pageInfo { hasNextPage endCursor }
+                nodes { authoredDate }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+REPOSITORY_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: 100, after: $cursor) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
+            nodes { authoredDate }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _not_found(kind, name):
+    return GitHubError(GitHubResponse(404, text=f"Could not resolve to a {kind} with the name '{name}'."))
+
+
+def _iter_user_repositories(query, login):
+    cursor = None
+    while True:
+        data = github_client.graphql(query, {"login": login, "cursor": cursor})
+        if data.get('user') is None:
+            raise _not_found('User', login)
+        repositories = data['user']['repositories']
+        yield from repositories['nodes']
+        if not repositories['pageInfo']['hasNextPage']:
+            return
+        cursor = repositories['pageInfo']['endCursor']
+
+
+def _history(repository):
+    branch = repository.get('defaultBranchRef')
+    if not branch or not branch.get('target'):
+        return None
+    return branch['target'].get('history')
+
+
+def _iter_history_pages(owner, name, history=None, max_items=None):
+    """Yields lists of authored dates, starting from an already fetched first page if given."""
+    count, cursor = 0, None
+    while True:
+        if history is None:
+            data = github_client.graphql(REPOSITORY_HISTORY_QUERY, {"owner": owner, "name": name, "cursor": cursor})
+            if data.get('repository') is None:
+                raise _not_found('Repository', f"{owner}/{name}")
+            history = _history(data['repository'])
+            if history is None:
+                return
+
+        dates = [node['authoredDate'] for node in history['nodes']]
+        if max_items is not None and count + len(dates) >= max_items:
+            yield dates[:max_items - count]
+            return
+        count += len(dates)
+        yield dates
+
+        if not history['pageInfo']['hasNextPage']:
+            return
+        cursor, history = history['pageInfo']['endCursor'], None
+
+
+def user_most_used_languages(username):
+    """GraphQL version of ``fetch_user_most_used_languages``: bytes of code per language."""
+    language_totals = defaultdict(int)
+    for repository in _iter_user_repositories(USER_LANGUAGES_QUERY, username):
+        for edge in repository['languages']['edges']:
+            language_totals[edge['node']['name']] += edge['size']
+    return dict(language_totals)
+
+
+def commit_activity(username, max_items=None):
+    """GraphQL version of ``fetch_commit_activity``: commits per repository and per month."""
+    aggregator = CommitAggregator()
+
+    repositories = [
+        (repository['name'], _history(repository))
+        for repository in _iter_user_repositories(USER_COMMITS_QUERY, username)
+    ]
+
+    def count_repo_commits(name, history):
+        repo_aggregator = CommitAggregator()
+        for dates in _iter_history_pages(username, name, history, max_items=max_items):
+            repo_aggregator.add_dates(dates, repo=name)
+        aggregator.update(repo_aggregator)
+
+    # Only repositories with more than one page of history need follow-up queries
+    calls = [(count_repo_commits, name, history) for name, history in repositories if history is not None]
+    github_client.gather(*calls)
+
+    return aggregator.repo_counts(), aggregator.month_counts()
+
+
+def commits_over_time(repo_name, max_items=None):
+    """GraphQL version of ``total_commits_over_time``: commits per day."""
+    owner, name = repo_name.split('/', 1)
+    aggregator = CommitAggregator()
+    for dates in _iter_history_pages(owner, name, max_items=max_items):
+        aggregator.add_dates(dates)
+    return daily_commits_frame(aggregator.day_counts())
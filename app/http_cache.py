@@ -0,0 +1,184 @@
+"""
+Persistent HTTP cache for GitHub API responses.
+
+Responses are stored in SQLite, keyed by URL and query parameters, together with
+their ``ETag`` and ``Last-Modified`` validators. A response younger than the TTL is
+served straight from disk; an older one is revalidated with ``If-None-Match`` /
+``If-Modified-Since`` and, on a ``304 Not Modified`` (which GitHub does not count
+against the rate limit), served from disk again. Responses not stored or revalidated
+for ``max_age`` seconds are deleted, and so are the oldest ones above ``max_entries``,
+every ``PRUNE_EVERY`` inserts.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+# Response headers kept alongside a cached body
+STORED_HEADERS = ('ETag', 'Last-Modified', 'Link', 'Content-Type')
+
+# Number of inserts between two prunes of old responses
+PRUNE_EVERY = 100
+
+
+class CachedResponse:
+    """A response read back from the cache."""
+
+    def __init__(self, body, headers, stored_at):
+        self.body = body
+        self.headers = headers
+        self.stored_at = stored_at
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored_at < ttl
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of GitHub responses and their validators.
+
+    Args:
+        path (str): Path of the SQLite database file (created if missing).
+        ttl (float): Seconds during which a stored response is served without revalidation.
+        max_age (float, optional): Seconds after which a response that was neither stored
+            nor revalidated is deleted, None to keep it.
+        max_entries (int, optional): Number of responses kept, the oldest are deleted
+            above it, None for no limit.
+    """
+
+    def __init__(self, path, ttl=60, max_age=None, max_entries=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.pruned = 0
+        self._inserts = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL, headers TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(url, params=None):
+        """Builds the cache key of a request from its URL and sorted query parameters."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def lookup(self, key):
+        """Returns the stored response for ``key``, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, headers, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[0], json.loads(row[1]), row[2])
+
+    def conditional_headers(self, entry):
+        """Returns the If-None-Match / If-Modified-Since headers to revalidate ``entry``."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key, body, headers):
+        """Stores a 200 response if it carries a validator."""
+        headers = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        if 'ETag' not in headers and 'Last-Modified' not in headers:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, headers, stored_at) VALUES (?, ?, ?, ?)",
+                (key, body, json.dumps(headers), time.time()),
+            )
+            self._inserts += 1
+            if self._inserts % PRUNE_EVERY == 0:
+                self._prune()
+            self._conn.commit()
+
+    def prune(self):
+        """Deletes the responses older than ``max_age`` and the oldest above ``max_entries``."""
+        with self._lock:
+            self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        deleted = 0
+        if self.max_age is not None:
+            deleted += self._conn.execute(
+                "DELETE FROM responses WHERE stored_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+        if self.max_entries is not None:
+            deleted += self._conn.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        self.pruned += deleted
+
+    def touch(self, key):
+        """Marks a revalidated response as fresh again."""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def record(self, outcome):
+        """Counts a lookup outcome: 'hit', 'revalidated' or 'miss'."""
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+            elif outcome == 'revalidated':
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Number of hits (served without a request), revalidations (304s),
+            misses (full downloads), stored entries and entries pruned.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "entries": entries,
+                "pruned": self.pruned,
+            }
+
+    def clear(self):
+        """Deletes every stored response and resets the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = self.revalidated = self.misses = self.pruned = 0
@@ -0,0 +1,108 @@
+"""
+Open issue and pull request counts of a repository over time.
+
+The Repository page plots the cumulative number of open issues and pull requests by
+creation date, which needs creation dates, not item bodies. A first search request
+(``is:open``, oldest first, one result) returns the number of open items and the
+creation date of the oldest one. Small repositories then list their open items with
+``state=open`` and count them per day. The issues list also returns the open pull
+requests, so for issues the listing is sized by the open issues plus the open pull
+requests. Above ``list_limit`` listed items, the items are not fetched at all: each
+window of ``bucket_months`` months since the oldest open item is counted by one
+search request, and only its ``total_count`` is read.
+"""
+from collections import Counter
+from datetime import date
+
+import github_client
+from github_client import GitHubError
+
+# Search qualifier of each item type
+SEARCH_TYPES = {'issues': 'is:issue', 'pulls': 'is:pr'}
+
+
+def search_open(repo, type, start=None, end=None):
+    """
+    Counts the open items of ``repo`` created between ``start`` and ``end`` (inclusive).
+
+    Returns:
+        tuple: The number of matching items and the creation date of the oldest one
+        (None if there is none).
+
+    Raises:
+        GitHubError: If the search request fails.
+    """
+    query = f"repo:{repo} {SEARCH_TYPES[type]} is:open"
+    if start is not None:
+        query += f" created:{start.isoformat()}..{end.isoformat()}"
+    params = {"q": query, "sort": "created", "order": "asc", "per_page": 1}
+    response = github_client.get("search/issues", params=params)
+    if response.status_code != 200:
+        raise GitHubError(response)
+
+    data = response.json()
+    items = data.get('items') or []
+    return data.get('total_count', 0), items[0]['created_at'] if items else None
+
+
+def list_open_days(repo, type):
+    """
+    Lists the open items of ``repo`` and counts them per creation day.
+
+    Raises:
+        GitHubError: If a page cannot be fetched.
+    """
+    day_counts = Counter()
+    params = {"state": "open", "sort": "created", "direction": "asc"}
+    for page in github_client.iter_pages(f"repos/{repo}/{type}", params=params):
+        # The issues list also returns the pull requests
+        day_counts.update(
+            item['created_at'][:10] for item in page if type == 'pulls' or 'pull_request' not in item
+        )
+    return sorted(day_counts.items())
+
+
+def month_windows(start, end, months):
+    """Splits ``start``..``end`` into windows of ``months`` calendar months, the last one cut at ``end``."""
+    windows = []
+    window_start = start.replace(day=1)
+    while window_start <= end:
+        index = window_start.year * 12 + window_start.month - 1 + months
+        next_start = date(index // 12, index % 12 + 1, 1)
+        windows.append((max(window_start, start), min(date.fromordinal(next_start.toordinal() - 1), end)))
+        window_start = next_start
+    return windows
+
+
+def open_item_counts(repo, type, list_limit=1000, bucket_months=12):
+    """
+    Counts the open issues or pull requests of ``repo`` by creation date.
+
+    Args:
+        repo (str): Full name of the repository ("owner/repo").
+        type (str): 'issues' or 'pulls'.
+        list_limit (int): Largest number of open items the list endpoint returns (issues
+            and pull requests for 'issues') for them to be listed instead of counted by
+            search windows.
+        bucket_months (int): Months per search window above ``list_limit``.
+
+    Returns:
+        list: ``(day, count)`` pairs, oldest first, with days as 'YYYY-MM-DD': creation
+        days when listed, or the last day of each search window.
+
+    Raises:
+        GitHubError: If a request fails.
+    """
+    if type == 'issues':
+        # Listing the issues pages through the open pull requests as well
+        (total, oldest), (pulls, _) = github_client.gather((search_open, repo, 'issues'), (search_open, repo, 'pulls'))
+    else:
+        (total, oldest), pulls = search_open(repo, type), 0
+    if total == 0:
+        return []
+    if total + pulls <= list_limit:
+        return list_open_days(repo, type)
+
+    windows = month_windows(date.fromisoformat(oldest[:10]), date.today(), bucket_months)
+    results = github_client.gather(*[(search_open, repo, type, start, end) for start, end in windows])
+    return [(end.isoformat(), count) for (_, end), (count, _) in zip(windows, results) if count]
@@ -0,0 +1,212 @@
+"""
+Lightweight timing and request metrics.
+
+Fetchers, preprocessing functions and chart builders are wrapped with ``timed``,
+which records their latency in the ``dashboard_phase_seconds`` histogram. The GitHub
+client records request latency, status codes, bytes received, rate-limit remaining
+and HTTP cache outcomes, and the fetch cache records its hits and misses.
+
+The metrics are kept in this process and rendered in the Prometheus text format by
+``render``. Set METRICS_PORT to serve them on ``http://<host>:<port>/metrics``, and
+DEBUG_PANEL=1 (or open a page with ``?debug=1``) to show them below every page.
+"""
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = os.getenv('METRICS_PORT')
+DEBUG_PANEL = os.getenv('DEBUG_PANEL', '0') == '1'
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HELP = {
+    'dashboard_phase_seconds': ('histogram', "Time spent in fetchers, preprocessing and chart builders."),
+    'github_request_seconds': ('histogram', "Latency of GitHub API requests."),
+    'github_requests_total': ('counter', "GitHub API responses by status code."),
+    'github_response_bytes_total': ('counter', "Bytes received from the GitHub API."),
+    'github_rate_limit_remaining': ('gauge', "Requests left in the current rate-limit window."),
+    'github_http_cache_total': ('counter', "HTTP cache lookups by outcome."),
+    'fetch_cache_total': ('counter', "Fetch cache lookups by fetcher and outcome."),
+}
+
+_lock = threading.Lock()
+_values = {}
+# Last spans recorded, as (finished at, phase, name, seconds), for the debug panel
+recent_spans = deque(maxlen=500)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(metric, value=1, /, **labels):
+    """Adds ``value`` to a counter."""
+    key = _labels(labels)
+    with _lock:
+        series = _values.setdefault(metric, {})
+        series[key] = series.get(key, 0) + value
+
+
+def set_gauge(metric, value, /, **labels):
+    """Sets a gauge."""
+    with _lock:
+        _values.setdefault(metric, {})[_labels(labels)] = value
+
+
+def observe(metric, value, /, **labels):
+    """Records ``value`` in a histogram."""
+    key = _labels(labels)
+    with _lock:
+        series = _values.setdefault(metric, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = {'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0}
+        index = bisect.bisect_left(BUCKETS, value)
+        if index < len(BUCKETS):
+            histogram['buckets'][index] += 1
+        histogram['count'] += 1
+        histogram['sum'] += value
+
+
+@contextmanager
+def span(phase, name):
+    """Times a block as ``dashboard_phase_seconds{phase, name}``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        observe('dashboard_phase_seconds', seconds, phase=phase, name=name)
+        recent_spans.append((time.time(), phase, name, seconds))
+
+
+def timed(phase):
+    """Decorates a function so every call is recorded as a span of ``phase``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(phase, func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Returns a copy of every metric: ``{name: {labels tuple: value or histogram dict}}``."""
+    with _lock:
+        return {
+            name: {key: dict(value, buckets=list(value['buckets'])) if isinstance(value, dict) else value
+                   for key, value in series.items()}
+            for name, series in _values.items()
+        }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def render():
+    """Renders every metric in the Prometheus text exposition format."""
+    lines = []
+    for name, series in sorted(snapshot().items()):
+        kind, text = HELP.get(name, ('untyped', name))
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series.items()):
+            if kind != 'histogram':
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, value['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        payload = render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+_server = None
+
+
+def start_server(port=None):
+    """
+    Serves ``/metrics`` on ``port`` (default METRICS_PORT) from a background thread.
+
+    Does nothing if the server already runs in this process, or if no port is set.
+    """
+    global _server
+    port = port or METRICS_PORT
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        try:
+            _server = ThreadingHTTPServer(('', int(port)), _MetricsHandler)
+        except OSError as e:
+            logger.warning("Metrics server not started on port %s: %s", port, e)
+            return None
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def debug_panel():
+    """
+    Shows the timings of this process below a page: when DEBUG_PANEL=1 is set or
+    the page is opened with ``?debug=1``.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    if not DEBUG_PANEL and st.query_params.get('debug') != '1':
+        return
+
+    with st.expander("Debug: timings and GitHub usage", expanded=False):
+        phases = snapshot().get('dashboard_phase_seconds', {})
+        rows = [
+            {**dict(labels), 'calls': value['count'], 'total s': value['sum'],
+             'mean ms': value['sum'] / value['count'] * 1000}
+            for labels, value in phases.items()
+        ]
+        if rows:
+            st.dataframe(pd.DataFrame(rows).sort_values('total s', ascending=False), hide_index=True)
+
+        spans = pd.DataFrame(list(recent_spans)[-50:][::-1], columns=['finished at', 'phase', 'name', 'seconds'])
+        spans['finished at'] = pd.to_datetime(spans['finished at'], unit='s')
+        st.dataframe(spans, hide_index=True)
+        st.code(render(), language='text')
+
+
+# The server is started once per process, by the first page that imports this module
+start_server()
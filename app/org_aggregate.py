@@ -0,0 +1,89 @@
+"""
+Aggregation of many users' activity into an organization leaderboard.
+
+The per-user results of ``fetch_user_most_used_languages`` and ``fetch_commit_activity``
+are summarized in chunks by ``summarize_users``, which only needs pandas so it can run
+in a process pool, and the chunk summaries are then added up by ``combine``. Nothing
+here talks to GitHub.
+"""
+import pandas as pd
+
+LEADERBOARD_COLUMNS = [
+    'Login', 'Commits', 'Recent Commits', 'Active Months', 'Repositories', 'Top Language', 'Code Bytes',
+]
+
+
+def summarize_users(users, recent_since):
+    """
+    Summarizes one chunk of users.
+
+    Args:
+        users (list): ``(login, languages, activity)`` tuples, where ``languages`` is the
+            result of ``fetch_user_most_used_languages`` and ``activity`` the result of
+            ``fetch_commit_activity`` (users whose fetches failed are left out by the caller).
+        recent_since (str): First month ('YYYY-MM') counted in 'Recent Commits'.
+
+    Returns:
+        tuple: The leaderboard rows of the chunk, its ``Login`` / ``Language`` / ``Bytes``
+        rows and its ``Login`` / ``Month`` / ``Commits`` rows, as DataFrames.
+    """
+    language_rows, month_rows, repositories = [], [], {}
+    for login, languages, activity in users:
+        language_rows.extend((login, language, size) for language, size in (languages or {}).items())
+        activity_by_repo, monthly_commit_data = activity or ({}, {})
+        month_rows.extend((login, month, count) for month, count in monthly_commit_data.items())
+        repositories[login] = sum(1 for count in activity_by_repo.values() if count)
+
+    language_bytes = pd.DataFrame(language_rows, columns=['Login', 'Language', 'Bytes'])
+    monthly_commits = pd.DataFrame(month_rows, columns=['Login', 'Month', 'Commits'])
+
+    leaderboard = pd.DataFrame({'Login': list(repositories)}).set_index('Login')
+    by_login = monthly_commits.groupby('Login')
+    leaderboard['Commits'] = by_login['Commits'].sum()
+    leaderboard['Recent Commits'] = (
+        monthly_commits[monthly_commits['Month'] >= recent_since].groupby('Login')['Commits'].sum()
+    )
+    leaderboard['Active Months'] = by_login['Month'].nunique()
+    leaderboard['Repositories'] = pd.Series(repositories)
+    if not language_bytes.empty:
+        top = language_bytes.loc[language_bytes.groupby('Login')['Bytes'].idxmax()]
+        leaderboard['Top Language'] = top.set_index('Login')['Language']
+        leaderboard['Code Bytes'] = language_bytes.groupby('Login')['Bytes'].sum()
+    else:
+        leaderboard['Top Language'] = None
+        leaderboard['Code Bytes'] = 0
+
+    counts = ['Commits', 'Recent Commits', 'Active Months', 'Repositories', 'Code Bytes']
+    leaderboard[counts] = leaderboard[counts].fillna(0).astype('int64')
+    return leaderboard.reset_index()[LEADERBOARD_COLUMNS], language_bytes, monthly_commits
+
+
+def combine(summaries):
+    """
+    Adds up chunk summaries (see ``summarize_users``).
+
+    Returns:
+        dict: ``leaderboard`` (one row per user, ranked by commits then recent commits),
+        ``languages`` (bytes and users per language, largest first) and ``monthly``
+        (commits and active users per month, oldest first).
+    """
+    leaderboards, language_bytes, monthly_commits = (pd.concat(parts, ignore_index=True) for parts in zip(*summaries))
+
+    leaderboard = leaderboards.sort_values(['Commits', 'Recent Commits', 'Login'], ascending=[False, False, True])
+    leaderboard.insert(0, 'Rank', range(1, len(leaderboard) + 1))
+
+    languages = (
+        language_bytes.groupby('Language')
+        .agg(Bytes=('Bytes', 'sum'), Users=('Login', 'nunique'))
+        .sort_values('Bytes', ascending=False)
+        .reset_index()
+    )
+    languages['Share'] = languages['Bytes'] / languages['Bytes'].sum()
+
+    monthly = (
+        monthly_commits[monthly_commits['Commits'] > 0].groupby('Month')
+        .agg(Commits=('Commits', 'sum'), **{'Active Users': ('Login', 'nunique')})
+        .sort_index()
+        .reset_index()
+    )
+    return {'leaderboard': leaderboard.reset_index(drop=True), 'languages': languages, 'monthly': monthly}
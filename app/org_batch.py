@@ -0,0 +1,182 @@
+"""
+Batch mode: activity leaderboard and language mix of an organization or a list of logins.
+
+Instead of running the Profile page once per engineer, the languages and commit
+activity of every user are fetched through the cached fetchers, a chunk of users at
+a time. Chunks wait while the core rate-limit budget is low (as the refresher does),
+so the batch leaves part of the budget to live pages. The pandas work then runs
+inline, or over a process pool, one chunk of users per task, for batches large enough
+to repay starting it (see org_aggregate.py).
+
+Usage:
+    python app/org_batch.py --org ORG [--team SLUG] [--top 20] [--output-dir results/]
+    python app/org_batch.py --logins alice bob carol
+    python app/org_batch.py --file logins.txt
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import fetch_data
+import github_client
+import org_aggregate
+from metrics import timed
+from refresher import budget_wait
+
+logger = logging.getLogger(__name__)
+
+# Users fetched at once; each user's repositories are fanned out further by the fetchers
+FETCH_CHUNK_SIZE = int(os.getenv('ORG_BATCH_FETCH_CHUNK', '16'))
+
+# Users summarized per process pool task
+AGGREGATE_CHUNK_SIZE = int(os.getenv('ORG_BATCH_AGGREGATE_CHUNK', '100'))
+
+# Users above which the summaries run in a process pool (with more than one CPU).
+# Spawning the workers and pickling the chunks costs about 1.4s plus 0.08ms per user,
+# against 0.19ms per user of inline pandas work: with 4 CPUs the pool only wins above
+# about 22,000 users (500 users took 0.08s inline and 1.5s in the pool).
+POOL_MIN_USERS = int(os.getenv('ORG_BATCH_POOL_MIN_USERS', '25000'))
+
+# Months counted as recent activity in the leaderboard
+RECENT_MONTHS = 12
+
+
+def resolve_logins(org=None, team=None, logins=()):
+    """
+    Returns the logins to rank: the members of ``org`` (or of its ``team``) followed by
+    ``logins``, without duplicates.
+
+    Raises:
+        ValueError: If the members of ``org`` could not be fetched.
+    """
+    members = []
+    if org:
+        members = fetch_data.fetch_org_members.memoized(org, team)
+        if members is None:
+            raise ValueError(f"Could not fetch the members of {org}{'/' + team if team else ''}.")
+    return list(dict.fromkeys([*members, *logins]))
+
+
+def fetch_user_activity(login, backend=None):
+    """Returns ``(login, languages, activity)`` for one user, from the cached fetchers."""
+    languages = fetch_data.fetch_user_most_used_languages.memoized(login, backend=backend)
+    activity = fetch_data.fetch_commit_activity.memoized(login, backend=backend)
+    return login, languages, activity
+
+
+@timed('fetch')
+def fetch_users(logins, backend=None, progress=None):
+    """
+    Fetches the languages and commit activity of every user.
+
+    Args:
+        logins (list): GitHub logins.
+        backend (str, optional): 'rest' or 'graphql' (defaults to GITHUB_BACKEND).
+        progress (callable, optional): Called with ``(users done, users total)`` after every chunk.
+
+    Returns:
+        list: ``(login, languages, activity)`` tuples, in the order of ``logins``.
+    """
+    users = []
+    for start in range(0, len(logins), FETCH_CHUNK_SIZE):
+        wait = budget_wait('core')
+        if wait > 0:
+            logger.info("Waiting %.0fs for the 'core' budget", wait)
+            time.sleep(wait)
+
+        chunk = logins[start:start + FETCH_CHUNK_SIZE]
+        users.extend(github_client.gather(*[(fetch_user_activity, login, backend) for login in chunk],
+                                          max_workers=len(chunk)))
+        if progress is not None:
+            progress(len(users), len(logins))
+    return users
+
+
+@timed('preprocess')
+def summarize(users, processes=None):
+    """
+    Builds the leaderboard, language mix and monthly commits of ``users``.
+
+    Chunks of AGGREGATE_CHUNK_SIZE users are summarized inline, or in a process pool
+    above POOL_MIN_USERS users when there is more than one CPU; workers are spawned, so
+    they do not inherit the threads of a running server.
+
+    Args:
+        users (list): ``(login, languages, activity)`` tuples (see ``fetch_users``).
+        processes (int, optional): Size of the process pool. By default the pool has one
+            worker per CPU and is only used above POOL_MIN_USERS users; 1 always runs
+            inline and a larger number always uses the pool.
+
+    Returns:
+        dict: See ``org_aggregate.combine``, plus ``failed``: the ``Login`` of the users whose
+        languages or activity could not be fetched, who are left out of the rest.
+    """
+    failed = [login for login, languages, activity in users if languages is None or activity is None]
+    users = [user for user in users if user[1] is not None and user[2] is not None]
+
+    recent_since = str(pd.Period.now('M') - (RECENT_MONTHS - 1))
+    chunks = [users[i:i + AGGREGATE_CHUNK_SIZE] for i in range(0, len(users), AGGREGATE_CHUNK_SIZE)] or [[]]
+
+    if processes is None:
+        processes = (os.cpu_count() or 1) if len(users) > POOL_MIN_USERS else 1
+    if len(chunks) == 1 or processes <= 1:
+        summaries = [org_aggregate.summarize_users(chunk, recent_since) for chunk in chunks]
+    else:
+        workers = min(len(chunks), processes)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            summaries = list(pool.map(org_aggregate.summarize_users, chunks, [recent_since] * len(chunks)))
+    return {**org_aggregate.combine(summaries), 'failed': pd.DataFrame({'Login': failed})}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the GitHub activity of an organization or a list of users.")
+    parser.add_argument('--org', help="Organization whose members are ranked")
+    parser.add_argument('--team', help="Only rank the members of this team of --org")
+    parser.add_argument('--logins', nargs='+', default=[], help="Logins to rank")
+    parser.add_argument('--file', help="File with one login per line")
+    parser.add_argument('--processes', type=int, help="Size of the aggregation process pool (1 runs inline)")
+    parser.add_argument('--top', type=int, default=20, help="Leaderboard rows to print")
+    parser.add_argument('--output-dir', help="Write leaderboard.csv, languages.csv and monthly.csv here")
+    args = parser.parse_args(argv)
+
+    logins = list(args.logins)
+    if args.file:
+        with open(args.file) as f:
+            logins += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if args.team and not args.org:
+        parser.error("--team needs --org")
+    if not args.org and not logins:
+        parser.error("give --org, --logins or --file")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        logins = resolve_logins(args.org, args.team, logins)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    start = time.perf_counter()
+    users = fetch_users(logins, progress=lambda done, total: logger.info("Fetched %d/%d users", done, total))
+    results = summarize(users, processes=args.processes)
+    logger.info("Ranked %d users in %.1fs", len(results['leaderboard']), time.perf_counter() - start)
+    if not results['failed'].empty:
+        logger.warning("Could not fetch %d users, they are not ranked: %s",
+                       len(results['failed']), ', '.join(results['failed']['Login']))
+
+    print(results['leaderboard'].head(args.top).to_string(index=False))
+    print()
+    print(results['languages'].head(args.top).to_string(index=False, formatters={'Share': '{:.1%}'.format}))
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, df in results.items():
+            df.to_csv(os.path.join(args.output_dir, f"{name}.csv"), index=False)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
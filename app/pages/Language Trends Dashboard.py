@@ -1,10 +1,10 @@
+import io
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import plotly.express as px
-import matplotlib.pyplot as plt
-from fetch_data import fetch_github_data
-from data_preprocess import preprocess_data,repo_counts_per_language_per_year
+import numpy as np
+from fetch_data import load_language_cube, load_repository_dataset
+from data_preprocess import language_year_cube, popularity_density, preprocess_data
+from metrics import debug_panel, timed
 
 st.set_page_config(
     page_title="Language Trends Dashboard",
@@ -34,75 +34,140 @@ year_range = st.sidebar.slider(
     step=1
 )
 
-uploaded_file = st.sidebar.file_uploader("Upload a CSV file with repository data", type=["csv"])
+uploaded_file = st.sidebar.file_uploader("Upload a CSV or Parquet file with repository data", type=["csv", "parquet"])
+
+@st.cache_data(show_spinner=True)
+def load_uploaded_file(data, name):
+    """Reads an uploaded file once and builds its language x year cube."""
+    if name.endswith('.parquet'):
+        df = pd.read_parquet(io.BytesIO(data))
+    else:
+        df = pd.read_csv(io.BytesIO(data))
+
+    # Files exported from this dashboard are already preprocessed
+    df_processed = df if 'Repository Name' in df.columns else preprocess_data(df)
+    return df_processed, language_year_cube(df_processed)
 
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
+    df_processed, df_cube = load_uploaded_file(uploaded_file.getvalue(), uploaded_file.name)
 else:
-    # Fetching data from GitHub API
-    df = fetch_github_data(start_year=year_range[0], end_year=year_range[1])
-    df = df[df['language'].isin(language)]
-
-# Preprocessed dataframe
-df_processed = preprocess_data(df)
+    # Selected languages and years are read from the local Parquet dataset,
+    # partitions that are not there yet are fetched from the GitHub API first
+    df_processed = load_repository_dataset(year_range[0], year_range[1], language)
+    df_cube = load_language_cube(year_range[0], year_range[1], language)
 
 st.expander("View Raw Data", expanded=False).write(df_processed)
 
-# Grouping repo per year per language 
-df_language_year = repo_counts_per_language_per_year(df_processed)
+# Repo count per year per language, read from the cube
+df_language_year = df_cube[['Language', 'Year', 'Repo Count']]
 
 
-def display_repolanguages_per_year(df,start_year, end_year, frame_dir="frames"):
-    st.subheader(f"GitHub Project Per Language Growth: {start_year} to {end_year}")
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def repolanguages_per_year_figure(df, start_year, end_year):
+    """
+    Builds the per-year bar chart once per cube: one Plotly animation frame per year,
+    switched by the chart's own slider in the browser, so no figure is rendered on
+    the server when the year changes.
+    """
+    import plotly.express as px
 
-    year = st.slider("Select Year", start_year, end_year, start_year)
+    df = df[df['Year'].between(start_year, end_year)].sort_values('Year')
 
-    yearly_data = df[df['Year'] == year].sort_values(by='Repo Count', ascending=True)
-    
-    fig, ax = plt.subplots(figsize=(16, 10), facecolor='none')
-    fig.patch.set_alpha(0.0)
-    ax.set_facecolor('none')
+    # Same language order and axis range in every frame, most repositories on top
+    order = df.groupby('Language', observed=True)['Repo Count'].sum().sort_values(ascending=False).index.tolist()
 
-    ax.barh(yearly_data['Language'], yearly_data['Repo Count'], color='skyblue')
-    ax.set_title(f'GitHub Repo Growth - {year}', fontsize=20, color='white', pad=50)
-    ax.set_xlabel('Repository Count',color='white', fontsize=16, labelpad=20)
-    ax.set_ylabel('Language', color='white',fontsize=16,labelpad=20)
+    fig = px.bar(df, x='Repo Count', y='Language', orientation='h', animation_frame='Year',
+                 category_orders={'Language': order}, range_x=[0, df['Repo Count'].max() * 1.05],
+                 color_discrete_sequence=['skyblue'], title='GitHub Repo Growth',
+                 labels={'Repo Count': 'Repository Count'})
+    fig.update_layout(height=600)
+    return fig
 
-    ax.tick_params(colors='white')
+@timed('chart')
+def display_repolanguages_per_year(df, start_year, end_year):
+    st.subheader(f"GitHub Project Per Language Growth: {start_year} to {end_year}")
 
-    for spine in ax.spines.values():
-        spine.set_edgecolor('white')
+    if df.empty:
+        st.info("No repositories for the selected languages and years.")
+        return
+    st.plotly_chart(repolanguages_per_year_figure(df, start_year, end_year), use_container_width=True)
 
-    st.pyplot(plt)
+# Up to SVG_POINT_LIMIT repositories are drawn as SVG markers, up to WEBGL_POINT_LIMIT
+# with WebGL, and larger datasets as a log-binned density with the outliers as points
+SVG_POINT_LIMIT = 2000
+WEBGL_POINT_LIMIT = 20000
 
+@timed('chart')
 def popularity_vs_collaboration(df):
     st.subheader("Popularity vs Collaboration of each Repository")
+    st.plotly_chart(popularity_vs_collaboration_figure(df[['Repository Name','Stars','Forks','Language']]),
+                    use_container_width=True)
+
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def popularity_vs_collaboration_figure(df):
+    """Builds the scatter once per set of repositories."""
+    import plotly.express as px
+
+    if len(df) > WEBGL_POINT_LIMIT:
+        fig = popularity_density_figure(df)
+    else:
+        fig = px.scatter(df, x='Stars', y='Forks', color='Language',
+                       hover_name='Repository Name',title='Popularity vs Collaboration',
+                       labels={'Stars': 'Stars', 'Forks': 'Forks'},
+                       color_discrete_sequence=px.colors.qualitative.Plotly,
+                       render_mode='svg' if len(df) <= SVG_POINT_LIMIT else 'webgl')
+
+        fig.update_traces(marker=dict(size=10, line=dict(width=2, color='DarkSlateGrey')), selector=dict(mode='markers'))
+    return fig
+
+@timed('chart')
+def popularity_density_figure(df):
+    """Density of repositories on log Stars/Forks axes, with the sparse outliers drawn as WebGL points."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    counts, star_edges, fork_edges, outliers = popularity_density(df)
+
+    fig = go.Figure(go.Heatmap(
+        z=np.where(counts > 0, counts, np.nan), x=star_edges, y=fork_edges,
+        colorscale='Blues', colorbar=dict(title='Repositories'),
+        hovertemplate='Stars %{x:.0f}, Forks %{y:.0f}: %{z} repositories<extra></extra>',
+    ))
+    colors = px.colors.qualitative.Plotly
+    for i, (language, group) in enumerate(outliers.groupby('Language', observed=True)):
+        fig.add_trace(go.Scattergl(
+            x=group['Stars'].clip(lower=1), y=group['Forks'].clip(lower=1), mode='markers', name=str(language),
+            text=group['Repository Name'], marker=dict(size=7, color=colors[i % len(colors)]),
+            hovertemplate='%{text}<br>Stars %{x}, Forks %{y}<extra></extra>',
+        ))
+    fig.update_layout(
+        title=f'Popularity vs Collaboration ({len(df):,} repositories)',
+        xaxis=dict(type='log', title='Stars'), yaxis=dict(type='log', title='Forks'),
+        legend=dict(x=0, y=1),
+    )
+    return fig
+
+@timed('chart')
+def language_trends_over_years(cube):
+    st.subheader("Language Trends Over the Years")
+    st.plotly_chart(language_trends_figure(cube), use_container_width=True)
 
-    df = df[['Repository Name','Stars','Forks','Language']]
-
-    fig,ax = plt.subplots(figsize=(16, 10), facecolor='none')
-    fig.patch.set_alpha(0.0)
-    ax.set_facecolor('none')
-
-    fig = px.scatter(df, x='Stars', y='Forks', color='Language',
-                   hover_name='Repository Name',title='Popularity vs Collaboration',
-                   labels={'Stars': 'Stars', 'Forks': 'Forks'},
-                   color_discrete_sequence=px.colors.qualitative.Plotly)
-
-    fig.update_traces(marker=dict(size=10, line=dict(width=2, color='DarkSlateGrey')), selector=dict(mode='markers'))
-    st.plotly_chart(fig, use_container_width=True)
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def language_trends_figure(cube):
+    import plotly.express as px
 
-def language_trends_over_years(df):
-    st.subheader("Language Trends Over the Years")
-    
-    df = df[['Year', 'Language', 'Star Growth Rate']].groupby(['Year', 'Language'], as_index=False).agg({'Star Growth Rate': 'sum'})
+    # Summed Star Growth Rate per language and year
+    df = cube[['Year', 'Language', 'Star Growth Rate']].sort_values(['Year', 'Language'])
 
     fig = px.line(df, x='Year', y='Star Growth Rate', color='Language',
                   title='Language Trends Over the Years',
                   markers=True)
 
     fig.update_layout(legend_title_text='Programming Language')
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 col1, col2 = st.columns(2,gap="large")
 
@@ -112,4 +177,6 @@ with col1:
 with col2:
     popularity_vs_collaboration(df_processed)
     
-language_trends_over_years(df_processed)
\ No newline at end of file
+language_trends_over_years(df_cube)
+
+debug_panel()
@@ -0,0 +1,104 @@
+import streamlit as st
+import org_batch
+from metrics import debug_panel, timed
+
+st.set_page_config(
+    page_title="Organization Dashboard",
+    page_icon=":trophy:",
+    layout="wide",
+)
+
+st.title("Organization Leaderboard")
+st.markdown("Ranks the commit activity of every member of an organization or team, or of a list of logins, and shows their combined language mix.")
+
+# The batch only runs when the form is submitted, not on every keystroke
+with st.sidebar.form("team"):
+    org = st.text_input("Organization", value="")
+    team = st.text_input("Team slug (optional)", value="")
+    extra_logins = st.text_area("Additional logins, one per line", value="")
+    st.form_submit_button("Build leaderboard")
+
+logins = [line.strip() for line in extra_logins.splitlines() if line.strip()]
+if not org and not logins:
+    st.sidebar.warning("Please enter an organization or a list of logins.")
+    st.stop()
+
+try:
+    logins = org_batch.resolve_logins(org or None, team or None, logins)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+
+# Users already fetched are served from the fetch cache, so reruns only wait for new ones
+progress = st.progress(0.0, text=f"Fetching {len(logins)} users...")
+users = org_batch.fetch_users(
+    logins, progress=lambda done, total: progress.progress(done / total, text=f"Fetched {done}/{total} users")
+)
+progress.empty()
+
+@st.cache_data(show_spinner="Aggregating...")
+def summarize(users):
+    return org_batch.summarize(users)
+
+results = summarize(users)
+leaderboard, languages, monthly = results['leaderboard'], results['languages'], results['monthly']
+if not results['failed'].empty:
+    st.warning(f"Could not fetch {len(results['failed'])} users, they are not ranked: "
+               f"{', '.join(results['failed']['Login'])}. Rebuild the leaderboard in a moment to retry them.")
+
+col1, col2, col3 = st.columns(3)
+col1.metric("👥 Users", len(leaderboard))
+col2.metric("📝 Commits", int(leaderboard['Commits'].sum()))
+col3.metric("🧑‍💻 Languages", len(languages))
+
+st.subheader("🏆 Leaderboard")
+st.dataframe(leaderboard, hide_index=True, use_container_width=True)
+
+@st.fragment
+@timed('chart')
+def language_mix(languages):
+    st.subheader("Organization Language Mix")
+    if languages.empty:
+        st.write("No language data available.")
+        return
+    top_n = st.slider("Languages shown", min_value=3, max_value=30, value=10, key='org_languages')
+    st.plotly_chart(language_mix_figure(languages, top_n), use_container_width=True)
+
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def language_mix_figure(languages, top_n):
+    import plotly.express as px
+
+    return px.pie(languages.head(top_n), names='Language', values='Bytes', hole=0.4,
+                  hover_data=['Users'], color_discrete_sequence=px.colors.qualitative.Pastel,
+                  title=f"Top {top_n} languages by bytes of code")
+
+@st.fragment
+@timed('chart')
+def monthly_commits(monthly):
+    st.subheader("Monthly Commits")
+    if monthly.empty:
+        st.write("No commit data available.")
+        return
+    st.plotly_chart(monthly_commits_figure(monthly), use_container_width=True)
+
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def monthly_commits_figure(monthly):
+    import plotly.express as px
+
+    return px.line(monthly, x='Month', y=['Commits', 'Active Users'], markers=True,
+                   title="Commits and active users per month", labels={'value': 'Count', 'variable': ''})
+
+col1, col2 = st.columns(2, gap="large")
+
+with col1:
+    language_mix(languages)
+
+with col2:
+    monthly_commits(monthly)
+
+st.download_button("Download leaderboard (CSV)", leaderboard.to_csv(index=False), file_name="leaderboard.csv",
+                   mime="text/csv")
+
+debug_panel()
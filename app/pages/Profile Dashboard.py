@@ -1,8 +1,7 @@
 import streamlit as st
-import requests
 import pandas as pd
-import plotly.express as px
-from fetch_data import fetch_user_data, fetch_user_most_used_languages, fetch_commit_activity
+from fetch_data import commit_history_pending, fetch_concurrently, fetch_user_data, fetch_user_most_used_languages, fetch_commit_activity
+from metrics import debug_panel, timed
 
 st.set_page_config(
     page_title="Your Activity Dashboard",
@@ -17,7 +16,18 @@ if not user_name:
     st.sidebar.warning("Please enter a GitHub username.")
     st.stop()
 
-profile = fetch_user_data(user_name)
+# Profile, languages and commit activity are fetched at the same time
+profile, most_used_lang, commit_activity = fetch_concurrently(
+    (fetch_user_data, user_name),
+    (fetch_user_most_used_languages, user_name),
+    (fetch_commit_activity, user_name),
+)
+if most_used_lang is None or commit_activity is None:
+    st.warning("Part of the activity could not be fetched from GitHub, please try again in a moment.")
+activity_by_repo, monthly_commit_data = commit_activity or ({}, {})
+if commit_history_pending(*[f"{user_name}/{repo}" for repo in activity_by_repo]):
+    st.info("The commit history of some repositories is still loading: the commit counts cover the commits "
+            "fetched so far. Reload the page to fetch more.")
 
 if profile is not None:
     st.subheader("👤 Profile Overview")
@@ -42,63 +52,88 @@ if profile is not None:
 st.write('#####')
 st.subheader("📊 Repository Overview")
 
-most_used_lang =fetch_user_most_used_languages(user_name)
 
+@timed('chart')
+def most_used_languages(most_used_lang):
+    if not most_used_lang:
+        st.write("No data available for the most used languages.")
+        return
+    st.plotly_chart(most_used_languages_figure(most_used_lang), use_container_width=True)
 
-col1, col2 = st.columns(2, gap="medium")
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def most_used_languages_figure(most_used_lang):
+    import plotly.express as px
 
-with col1:
-    if most_used_lang is None:
-        st.write("No data available for the most used languages.")
-    
     df = pd.DataFrame(most_used_lang.items(), columns=['Language', 'Usage'])
 
     # sort value by usage in descending order
     top_languages= df.sort_values(by='Usage', ascending=False).head(6)
 
-    fig = px.pie(
+    return px.pie(
         names=top_languages['Language'],
         values=top_languages['Usage'],
         color_discrete_sequence=px.colors.qualitative.Pastel,
         title="Most used programming languages in your repositories"
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
 
-activity_by_repo, monthly_commit_data = fetch_commit_activity(user_name)
-
-with col2:
-    if activity_by_repo:
-        repo_df = pd.DataFrame({
-            "Repository": list(activity_by_repo.keys()),
-            "Commits": list(activity_by_repo.values())
-        }).sort_values("Commits", ascending=False)
-
-        top_repos = repo_df.head(10)
-
-        fig = px.pie(top_repos, names="Repository", values="Commits", hole=0.4, title="Top 10 Repositories by Commit Count")
-        st.plotly_chart(fig, use_container_width=True)
-    else:
+@timed('chart')
+def top_repositories(activity_by_repo):
+    if not activity_by_repo:
         st.warning("No repository activity found.")
+        return
+    st.plotly_chart(top_repositories_figure(activity_by_repo), use_container_width=True)
 
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def top_repositories_figure(activity_by_repo):
+    import plotly.express as px
 
-# heatmap of daily contributions : weekday vs months
-# commits over time: monthly commits- line chart
-# commits by repository - donut chart
+    repo_df = pd.DataFrame({
+        "Repository": list(activity_by_repo.keys()),
+        "Commits": list(activity_by_repo.values())
+    }).sort_values("Commits", ascending=False)
 
+    top_repos = repo_df.head(10)
 
-# Commits over time
-st.subheader("📈 Monthly Commits Trend")
+    return px.pie(top_repos, names="Repository", values="Commits", hole=0.4, title="Top 10 Repositories by Commit Count")
+
+@timed('chart')
+def monthly_commits(monthly_commit_data):
+    if not monthly_commit_data:
+        st.warning("No commit data found.")
+        return
+    st.plotly_chart(monthly_commits_figure(monthly_commit_data), use_container_width=True)
 
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def monthly_commits_figure(monthly_commit_data):
+    import plotly.express as px
 
-if monthly_commit_data:
     commit_df = pd.DataFrame({
         "Month": list(monthly_commit_data.keys()),
         "Commits": list(monthly_commit_data.values())
     }).sort_values("Month")
 
-    fig = px.line(commit_df, x="Month", y="Commits", markers=True, title="Monthly Commits Over Time")
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.warning("No commit data found.")
+    return px.line(commit_df, x="Month", y="Commits", markers=True, title="Monthly Commits Over Time")
+
+
+col1, col2 = st.columns(2, gap="medium")
+
+with col1:
+    most_used_languages(most_used_lang)
+
+with col2:
+    top_repositories(activity_by_repo)
+
+
+# heatmap of daily contributions : weekday vs months
+# commits over time: monthly commits- line chart
+# commits by repository - donut chart
+
+
+# Commits over time
+st.subheader("📈 Monthly Commits Trend")
+monthly_commits(monthly_commit_data)
 
+debug_panel()
@@ -1,8 +1,7 @@
 import streamlit as st
-from fetch_data import fetch_repository_contributions, fetch_repository_details, fetch_repository_issues_pulls, total_commits_over_time
-from data_preprocess import preprocess_issues_pulls
-import plotly.express as px
-import matplotlib.pyplot as plt
+from fetch_data import commit_history_pending, fetch_concurrently, fetch_open_item_counts, fetch_repository_contributions, fetch_repository_details, total_commits_over_time
+from metrics import debug_panel, timed
+import pandas as pd
 
 st.set_page_config(
     page_title="Repository Dashboard",
@@ -27,85 +26,107 @@ st.write('#####')
 
 repo_data = fetch_repository_details(repo_name)
 
+if repo_data:
+    # Contributors, pull requests, issues and commits are fetched at the same time
+    contributors, open_pull_request, open_issues, commits_over_time = fetch_concurrently(
+        (fetch_repository_contributions, repo_data.contributors_url),
+        (fetch_open_item_counts, repo_name, 'pulls'),
+        (fetch_open_item_counts, repo_name, 'issues'),
+        (total_commits_over_time, repo_name),
+    )
+else:
+    commits_over_time = total_commits_over_time(repo_name)
+
+@timed('chart')
+def top_contributors(contributors):
+    st.subheader("Top Contributors")
+    if not contributors:
+        st.write("No contributors data available.")
+        return
+    st.plotly_chart(top_contributors_figure(contributors), use_container_width=True)
+
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def top_contributors_figure(contributors):
+    import plotly.express as px
+
+    top_contributors = sorted(contributors, key=lambda x: x.contributions, reverse=True)[:7]
+    return px.bar(
+        pd.DataFrame(top_contributors),
+        x='login',
+        y='contributions',
+        labels={'login': 'Contributor', 'contributions': 'Number of Contributions'},
+        color='contributions',
+    )
+
+@timed('chart')
+def open_items(counts, title, empty_message, label):
+    st.subheader(title)
+    if counts is None or counts.empty:
+        st.write(empty_message)
+        return
+    st.plotly_chart(open_items_figure(counts, label), use_container_width=True)
+
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def open_items_figure(counts, label):
+    """Cumulative count of the open items (issues or pull requests) by creation date."""
+    import plotly.express as px
+
+    return px.area(
+        counts,
+        x='Created At',
+        y='Cumulative Count',
+        labels={'Created At': 'Date', 'Cumulative Count': label}
+    )
+
+@timed('chart')
+def commits_over_time_chart(commits_over_time, repo_name):
+    st.subheader("Total Commits Over Time")
+    if commits_over_time is None or commits_over_time.empty:
+        st.write("No commit data available.")
+        return
+    if commit_history_pending(repo_name):
+        st.info("The commit history of this repository is still loading: the chart shows the commits fetched "
+                "so far. Reload the page to fetch more.")
+    st.plotly_chart(commits_over_time_figure(commits_over_time, repo_name), use_container_width=True)
+
+@timed('chart')
+@st.cache_data(show_spinner=False)
+def commits_over_time_figure(commits_over_time, repo_name):
+    import plotly.express as px
+
+    return px.line(commits_over_time, x="day", y="commits",
+                   title=f"Commits Over Time for {repo_name}",
+                   labels={"day": "Date", "commits": "Number of Commits"})
+
 if repo_data:
     # --- Top Metrics Cards ---
     st.markdown("### Repository Overview")
     col1, col2, col3 = st.columns(3)
     
-    col1.metric(":star: Stars", repo_data['stargazers_count'])
-    col2.metric(":fork_and_knife: Forks", repo_data['forks_count'])
-    col3.metric(":eye: Watchers", repo_data['watchers_count'])
+    col1.metric(":star: Stars", repo_data.stargazers_count)
+    col2.metric(":fork_and_knife: Forks", repo_data.forks_count)
+    col3.metric(":eye: Watchers", repo_data.watchers_count)
 
     st.write('#####')
     # Contributions, pr and issues sections
     col1,col2,col3= st.columns(3)
 
     with col1:
-        st.subheader("Top Contributors")
-        contributors = fetch_repository_contributions(repo_data['contributors_url'])
-        if contributors:
-            top_contributors = sorted(contributors, key=lambda x: x['contributions'], reverse=True)[:7]
-            fig = px.bar(
-            top_contributors, 
-            x='login', 
-            y='contributions', 
-            labels={'login': 'Contributor', 'contributions': 'Number of Contributions'},
-            color='contributions',
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.write("No contributors data available.")
+        top_contributors(contributors)
 
     with col2:
-        st.subheader("Cumulative Open Pull Requests")
-        open_pull_request = fetch_repository_issues_pulls(repo_name, type='pulls')
-        if open_pull_request:
-            open_prs = [pr for pr in open_pull_request if pr['state'] == 'open']
-            # open_pr_count = len(open_prs)
-            # st.write(f"Total Open Pull Requests: {open_pr_count}")
-
-            df = preprocess_issues_pulls(open_prs)
-            
-            fig = px.area(
-                df,
-                x='Created At',
-                y='Cumulative Count',
-                # title='Cumulative Open Pull Requests Over Time',
-                labels={'Created At': 'Date', 'Cumulative Count': 'Total Open PRs'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.write("No open pull requests available.")
+        open_items(open_pull_request, "Cumulative Open Pull Requests", "No open pull requests available.",
+                   'Total Open PRs')
 
     with col3:
-        st.subheader("Open Issues Over Time")
-        open_issues = fetch_repository_issues_pulls(repo_name, type='issues')
-        if open_issues:
-            open_issues = [issue for issue in open_issues if issue['state'] == 'open']
-            df = preprocess_issues_pulls(open_issues)
-            
-            fig = px.area(
-                df,
-                x='Created At',
-                y='Cumulative Count',
-                # title='Open Issues Over Time',
-                labels={'Created At': 'Date', 'Cumulative Count': 'Total Open Issues'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.write("No open issues available.")
-
-# commits over time
-commits_over_time = total_commits_over_time(repo_name)
-
+        open_items(open_issues, "Open Issues Over Time", "No open issues available.", 'Total Open Issues')
 
 st.write('#####')
-st.subheader("Total Commits Over Time")
-fig = px.line(commits_over_time, x="day", y="commits", 
-                title=f"Commits Over Time for {repo_name}",
-                labels={"day": "Date", "commits": "Number of Commits"})
-st.plotly_chart(fig, use_container_width=True)
+commits_over_time_chart(commits_over_time, repo_name)
 
 # correlation between languages
 # correlation between language and job
 
+debug_panel()
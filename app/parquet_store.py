@@ -0,0 +1,251 @@
+"""
+Partitioned Parquet dataset of processed repository data.
+
+The Language Trends page used to re-parse CSV text and re-run the datetime
+conversions of ``preprocess_data`` on every rerun. Processed rows are instead written
+once to a Parquet dataset partitioned by ``Year`` and ``Language`` (hive layout, e.g.
+``Year=2020/Language=Python/``) with typed columns. Reads push the year range and
+language selection down to the partition directories, so only the matching files
+are opened, and ``Language`` comes back dictionary-encoded (a pandas category).
+
+Next to the partitions, ``_language_year_cube.parquet`` holds the per (Language, Year)
+aggregates of ``language_year_cube``. It is built once from the whole dataset and
+then updated for the partitions every write replaces, so charts that only need
+aggregates never read the row-level files. (Files starting with ``_`` are skipped
+when pyarrow discovers the dataset.)
+
+Writers (page sessions, server processes and the refresher) take an exclusive lock on
+``_language_year_cube.lock`` around the partition write and the read-modify-write of
+the cube, so concurrent writes of different languages never drop each other's cells.
+
+Usage (convert a processed CSV such as data/processed_data.csv):
+    python app/parquet_store.py data/processed_data.csv [dataset_dir]
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks on Windows, writers are then only serialized within a process
+    fcntl = None
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data_preprocess import CUBE_SUMS, language_year_cube, update_cube
+
+DATASET_PATH = os.getenv(
+    'DATASET_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'processed_data'),
+)
+
+# Partitions written longer ago than this are fetched again by the page
+DATASET_MAX_AGE = float(os.getenv('DATASET_MAX_AGE', '86400'))
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('Year', pa.int16()), ('Language', pa.dictionary(pa.int32(), pa.string()))]),
+    flavor='hive',
+    dictionaries='infer',
+)
+
+CUBE_FILE = '_language_year_cube.parquet'
+
+LOCK_FILE = '_language_year_cube.lock'
+
+_write_lock = threading.Lock()
+
+# Column types of the stored rows (the partition columns are typed by PARTITIONING)
+SCHEMA = pa.schema([
+    ('Repository Name', pa.string()),
+    ('Stars', pa.int32()),
+    ('Forks', pa.int32()),
+    ('Repository URL', pa.string()),
+    ('Created At', pa.timestamp('us', tz='UTC')),
+    ('Updated At', pa.timestamp('us', tz='UTC')),
+    ('Repo age days', pa.int32()),
+    ('Repo age years', pa.float32()),
+    ('Star Growth Rate', pa.float32()),
+    ('Fork Growth Rate', pa.float32()),
+    ('Activity Score', pa.float32()),
+    ('Year', pa.int16()),
+    ('Language', pa.string()),
+])
+
+
+def _encode(value):
+    # Same URI encoding pyarrow applies to hive partition values
+    return quote(str(value), safe='')
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """Holds the write lock of the dataset at ``path``, across threads and processes."""
+    os.makedirs(path, exist_ok=True)
+    with _write_lock, open(os.path.join(path, LOCK_FILE), 'a') as lock_file:
+        if fcntl is not None:
+            # Released when the file is closed
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def write_dataset(df, path=DATASET_PATH):
+    """
+    Writes processed rows to the dataset, replacing the partitions they belong to.
+
+    Args:
+        df (pd.DataFrame): Output of ``preprocess_data``.
+        path (str): Root directory of the dataset.
+    """
+    if df is None or df.empty:
+        return
+    df = df.astype({
+        'Year': 'int16', 'Language': 'string', 'Stars': 'int32', 'Forks': 'int32', 'Repo age days': 'int32',
+        'Repo age years': 'float32', 'Star Growth Rate': 'float32', 'Fork Growth Rate': 'float32',
+        'Activity Score': 'float32',
+    })
+    df['Created At'] = pd.to_datetime(df['Created At'], utc=True)
+    df['Updated At'] = pd.to_datetime(df['Updated At'], utc=True)
+    table = pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+    update = language_year_cube(df)
+    with _locked(path):
+        pq.write_to_dataset(
+            table, path, partition_cols=['Year', 'Language'], existing_data_behavior='delete_matching'
+        )
+
+        # The written partitions were replaced as a whole, and so are their cube cells
+        cube = _read_cube(path)
+        if cube is None:
+            _build_cube(path)
+        else:
+            _write_cube(update_cube(cube, update), path)
+
+
+def load_dataset(path=DATASET_PATH, years=None, languages=None, columns=None):
+    """
+    Reads the rows of the selected years and languages.
+
+    Args:
+        path (str): Root directory of the dataset.
+        years (tuple, optional): Inclusive ``(start_year, end_year)`` range.
+        languages (list, optional): Languages to read, None for all.
+        columns (list, optional): Columns to read, None for all.
+
+    Returns:
+        pd.DataFrame: The matching rows, ``Language`` as a category.
+    """
+    if not os.path.isdir(path):
+        return pd.DataFrame()
+
+    dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+    predicate = None
+    if years is not None:
+        predicate = (ds.field('Year') >= years[0]) & (ds.field('Year') <= years[1])
+    if languages is not None:
+        language_filter = ds.field('Language').isin(list(languages))
+        predicate = language_filter if predicate is None else predicate & language_filter
+
+    return dataset.to_table(columns=columns, filter=predicate).to_pandas()
+
+
+def _read_cube(path):
+    cube_path = os.path.join(path, CUBE_FILE)
+    if not os.path.exists(cube_path):
+        return None
+    return pd.read_parquet(cube_path)
+
+
+def _write_cube(cube, path):
+    # Written next to the final file under a name of its own and renamed, so readers
+    # never see a partial cube
+    fd, tmp_path = tempfile.mkstemp(prefix=CUBE_FILE + '.', suffix='.tmp', dir=path)
+    os.close(fd)
+    try:
+        cube.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(path, CUBE_FILE))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _build_cube(path):
+    cube = language_year_cube(load_dataset(path, columns=['Language', 'Year'] + CUBE_SUMS))
+    _write_cube(cube, path)
+    return cube
+
+
+def load_cube(path=DATASET_PATH, years=None, languages=None):
+    """
+    Reads the language x year cube (see ``language_year_cube``), building it from the
+    dataset the first time.
+
+    Args:
+        path (str): Root directory of the dataset.
+        years (tuple, optional): Inclusive ``(start_year, end_year)`` range.
+        languages (list, optional): Languages to read, None for all.
+
+    Returns:
+        pd.DataFrame: One row per (Language, Year) with the repository count and sums.
+    """
+    if not os.path.isdir(path):
+        return language_year_cube(None)
+
+    cube = _read_cube(path)
+    if cube is None:
+        with _locked(path):
+            cube = _read_cube(path)
+            if cube is None:
+                cube = _build_cube(path)
+
+    mask = pd.Series(True, index=cube.index)
+    if years is not None:
+        mask &= cube['Year'].between(*years)
+    if languages is not None:
+        mask &= cube['Language'].isin(list(languages))
+    return cube[mask].reset_index(drop=True)
+
+
+def missing_partitions(years, languages, path=DATASET_PATH, max_age=DATASET_MAX_AGE):
+    """
+    Lists the (language, year) partitions that are absent or older than ``max_age``.
+
+    Args:
+        years (tuple): Inclusive ``(start_year, end_year)`` range.
+        languages (list): Languages of interest.
+
+    Returns:
+        list: ``(language, year)`` tuples to fetch again.
+    """
+    now = time.time()
+    missing = []
+    for language in languages:
+        for year in range(years[0], years[1] + 1):
+            directory = os.path.join(path, f"Year={year}", f"Language={_encode(language)}")
+            if not os.path.isdir(directory) or now - os.path.getmtime(directory) > max_age:
+                missing.append((language, year))
+    return missing
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+    csv_path = argv[0]
+    path = argv[1] if len(argv) > 1 else DATASET_PATH
+
+    df = pd.read_csv(csv_path).dropna(subset=['Language'])
+    write_dataset(df, path)
+    print(f"Wrote {len(df)} rows from {csv_path} to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
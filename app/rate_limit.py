@@ -0,0 +1,214 @@
+"""
+Rate-limit-aware scheduling of GitHub API requests.
+
+GitHub tracks separate budgets per resource ("core" for REST, "search" for the
+Search API, "graphql") and reports them in the ``X-RateLimit-*`` response headers.
+The ``RateLimiter`` keeps one token bucket per resource, refilled from those headers,
+and decides before every request whether it can go now, has to be paced, or has to
+wait for the budget to reset. Rate-limited responses (429 and the primary/secondary
+403s) are turned into a back-off that pauses every request on the same resource.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Longest time a request is allowed to wait for budget before giving up
+MAX_WAIT = float(os.getenv('GITHUB_RATE_LIMIT_MAX_WAIT', '90'))
+
+# Below this fraction of the limit, remaining requests are spread evenly until the reset
+PACE_BELOW = 0.2
+
+# Wait used for secondary rate limits that do not send a Retry-After header
+SECONDARY_BACKOFF = 60
+
+# Default (limit, window in seconds) per resource, before any header has been seen
+DEFAULT_LIMITS = {
+    True: {'core': (5000, 3600), 'search': (30, 60), 'graphql': (5000, 3600)},
+    False: {'core': (60, 3600), 'search': (10, 60), 'graphql': (0, 3600)},
+}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than the allowed maximum."""
+
+    def __init__(self, resource, wait):
+        super().__init__(f"GitHub '{resource}' rate limit exhausted, budget resets in {wait:.0f}s")
+        self.resource = resource
+        self.wait = wait
+
+
+class RateLimitBucket:
+    """Budget of a single GitHub rate-limit resource."""
+
+    def __init__(self, resource, limit, window):
+        self.resource = resource
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset = None
+        self.in_flight = 0
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+
+    def refill(self, now):
+        if self.reset is not None and now >= self.reset:
+            self.remaining = self.limit
+            self.reset = None
+
+    def state(self, now):
+        return {
+            "limit": self.limit,
+            "remaining": max(self.remaining, 0),
+            "in_flight": self.in_flight,
+            "resets_in": round(self.reset - now, 1) if self.reset else None,
+            "blocked_for": round(max(self.blocked_until - now, 0), 1),
+        }
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler shared by every request sent to GitHub.
+
+    Args:
+        authenticated (bool): Whether requests carry a token (selects the default limits).
+        max_wait (float): Longest time ``acquire`` blocks before raising RateLimitExceeded.
+    """
+
+    def __init__(self, authenticated=True, max_wait=MAX_WAIT):
+        self.authenticated = authenticated
+        self.max_wait = max_wait
+        self.retries = 0
+        self.waited_seconds = 0.0
+        self._buckets = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def resource_for(url):
+        """Returns the rate-limit resource a request URL is counted against."""
+        if '/search/' in url:
+            return 'search'
+        if url.rstrip('/').endswith('/graphql'):
+            return 'graphql'
+        return 'core'
+
+    def _bucket(self, resource):
+        if resource not in self._buckets:
+            limit, window = DEFAULT_LIMITS[self.authenticated].get(resource, (5000, 3600))
+            self._buckets[resource] = RateLimitBucket(resource, limit, window)
+        return self._buckets[resource]
+
+    def _wait_time(self, bucket, now):
+        if now < bucket.blocked_until:
+            return bucket.blocked_until - now
+        if bucket.remaining <= 0:
+            return (bucket.reset or now + bucket.window) - now
+        if bucket.remaining < bucket.limit * PACE_BELOW and bucket.reset:
+            # Spread what is left of the budget until the window resets
+            interval = (bucket.reset - now) / bucket.remaining
+            bucket.next_slot = max(bucket.next_slot, now)
+            if bucket.next_slot > now:
+                return bucket.next_slot - now
+            bucket.next_slot = now + interval
+        return 0
+
+    def acquire(self, resource):
+        """
+        Blocks until a request against ``resource`` may be sent and reserves a token.
+
+        Raises:
+            RateLimitExceeded: If the budget does not free up within ``max_wait`` seconds.
+        """
+        with self._cond:
+            while True:
+                bucket = self._bucket(resource)
+                now = time.time()
+                bucket.refill(now)
+                wait = self._wait_time(bucket, now)
+                if wait <= 0:
+                    bucket.remaining -= 1
+                    bucket.in_flight += 1
+                    if bucket.reset is None:
+                        bucket.reset = now + bucket.window
+                    return
+                if wait > self.max_wait:
+                    raise RateLimitExceeded(resource, wait)
+                logger.info("Waiting %.1fs for GitHub '%s' rate limit", wait, resource)
+                self.waited_seconds += wait
+                self._cond.wait(wait)
+
+    def release(self, resource):
+        """Releases a reservation whose request never reached GitHub."""
+        with self._cond:
+            bucket = self._bucket(resource)
+            bucket.in_flight = max(bucket.in_flight - 1, 0)
+            bucket.remaining += 1
+            self._cond.notify_all()
+
+    def update(self, resource, headers):
+        """Refreshes the budget of ``resource`` from the rate-limit headers of a response."""
+        with self._cond:
+            resource = headers.get('X-RateLimit-Resource', resource)
+            bucket = self._bucket(resource)
+            bucket.in_flight = max(bucket.in_flight - 1, 0)
+            try:
+                if 'X-RateLimit-Limit' in headers:
+                    bucket.limit = int(headers['X-RateLimit-Limit'])
+                if 'X-RateLimit-Remaining' in headers:
+                    # Requests still in flight have already been taken from the header value
+                    bucket.remaining = int(headers['X-RateLimit-Remaining']) - bucket.in_flight
+                if 'X-RateLimit-Reset' in headers:
+                    bucket.reset = float(headers['X-RateLimit-Reset'])
+            except ValueError:
+                logger.warning("Ignoring malformed rate-limit headers: %s", dict(headers))
+            self._cond.notify_all()
+
+    def backoff(self, resource, response, attempt):
+        """
+        Returns how long to wait before retrying a rate-limited response.
+
+        Args:
+            resource (str): The resource the request was counted against.
+            response: The response (needs ``status_code``, ``headers`` and ``text``).
+            attempt (int): Zero-based attempt number of the request.
+
+        Returns:
+            float or None: Seconds to back off, or None if the response is not rate limited.
+        """
+        headers = response.headers
+        primary = headers.get('X-RateLimit-Remaining') == '0'
+        secondary = response.status_code == 403 and 'rate limit' in (response.text or '').lower()
+        if response.status_code != 429 and not (response.status_code == 403 and (primary or secondary)):
+            return None
+
+        now = time.time()
+        if 'Retry-After' in headers:
+            wait = float(headers['Retry-After'])
+        elif primary and 'X-RateLimit-Reset' in headers:
+            wait = float(headers['X-RateLimit-Reset']) - now + 1
+        else:
+            wait = SECONDARY_BACKOFF * 2 ** attempt
+
+        with self._cond:
+            bucket = self._bucket(headers.get('X-RateLimit-Resource', resource))
+            bucket.blocked_until = max(bucket.blocked_until, now + wait)
+            self.retries += 1
+        logger.warning("GitHub rate limited '%s' (%s), backing off %.1fs", resource, response.status_code, wait)
+        return wait
+
+    def budget(self):
+        """
+        Reports the current state of every resource budget.
+
+        Returns:
+            dict: Per-resource limit, remaining, in-flight, seconds to reset and back-off,
+            plus the total number of retries and seconds spent waiting.
+        """
+        with self._cond:
+            now = time.time()
+            state = {resource: bucket.state(now) for resource, bucket in self._buckets.items()}
+            state['retries'] = self.retries
+            state['waited_seconds'] = round(self.waited_seconds, 1)
+            return state
@@ -0,0 +1,70 @@
+"""
+Compact, typed records decoded from GitHub API responses.
+
+Response bodies are parsed with orjson when it is installed, falling back to the
+standard json module, and the items each fetcher keeps are projected into
+NamedTuples holding only the fields their consumer reads. A NamedTuple pickles as
+a plain tuple plus one class reference, so cached results no longer carry the
+dozens of URL, owner and license fields of every item, nor a copy of every key.
+"""
+import json
+from typing import NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(body):
+    """Parses a JSON body (str or bytes)."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def project(items, record):
+    """Projects API items (dicts) onto ``record``, missing fields become None."""
+    fields = record._fields
+    return [record(*[item.get(field) for field in fields]) for item in items]
+
+
+class Repository(NamedTuple):
+    """Repository search item, with the fields of data_preprocess.REPOSITORY_COLUMNS."""
+    name: str
+    stargazers_count: int
+    forks_count: int
+    language: Optional[str]
+    html_url: str
+    created_at: str
+    updated_at: str
+
+
+class RepositoryDetails(NamedTuple):
+    """Fields of ``repos/{owner}/{repo}`` shown by the Repository page."""
+    full_name: str
+    stargazers_count: int
+    forks_count: int
+    watchers_count: int
+    contributors_url: str
+
+
+class User(NamedTuple):
+    """Fields of ``users/{username}`` shown by the Profile page."""
+    login: str
+    name: Optional[str]
+    avatar_url: str
+    followers: int
+    following: int
+
+
+class Contributor(NamedTuple):
+    login: str
+    contributions: int
+
+
+class Issue(NamedTuple):
+    """Issue or pull request, as returned by fetch_repository_issues_pulls."""
+    title: str
+    created_at: str
+    state: str
@@ -0,0 +1,169 @@
+"""
+Background refresher that keeps the dashboards of a watch list warm.
+
+Reads a TOML watch list of users, repositories and language-trend year ranges, and
+refreshes their data on a schedule into the shared data store (see data_store.py)
+that the pages read before fetching live, and language trends into the Parquet
+dataset (see parquet_store.py). Intervals are jittered so refreshes spread
+out over time, and jobs are postponed while the GitHub budget they need is low.
+
+Usage:
+    python app/refresher.py watchlist.toml [--once]
+
+Watch list example (see watchlist.example.toml):
+
+    interval = 900
+    jitter = 0.2
+    users = ["Rista10"]
+    repos = ["deepseek-ai/DeepSeek-R1"]
+
+    [language_trends]
+    start_year = 2008
+    end_year = 2025
+    languages = ["Python", "Go"]
+    top_n = 100
+"""
+import argparse
+import heapq
+import logging
+import random
+import sys
+import time
+
+try:
+    import tomllib
+except ImportError:
+    # Python < 3.11, the toml package of requirements.txt reads the watch list instead
+    tomllib = None
+    import toml
+
+import fetch_data
+import github_client
+
+logger = logging.getLogger(__name__)
+
+# Fraction of a rate-limit budget kept for live page requests
+BUDGET_RESERVE = 0.1
+
+
+def load_watch_list(path):
+    """Reads a TOML watch list."""
+    if tomllib is None:
+        return toml.load(path)
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+def refresh_user(username):
+    fetchers = fetch_data.STORED_FETCHERS
+    fetchers['fetch_user_data'].refresh(username)
+    fetchers['fetch_user_most_used_languages'].refresh(username)
+    fetchers['fetch_commit_activity'].refresh(username)
+
+
+def refresh_repository(repo_name):
+    fetchers = fetch_data.STORED_FETCHERS
+    repo_data = fetchers['fetch_repository_details'].refresh(repo_name)
+    if repo_data:
+        fetchers['fetch_repository_contributions'].refresh(repo_data.contributors_url)
+    fetchers['fetch_open_item_counts'].refresh(repo_name, 'pulls')
+    fetchers['fetch_open_item_counts'].refresh(repo_name, 'issues')
+    fetchers['total_commits_over_time'].refresh(repo_name)
+
+
+def refresh_language_year(language, year, top_n):
+    df = fetch_data.STORED_FETCHERS['fetch_repositories_for_year'].refresh(year, language, top_n)
+    # The Language Trends page reads the Parquet partitions. A search over every language
+    # holds only part of each language's repositories, so it is not written as partitions.
+    if language is not None:
+        fetch_data.write_partitions([df])
+
+
+def build_jobs(watch_list):
+    """
+    Turns a watch list into refresh jobs.
+
+    Returns:
+        list: ``(name, rate-limit resource, function, args)`` tuples.
+    """
+    jobs = [(f"user {user}", 'core', refresh_user, (user,)) for user in watch_list.get('users', [])]
+    jobs += [(f"repo {repo}", 'core', refresh_repository, (repo,)) for repo in watch_list.get('repos', [])]
+
+    trends = watch_list.get('language_trends')
+    if trends:
+        for language in trends.get('languages', [None]):
+            for year in range(trends['start_year'], trends['end_year'] + 1):
+                args = (language, year, trends.get('top_n', 100))
+                jobs.append((f"trends {language or 'all'} {year}", 'search', refresh_language_year, args))
+    return jobs
+
+
+def budget_wait(resource):
+    """Returns how long to postpone a job so the page traffic keeps part of the budget."""
+    state = github_client.rate_limit_budget().get(resource)
+    if not state or state['remaining'] > state['limit'] * BUDGET_RESERVE:
+        return 0
+    return max(state['resets_in'] or 0, state['blocked_for'])
+
+
+def run(watch_list, once=False):
+    """
+    Runs the refresh schedule.
+
+    Every job first runs immediately (spread by the jitter), then again after
+    ``interval`` seconds plus or minus ``jitter`` times the interval.
+
+    Args:
+        watch_list (dict): Parsed watch list.
+        once (bool): Refresh every job a single time, then return.
+    """
+    if fetch_data.data_store is None:
+        raise SystemExit("The data store is disabled (GITHUB_DATA_STORE=off), nothing to refresh into.")
+
+    interval = float(watch_list.get('interval', 900))
+    jitter = float(watch_list.get('jitter', 0.2))
+
+    def next_delay():
+        return interval * (1 + random.uniform(-jitter, jitter))
+
+    jobs = build_jobs(watch_list)
+    spread = 0 if once else jitter * interval
+    schedule = [(time.time() + random.uniform(0, spread), i) for i in range(len(jobs))]
+    heapq.heapify(schedule)
+
+    while schedule:
+        due, i = heapq.heappop(schedule)
+        name, resource, func, args = jobs[i]
+
+        time.sleep(max(due - time.time(), 0))
+
+        wait = budget_wait(resource)
+        if wait > 0:
+            logger.info("Postponing %s by %.0fs, '%s' budget is low", name, wait, resource)
+            heapq.heappush(schedule, (time.time() + wait, i))
+            continue
+
+        start = time.perf_counter()
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Refreshing %s failed", name)
+        else:
+            logger.info("Refreshed %s in %.1fs", name, time.perf_counter() - start)
+
+        if not once:
+            heapq.heappush(schedule, (time.time() + next_delay(), i))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the dashboards of a watch list warm.")
+    parser.add_argument('watch_list', help="Path of the TOML watch list")
+    parser.add_argument('--once', action='store_true', help="Refresh everything once and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run(load_watch_list(args.watch_list), once=args.once)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Sharded repository search.
+
+The Search API returns at most 1000 results per query, and the search rate limit is
+much smaller than the core one. A search over a date range is therefore split into
+shards: every shard whose ``total_count`` is above the cap is split into smaller
+``created:`` windows (year, month, week, day), and the shards are fetched concurrently
+and paginated fully through the shared, rate-limited client.
+"""
+import calendar
+import logging
+from datetime import date, timedelta
+
+import github_client
+import records
+from github_client import GitHubError
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of results the Search API returns for one query
+SEARCH_RESULT_CAP = 1000
+
+SEARCH_PER_PAGE = 100
+
+
+def split_window(start, end):
+    """
+    Splits a ``created:`` window into smaller ones: months, then weeks, then days.
+
+    Args:
+        start (date): First day of the window.
+        end (date): Last day of the window (inclusive).
+
+    Returns:
+        list: ``(start, end)`` tuples covering the window, empty for a single day.
+    """
+    span = (end - start).days + 1
+    if span > 31:
+        windows, month_start = [], start
+        while month_start <= end:
+            last_day = calendar.monthrange(month_start.year, month_start.month)[1]
+            month_end = min(month_start.replace(day=last_day), end)
+            windows.append((month_start, month_end))
+            month_start = month_end + timedelta(days=1)
+        return windows
+    step = 7 if span > 7 else 1
+    if span == 1:
+        return []
+    return [
+        (day, min(day + timedelta(days=step - 1), end))
+        for day in (start + timedelta(days=offset) for offset in range(0, span, step))
+    ]
+
+
+def search_window(query, start, end, max_results=None):
+    """
+    Searches repositories created in a date window, splitting it while it holds
+    more results than one query can return.
+
+    Args:
+        query (str): Search qualifiers, without the ``created:`` window.
+        start (date): First day of the window.
+        end (date): Last day of the window (inclusive).
+        max_results (int, optional): Keep only the most starred results; None for all.
+
+    Returns:
+        list: records.Repository of the results, most starred first.
+
+    Raises:
+        GitHubError: If a search request fails.
+    """
+    params = {
+        "q": f"{query} created:{start.isoformat()}..{end.isoformat()}",
+        "sort": "stars",
+        "order": "desc",
+        "per_page": SEARCH_PER_PAGE,
+    }
+    response = github_client.get("search/repositories", params=params)
+    if response.status_code != 200:
+        raise GitHubError(response)
+
+    data = response.json()
+    total = data.get('total_count', 0)
+    wanted = total if max_results is None else min(total, max_results)
+
+    sub_windows = split_window(start, end) if wanted > SEARCH_RESULT_CAP else []
+    if sub_windows:
+        # The overall top results are among the top results of every sub-window
+        calls = [(search_window, query, sub_start, sub_end, max_results) for sub_start, sub_end in sub_windows]
+        items = [item for shard in github_client.gather(*calls) for item in shard]
+        items.sort(key=lambda item: item.stargazers_count or 0, reverse=True)
+        return items if max_results is None else items[:max_results]
+
+    if wanted > SEARCH_RESULT_CAP:
+        logger.warning("Search for %r on %s has %d results, only %d are reachable", query, start, total, SEARCH_RESULT_CAP)
+        wanted = SEARCH_RESULT_CAP
+
+    items = records.project(data.get('items', [])[:wanted], records.Repository)
+    if len(items) < wanted and response.next_url:
+        for page in github_client.iter_pages(response.next_url, max_items=wanted - len(items),
+                                             record=records.Repository):
+            items.extend(page)
+    return items
+
+
+def search_year(query, year, max_results=None):
+    """Searches the repositories created during ``year`` (see search_window)."""
+    return search_window(query, date(year, 1, 1), date(year, 12, 31), max_results)
+
+
+def language_query(language=None, base="stars:>0"):
+    """Builds the search qualifiers for ``language``, or for every language if None."""
+    if language is None:
+        return base
+    return f"{base} language:{language}"
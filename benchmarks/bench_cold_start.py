@@ -0,0 +1,68 @@
+"""
+Import-time profile of the dashboard pages.
+
+For Home.py and every page, runs the page's top-level imports in a fresh interpreter
+with ``python -X importtime`` (the page body itself is not run, so nothing is
+fetched) and reports the total import time and the modules that took longest,
+cumulative of their own imports. Plotting backends imported inside the chart
+builders are not part of it: they are paid by the first chart, after the page has
+started rendering.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--top 10]
+"""
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+
+
+def page_imports(path):
+    """Returns the source of the top-level import statements of a page."""
+    with open(path) as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return '\n'.join(
+        ast.get_source_segment(source, node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_times(code):
+    """Runs ``code`` under -X importtime and returns ``[(cumulative us, module)]``."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], cwd=APP, capture_output=True, text=True,
+        env=dict(os.environ, METRICS_PORT='', GITHUB_CACHE_DIR=os.path.join(APP, '..', '.cache')),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        # Top-level imports are not indented, their cumulative time includes the rest
+        times.append((int(cumulative), module.rstrip(), not module[1:].startswith(' ')))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    pages = [os.path.join(APP, 'Home.py')] + sorted(glob.glob(os.path.join(APP, 'pages', '*.py')))
+    for path in pages:
+        times = import_times(page_imports(path))
+        total = sum(cumulative for cumulative, _, top_level in times if top_level)
+        print(f"{os.path.basename(path)}: {total / 1000:.0f}ms")
+        for cumulative, module, _ in sorted(times, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f}ms {module.strip()}")
+
+
+if __name__ == '__main__':
+    main()
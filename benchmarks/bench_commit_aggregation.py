@@ -0,0 +1,89 @@
+"""
+Benchmark for the streaming commit aggregation.
+
+Generates ``--commits`` synthetic REST commit items in pages of 100 and counts them per
+day and per month twice: with the previous implementation (kept below as
+``aggregate_baseline``: every page is kept, then one ``pd.to_datetime`` per commit and a
+DataFrame of every commit), and with a CommitAggregator fed one page at a time from a
+generator. Reports wall time and peak traced memory, and checks the counts agree.
+
+Usage:
+    python benchmarks/bench_commit_aggregation.py [--commits 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import pandas as pd
+
+from commit_aggregator import CommitAggregator
+
+PAGE_SIZE = 100
+
+
+def iter_pages(commits, seed=0):
+    """Yields pages of synthetic commit items spread over the last five years."""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    for offset in range(0, commits, PAGE_SIZE):
+        page = []
+        for _ in range(min(PAGE_SIZE, commits - offset)):
+            date = (start + timedelta(seconds=rng.randrange(5 * 365 * 86400))).strftime('%Y-%m-%dT%H:%M:%SZ')
+            page.append({'sha': 'x' * 40, 'commit': {'author': {'date': date}, 'committer': {'date': date}}})
+        yield page
+
+
+def aggregate_baseline(pages):
+    """Per-day and per-month counts as fetch_commit_activity and count_commits_by_date used to build them."""
+    commits = [item for page in pages for item in page]
+    monthly = defaultdict(int)
+    for item in commits:
+        monthly[pd.to_datetime(item['commit']['author']['date']).strftime('%Y-%m')] += 1
+    days = Counter(item['commit']['author']['date'][:10] for item in commits)
+    df = pd.DataFrame(days.items(), columns=['Date', 'Commits']).sort_values('Date')
+    return list(df.itertuples(index=False, name=None)), dict(monthly)
+
+
+def aggregate_streaming(pages):
+    aggregator = CommitAggregator()
+    aggregator.add_pages(pages)
+    return aggregator.day_counts(), aggregator.month_counts()
+
+
+def measure(func, commits):
+    """Times a run, then repeats it under tracemalloc (which slows it down) for the peak."""
+    start = time.perf_counter()
+    out = func(iter_pages(commits))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(iter_pages(commits))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Generating the pages is part of both measurements
+    results = {}
+    for label, func in (("baseline", aggregate_baseline), ("streaming", aggregate_streaming)):
+        results[label], elapsed, peak = measure(func, args.commits)
+        print(f"{label:<10} wall={elapsed:7.2f}s peak={peak / 1e6:8.1f}MB")
+
+    (baseline_days, baseline_months), (days, months) = results['baseline'], results['streaming']
+    print(f"identical results: {baseline_days == days and baseline_months == dict(months)}")
+
+
+if __name__ == '__main__':
+    main()
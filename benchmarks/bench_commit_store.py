@@ -0,0 +1,60 @@
+"""
+Benchmark for the incremental commit-history sync.
+
+Fetches total_commits_over_time for a repository with many commits against the mock
+GitHub server as successive page views do: each view fetches at most ``--limit``
+commits (GITHUB_COMMIT_FETCH_LIMIT) and the next one resumes where it stopped, until
+the history is complete; a last view only asks for commits since the stored watermark.
+The stores live in a temporary directory.
+
+Usage:
+    python benchmarks/bench_commit_store.py [--commits 20000] [--limit 5000] [--latency 0.02]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, commit_count=args.commits)
+    os.environ['GITHUB_API_URL'] = server.base_url
+    os.environ['GITHUB_CACHE_DIR'] = tempfile.mkdtemp()
+    os.environ['GITHUB_HTTP_CACHE'] = 'off'
+    os.environ['GITHUB_COMMIT_FETCH_LIMIT'] = str(args.limit)
+
+    import fetch_data
+
+    total_commits_over_time = fetch_data.total_commits_over_time.__wrapped__
+
+    view, complete = 0, False
+    while not complete:
+        view += 1
+        # The history is complete once the sync has reached the bottom and set the watermark
+        name = f"view {view}" if fetch_data.commit_store.state('bench/repo').watermark is None else "incremental"
+        complete = name == "incremental"
+        requests_before = server.request_count
+        start = time.perf_counter()
+        df = total_commits_over_time('bench/repo')
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<12} wall={elapsed:6.2f}s requests={server.request_count - requests_before:<4} "
+            f"days={len(df)} commits={df['commits'].sum()}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
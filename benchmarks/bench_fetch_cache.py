@@ -0,0 +1,69 @@
+"""
+Benchmark for the fetch cache (in-process LRU in front of the shared data store).
+
+Two server "replicas" (separate processes) share one data store and a small memory
+budget. Replica A fetches the languages of ``--users`` distinct users, then repeats
+the most recent ones; replica B then asks for the same users. Reports the upstream
+requests, hit ratios and LRU memory of each replica: A's memory stays under the cap
+while it evicts, and B is served from the shared store without calling GitHub.
+
+Usage:
+    python benchmarks/bench_fetch_cache.py [--users 200] [--memory-mb 0.004]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def replica(users, repeat, queue):
+    import fetch_data
+
+    start = time.perf_counter()
+    for user in users + users[-repeat:]:
+        fetch_data.fetch_user_most_used_languages(user)
+    queue.put((time.perf_counter() - start, fetch_data.fetch_cache.stats()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--memory-mb', type=float, default=0.004)
+    args = parser.parse_args()
+
+    server = start_mock_server(repo_count=3, latency=0.01)
+    os.environ.update(
+        GITHUB_API_URL=server.base_url,
+        GITHUB_CACHE_DIR=tempfile.mkdtemp(),
+        GITHUB_HTTP_CACHE='off',
+        GITHUB_MEMORY_CACHE_MB=str(args.memory_mb),
+    )
+    users = [f"user{i}" for i in range(args.users)]
+
+    # The replicas are forked, the mock server keeps running in this process
+    for name in ("replica A", "replica B"):
+        requests_before = server.request_count
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=replica, args=(users, args.repeat, queue))
+        process.start()
+        elapsed, stats = queue.get()
+        process.join()
+
+        counts = stats['functions']['fetch_user_most_used_languages']
+        print(
+            f"{name}: {elapsed:6.2f}s upstream requests={server.request_count - requests_before:5d} "
+            f"hits={counts['hits']} shared hits={counts['shared_hits']} misses={counts['misses']} "
+            f"hit ratio={counts['hit_ratio']:.2f} | LRU {stats['entries']} entries, "
+            f"{stats['bytes'] / 1024:.1f}KB of {stats['max_bytes'] / 1024:.1f}KB, {stats['evictions']} evictions"
+        )
+
+
+if __name__ == '__main__':
+    main()
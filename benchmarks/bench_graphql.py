@@ -0,0 +1,57 @@
+"""
+Benchmark comparing the REST and GraphQL backends of the profile fetchers.
+
+Both backends run against the mock GitHub server, whose GraphQL answers are built
+from the same data as its REST routes, so their results must be identical; the
+benchmark checks that and reports request counts and wall time for each.
+
+Usage:
+    python benchmarks/bench_graphql.py [--repos 100] [--commits 250] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=100)
+    parser.add_argument('--commits', type=int, default=250)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = start_mock_server(repo_count=args.repos, latency=args.latency, commit_count=args.commits)
+    os.environ['GITHUB_API_URL'] = server.base_url
+    os.environ['GITHUB_CACHE_DIR'] = tempfile.mkdtemp()
+    os.environ['GITHUB_HTTP_CACHE'] = 'off'
+    os.environ['GITHUB_COMMIT_STORE'] = 'off'
+    os.environ['PAT_TOKEN'] = 'mock-token'
+
+    import fetch_data
+
+    fetchers = {
+        "fetch_user_most_used_languages": fetch_data.fetch_user_most_used_languages.__wrapped__,
+        "fetch_commit_activity": fetch_data.fetch_commit_activity.__wrapped__,
+    }
+
+    for name, fetcher in fetchers.items():
+        results = {}
+        for backend in ('rest', 'graphql'):
+            requests_before = server.request_count
+            start = time.perf_counter()
+            results[backend] = fetcher('bench', backend=backend)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<32} {backend:<8} wall={elapsed:6.2f}s requests={server.request_count - requests_before}")
+        print(f"{name:<32} identical results: {results['rest'] == results['graphql']}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark for the persistent conditional-request cache.
+
+Runs fetch_user_most_used_languages three times against the mock GitHub server:
+cold (empty cache), revalidating (TTL expired, every request answered with 304)
+and fresh (served from disk without any request). The cache lives in a temporary
+file so the benchmark never touches the dashboard's cache.
+
+Usage:
+    python benchmarks/bench_http_cache.py [--repos 100] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = start_mock_server(repo_count=args.repos, latency=args.latency)
+    cache_dir = tempfile.mkdtemp()
+    os.environ['GITHUB_API_URL'] = server.base_url
+    os.environ['GITHUB_CACHE_DIR'] = cache_dir
+    os.environ['GITHUB_HTTP_CACHE'] = os.path.join(cache_dir, 'github_http.sqlite')
+
+    import fetch_data
+    import github_client
+
+    fetch_languages = fetch_data.fetch_user_most_used_languages.__wrapped__
+
+    for name, ttl in (("cold", 0), ("revalidate", 0), ("fresh", 3600)):
+        github_client.response_cache.ttl = ttl
+        requests_before, not_modified_before = server.request_count, server.not_modified_count
+        start = time.perf_counter()
+        fetch_languages('bench')
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<11} wall={elapsed:6.2f}s requests={server.request_count - requests_before:<4} "
+            f"304s={server.not_modified_count - not_modified_before:<4} "
+            f"rate limit used={5000 - server.remaining['core']}"
+        )
+
+    print(github_client.cache_stats())
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark for the per-repository language fan-out in fetch_user_most_used_languages.
+
+Usage:
+    python benchmarks/bench_languages.py [--repos 100] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repos', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = start_mock_server(repo_count=args.repos, latency=args.latency)
+    os.environ['GITHUB_API_URL'] = server.base_url
+    os.environ['GITHUB_CACHE_DIR'] = tempfile.mkdtemp()
+    os.environ['GITHUB_HTTP_CACHE'] = 'off'
+
+    import fetch_data
+    import github_client
+
+    print(f"{args.repos} repos, {args.latency * 1000:.0f} ms latency per request, "
+          f"at most {github_client.MAX_PER_HOST} in flight (GITHUB_MAX_PER_HOST)")
+    for workers in args.workers:
+        start = time.perf_counter()
+        result = fetch_data.fetch_user_most_used_languages.__wrapped__('bench', max_workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers:<3} wall={elapsed:6.2f}s  languages={result}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
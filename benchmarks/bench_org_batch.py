@@ -0,0 +1,60 @@
+"""
+Benchmark for the organization batch mode.
+
+Ranks every member of a mock organization: fetches their languages and commit
+activity through org_batch.fetch_users, then builds the leaderboard with the pandas
+work inline (one process), in a process pool, and with the default choice between
+the two (see org_batch.POOL_MIN_USERS). Reports upstream requests and wall
+time of each step. The caches live in a temporary directory.
+
+Usage:
+    python benchmarks/bench_org_batch.py [--members 500] [--repos 3] [--commits 200] [--latency 0.02]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--repos', type=int, default=3)
+    parser.add_argument('--commits', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, member_count=args.members, repo_count=args.repos,
+                               commit_count=args.commits)
+    # A budget the batch cannot run out of, the headers are still sent
+    server.limits = {resource: 10 ** 9 for resource in server.limits}
+    server.remaining = dict(server.limits)
+    os.environ.update(
+        GITHUB_API_URL=server.base_url, GITHUB_CACHE_DIR=tempfile.mkdtemp(), GITHUB_HTTP_CACHE='off',
+        GITHUB_BACKEND='rest',
+    )
+
+    import org_batch
+
+    start = time.perf_counter()
+    logins = org_batch.resolve_logins('bench-org')
+    users = org_batch.fetch_users(logins)
+    print(f"fetch       wall={time.perf_counter() - start:7.2f}s requests={server.request_count} users={len(users)}")
+
+    pool_size = max(2, os.cpu_count() or 1)
+    for name, processes in (("inline", 1), ("pool", pool_size), ("default", None)):
+        start = time.perf_counter()
+        results = org_batch.summarize(users, processes=processes)
+        print(f"{name:<11} wall={time.perf_counter() - start:7.2f}s rows={len(results['leaderboard'])} "
+              f"commits={results['leaderboard']['Commits'].sum()}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
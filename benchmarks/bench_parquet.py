@@ -0,0 +1,100 @@
+"""
+Benchmark for loading the Language Trends data from the partitioned Parquet dataset.
+
+Builds a synthetic processed dataset of ``--rows`` rows by repeating
+data/processed_data.csv, stores it both as one CSV file and as the Parquet dataset,
+then loads the slice selected by a year range and two languages:
+
+- csv: ``pd.read_csv`` of the whole file, date parsing and filtering in pandas
+- parquet: ``parquet_store.load_dataset`` with the filters pushed down
+- cube: ``parquet_store.load_cube``, the per (Language, Year) aggregates the charts use
+
+It then times one incremental write of a single (language, year) partition, which
+also updates that cell of the cube.
+
+Each load runs in a fresh process so the reported peak RSS is its own.
+
+Usage:
+    python benchmarks/bench_parquet.py [--rows 1000000]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import pandas as pd
+
+import parquet_store
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+YEARS = (2015, 2016)
+LANGUAGES = ['Python', 'Go']
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    df['Created At'] = pd.to_datetime(df['Created At'])
+    df['Updated At'] = pd.to_datetime(df['Updated At'])
+    return df[df['Year'].between(*YEARS) & df['Language'].isin(LANGUAGES)]
+
+
+def load_parquet(path):
+    return parquet_store.load_dataset(path, years=YEARS, languages=LANGUAGES)
+
+
+def load_cube(path):
+    return parquet_store.load_cube(path, years=YEARS, languages=LANGUAGES)
+
+
+def measure(loader, path, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    rows = len(loader(path))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    queue.put((elapsed, peak, rows))
+
+
+def run(loader, path):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure, args=(loader, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    seed = pd.read_csv(os.path.join(ROOT, 'data', 'processed_data.csv')).dropna(subset=['Language'])
+    df = pd.concat([seed] * (args.rows // len(seed) + 1), ignore_index=True).head(args.rows)
+
+    directory = tempfile.mkdtemp()
+    csv_path = os.path.join(directory, 'processed.csv')
+    dataset_path = os.path.join(directory, 'dataset')
+    df.to_csv(csv_path, index=False)
+    parquet_store.write_dataset(df, dataset_path)
+    shard = df[(df['Year'] == YEARS[0]) & (df['Language'] == LANGUAGES[0])]
+    del df
+
+    print(f"{args.rows} rows, slice {YEARS[0]}-{YEARS[1]} x {LANGUAGES}")
+    loaders = (("csv", load_csv, csv_path), ("parquet", load_parquet, dataset_path), ("cube", load_cube, dataset_path))
+    for name, loader, path in loaders:
+        elapsed, peak, rows = run(loader, path)
+        print(f"{name:<8} wall={elapsed * 1000:8.1f}ms peak RSS growth={peak / 1024:7.1f}MB rows={rows}")
+
+    start = time.perf_counter()
+    parquet_store.write_dataset(shard, dataset_path)
+    print(f"rewrite of one partition ({len(shard)} rows) with its cube cell: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
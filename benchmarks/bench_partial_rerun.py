@@ -0,0 +1,128 @@
+"""
+Benchmark for the server time of each dashboard interaction, before and after a change.
+
+Runs each page against the mock GitHub server with streamlit's AppTest, then moves
+one of its inputs back and forth between a few values and times every rerun. The
+first time a value is seen, the fetchers run and every chart builds its figure; when
+the input comes back to a value, the data and the figures come from st.cache_data,
+keyed on their inputs. An input the page no longer has costs no server time: the
+per-year slider of the Language Trends page is now the animation slider of its
+chart, which switches years in the browser.
+
+With ``--before REV``, the app at git revision REV (e.g. the commit before the
+performance work) is exported with ``git archive`` and its pages are run the same
+way, in a subprocess since both apps have modules of the same names. Requests the
+pages send to api.github.com go to the mock server as well.
+
+Usage:
+    python benchmarks/bench_partial_rerun.py [--interactions 20] [--before REV]
+"""
+import argparse
+import io
+import itertools
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_github import start_mock_server
+
+GITHUB = "https://api.github.com"
+
+# Page, label and type of the widget, and the values it is moved between
+INTERACTIONS = [
+    ('Language Trends Dashboard.py', 'Select Year', 'slider', [2010, 2015, 2020]),
+    ('Language Trends Dashboard.py', 'Select Year Range', 'slider', [(2015, 2020), (2010, 2025), (2008, 2025)]),
+    ('Profile Dashboard.py', 'Enter your GitHub username:', 'text_input', ['octocat', 'torvalds', 'Rista10']),
+    ('Repository Dashboard.py', 'Enter the repository name:', 'text_input',
+     ['octocat/hello', 'torvalds/linux', 'deepseek-ai/DeepSeek-R1']),
+]
+
+
+def redirect_github(base_url):
+    """Sends every request to api.github.com, including hardcoded URLs, to the mock server."""
+    import requests
+
+    request = requests.Session.request
+
+    def mock_request(self, method, url, *args, **kwargs):
+        if isinstance(url, str) and url.startswith(GITHUB):
+            url = base_url + url[len(GITHUB):]
+        return request(self, method, url, *args, **kwargs)
+
+    requests.Session.request = mock_request
+
+
+def export_app(rev):
+    """Extracts the app directory of git revision ``rev`` into a temporary directory."""
+    directory = tempfile.mkdtemp()
+    archive = subprocess.run(['git', 'archive', rev, 'app'], cwd=ROOT, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return os.path.join(directory, 'app')
+
+
+def run_pages(app, name, interactions):
+    """Prints the mean rerun time of every interaction of the pages in ``app``."""
+    server = start_mock_server(repos_per_day=1, latency=0)
+    # A budget the pages cannot run out of, the headers are still sent
+    server.limits = {resource: 10 ** 9 for resource in server.limits}
+    server.remaining = dict(server.limits)
+    directory = tempfile.mkdtemp()
+    os.environ.update(
+        DATASET_PATH=os.path.join(directory, 'dataset'), GITHUB_CACHE_DIR=directory, GITHUB_API_URL=server.base_url
+    )
+    redirect_github(server.base_url)
+    sys.path.insert(0, app)
+    os.chdir(app)
+
+    from streamlit.testing.v1 import AppTest
+
+    for page, label, widget, values in INTERACTIONS:
+        at = AppTest.from_file(os.path.join('pages', page), default_timeout=600)
+        at.run()
+        if not any(element.label == label for element in getattr(at, widget)):
+            print(f"{name:<7} {page:<30} {label:<28} {'no server rerun':>23}", flush=True)
+            continue
+
+        timings = {'first': [], 'revisit': []}
+        seen = set()
+        for value in itertools.islice(itertools.cycle(values), interactions):
+            next(element for element in getattr(at, widget) if element.label == label).set_value(value)
+            start = time.perf_counter()
+            at.run()
+            timings['revisit' if value in seen else 'first'].append(time.perf_counter() - start)
+            seen.add(value)
+
+        first, revisit = (sum(runs) / len(runs) * 1000 for runs in (timings['first'], timings['revisit']))
+        print(f"{name:<7} {page:<30} {label:<28} {first:9.1f}ms {revisit:9.1f}ms", flush=True)
+
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--interactions', type=int, default=20)
+    parser.add_argument('--before', metavar='REV', help="Also run the pages of the app at this git revision")
+    parser.add_argument('--app', help=argparse.SUPPRESS)
+    parser.add_argument('--name', default='after', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.app:
+        run_pages(args.app, args.name, args.interactions)
+        return
+
+    print(f"{'app':<7} {'page':<30} {'input':<28} {'first':>11} {'revisit':>11}", flush=True)
+    if args.before:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--app', export_app(args.before),
+                        '--name', 'before', '--interactions', str(args.interactions)], check=True)
+    run_pages(os.path.join(ROOT, 'app'), 'after', args.interactions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark for preprocess_data.
+
+Rebuilds raw search-result frames (as produced by the former json_normalize step,
+including ~30 flattened owner.* columns) from data/processed_data.csv and from a
+synthetic frame of ``--rows`` rows, then runs the previous implementation (kept
+below as ``preprocess_data_baseline``) and the current one. Reports wall time, peak
+traced memory and output size, and checks the outputs agree.
+
+Usage:
+    python benchmarks/bench_preprocess.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from data_preprocess import REPOSITORY_COLUMNS, preprocess_data
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+OWNER_FIELDS = [
+    'login', 'id', 'node_id', 'avatar_url', 'gravatar_id', 'url', 'html_url', 'followers_url', 'following_url',
+    'gists_url', 'starred_url', 'subscriptions_url', 'organizations_url', 'repos_url', 'events_url',
+    'received_events_url', 'type', 'user_view_type', 'site_admin',
+]
+ITEM_FIELDS = [
+    'id', 'node_id', 'full_name', 'private', 'description', 'fork', 'url', 'forks_url', 'keys_url',
+    'collaborators_url', 'teams_url', 'hooks_url', 'issue_events_url', 'events_url', 'assignees_url',
+]
+
+
+def preprocess_data_baseline(df):
+    """preprocess_data as it was before the compact rewrite."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df[['name', 'stargazers_count', 'forks_count', 'language', 'html_url', 'created_at', 'updated_at', 'year']]
+    df = df.rename(columns=REPOSITORY_COLUMNS)
+    df['Created At'] = pd.to_datetime(df['Created At']).dt.tz_convert(pytz.utc)
+    df['Updated At'] = pd.to_datetime(df['Updated At']).dt.tz_convert(pytz.utc)
+    today_date = pd.Timestamp(datetime.now(pytz.utc))
+    df['Repo age days'] = (today_date - df['Created At']).dt.days
+    df['Repo age years'] = df['Repo age days'] / 365
+    df['Star Growth Rate'] = df['Stars'] / df['Repo age years']
+    df['Fork Growth Rate'] = df['Forks'] / df['Repo age years']
+    df['Activity Score'] = df['Star Growth Rate'] * 0.7 + df['Fork Growth Rate'] * 0.3
+    df = df.dropna()
+    return df
+
+
+def raw_frame(rows=None):
+    """Raw, json_normalize-shaped frame built from the bundled processed CSV."""
+    processed = pd.read_csv(os.path.join(ROOT, 'data', 'processed_data.csv'))
+    if rows is not None:
+        processed = pd.concat([processed] * (rows // len(processed) + 1), ignore_index=True).head(rows)
+    raw = pd.DataFrame({old: processed[new] for old, new in REPOSITORY_COLUMNS.items()})
+    raw['created_at'] = pd.to_datetime(raw['created_at']).dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    raw['updated_at'] = pd.to_datetime(raw['updated_at']).dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    for field in ITEM_FIELDS:
+        raw[field] = 'x' * 40
+    for field in OWNER_FIELDS:
+        raw[f'owner.{field}'] = 'https://api.github.com/users/octocat/' + field
+    return raw
+
+
+def measure(func, df):
+    """Times a run, then repeats it under tracemalloc (which slows it down) for the peak."""
+    start = time.perf_counter()
+    out = func(df)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def compare(baseline, current):
+    baseline = baseline.reset_index(drop=True)
+    current = current.reset_index(drop=True)
+    if len(baseline) != len(current):
+        return False
+    for column in baseline.columns:
+        if pd.api.types.is_float_dtype(current[column]):
+            if not np.allclose(baseline[column], current[column].astype('float64'), rtol=1e-6):
+                return False
+        elif not (baseline[column].astype(str) == current[column].astype(str)).all():
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    for name, df in (("processed_data.csv", raw_frame()), (f"synthetic {args.rows}", raw_frame(args.rows))):
+        print(f"{name}: {len(df)} rows x {len(df.columns)} columns")
+        baseline, baseline_time, baseline_peak = measure(preprocess_data_baseline, df)
+        current, current_time, current_peak = measure(preprocess_data, df)
+        for label, out, elapsed, peak in (
+            ("baseline", baseline, baseline_time, baseline_peak),
+            ("current", current, current_time, current_peak),
+        ):
+            size = out.memory_usage(deep=True).sum() / 1e6
+            print(f"  {label:<9} wall={elapsed * 1000:8.1f}ms peak={peak / 1e6:8.1f}MB output={size:7.1f}MB")
+        print(f"  identical results: {compare(baseline, current)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Exercises the rate-limit scheduler against the mock GitHub server.
+
+The server first answers with a 429, a secondary-rate-limit 403 and a primary 403
+(remaining 0, resetting shortly); the client has to back off and retry until it
+gets the real response. The last scenario exhausts the budget until a reset an
+hour away, which the scheduler must refuse without contacting the server. The
+budget reported by the scheduler is printed after every scenario.
+
+Usage:
+    python benchmarks/bench_rate_limit.py [--retry-after 1]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--retry-after', default='1')
+    args = parser.parse_args()
+
+    server = start_mock_server(repo_count=5, latency=0.01)
+    os.environ['GITHUB_API_URL'] = server.base_url
+    os.environ['GITHUB_CACHE_DIR'] = tempfile.mkdtemp()
+    os.environ['GITHUB_HTTP_CACHE'] = 'off'
+
+    import github_client
+
+    def primary(reset_in):
+        return (403, "API rate limit exceeded",
+                {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time() + reset_in))})
+
+    retry_after = {"Retry-After": args.retry_after}
+    scenarios = {
+        "429 Too Many Requests": lambda: [(429, "Too Many Requests", retry_after)],
+        "403 secondary rate limit": lambda: [(403, "You have exceeded a secondary rate limit.", retry_after)],
+        "403 primary rate limit": lambda: [primary(1)],
+        "all three in a row": lambda: [
+            (429, "Too Many Requests", retry_after),
+            (403, "You have exceeded a secondary rate limit.", retry_after),
+            primary(1),
+        ],
+        "budget exhausted for an hour": lambda: [primary(3600)],
+    }
+
+    for name, failures in scenarios.items():
+        server.failures = failures()
+        requests_before = server.request_count
+        start = time.perf_counter()
+        response = github_client.get("users/bench/repos")
+        elapsed = time.perf_counter() - start
+        print(f"{name}: status={response.status_code} requests={server.request_count - requests_before} wall={elapsed:.2f}s")
+        print(json.dumps(github_client.rate_limit_budget(), indent=2))
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for the typed response records.
+
+Builds list responses of ``--items`` recorded issues, contributors and search
+repositories (see fixtures/), then compares, per kind of item:
+- decoding the body with json and, when installed, orjson (records.loads);
+- the pickled size of the result as cached: the full payload, the field-picked
+  dicts kept before, and the NamedTuple records of records.py.
+
+Usage:
+    python benchmarks/bench_records.py [--items 10000]
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import records
+from mock_github import fixture
+
+BASE = "https://api.github.com"
+
+
+def payloads(count):
+    """Returns ``{kind: (list of items, record)}`` built from the fixtures."""
+    issues = [fixture('issue', base=BASE, full_name='octocat/hello', number=i) for i in range(count)]
+    contributors = [fixture('contributor', login=f"contributor-{i}") for i in range(count)]
+    repositories = [fixture('repository', base=BASE, full_name=f"octocat/repo-{i}", owner='octocat', name=f"repo-{i}")
+                    for i in range(count)]
+    return {
+        'issues': (issues, records.Issue),
+        'contributors': (contributors, records.Contributor),
+        'repositories': (repositories, records.Repository),
+    }
+
+
+def timed(func, *args, repeat=5):
+    """Returns the result of ``func`` and its best time over ``repeat`` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"JSON decoder: {'orjson' if records.orjson is not None else 'json (orjson not installed)'}")
+    for kind, (items, record) in payloads(args.items).items():
+        body = json.dumps(items).encode()
+        decoded, json_time = timed(json.loads, body)
+        _, loads_time = timed(records.loads, body)
+        projected, project_time = timed(records.project, decoded, record)
+
+        picked = [{field: item.get(field) for field in record._fields} for item in decoded]
+        sizes = [len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for value in (decoded, picked, projected)]
+        print(f"{kind:<13} body={len(body) / 1e6:6.1f}MB json={json_time * 1000:7.1f}ms "
+              f"records.loads={loads_time * 1000:7.1f}ms project={project_time * 1000:6.1f}ms | pickled "
+              f"full={sizes[0] / 1e6:6.2f}MB dicts={sizes[1] / 1e6:6.2f}MB records={sizes[2] / 1e6:6.2f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark for the popularity vs collaboration scatter of the Language Trends page.
+
+Builds synthetic Parquet datasets of growing size from data/processed_data.csv (with
+randomized star and fork counts), runs the page with streamlit's AppTest against
+each one and reports the size of the scatter chart sent to the browser and the
+page run time. The baseline is the size of the previous chart, one SVG marker per
+repository built with ``px.scatter``.
+
+Usage:
+    python benchmarks/bench_scatter.py [--rows 1000 20000 100000 1000000]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP)
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PAGE = os.path.join('pages', 'Language Trends Dashboard.py')
+# Languages with rows for every year of the range, so the page fetches nothing
+LANGUAGES = ["Python", "JavaScript", "C++", "TypeScript"]
+YEARS = (2010, 2025)
+
+
+def synthetic(seed, rows, rng):
+    df = seed.sample(rows, replace=True, random_state=0, ignore_index=True)
+    df['Stars'] = np.maximum(df['Stars'] * rng.lognormal(0, 1, rows), 1).astype('int64')
+    df['Forks'] = (df['Forks'] * rng.lognormal(0, 1, rows)).astype('int64')
+    return df
+
+
+def baseline_payload(df):
+    """Size of the chart JSON as the page drew it before (one SVG marker per repository)."""
+    fig = px.scatter(df, x='Stars', y='Forks', color='Language', hover_name='Repository Name',
+                     color_discrete_sequence=px.colors.qualitative.Plotly)
+    fig.update_traces(marker=dict(size=10, line=dict(width=2, color='DarkSlateGrey')), selector=dict(mode='markers'))
+    return len(fig.to_json())
+
+
+def run_page():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(PAGE, default_timeout=600)
+    at.run()
+    at.sidebar.multiselect[0].set_value(LANGUAGES)
+    at.sidebar.slider[0].set_value(YEARS)
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    # The scatter is the second Plotly chart of the page, after the per-year bars
+    return len(at.get('plotly_chart')[1].proto.spec), elapsed
+
+
+def measure(df, queue):
+    # A fresh process per dataset, so the page's module defaults and caches start empty
+    from mock_github import start_mock_server
+
+    # The first run uses the page defaults, whose missing years are fetched from the mock
+    server = start_mock_server(repos_per_day=1)
+    directory = tempfile.mkdtemp()
+    os.environ.update(
+        DATASET_PATH=os.path.join(directory, 'dataset'), GITHUB_CACHE_DIR=directory, GITHUB_API_URL=server.base_url
+    )
+    import parquet_store
+    parquet_store.write_dataset(df)
+    queue.put(run_page())
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 20000, 100000, 1000000])
+    args = parser.parse_args()
+
+    seed = pd.read_csv(os.path.join(ROOT, 'data', 'processed_data.csv')).dropna(subset=['Language'])
+    seed = seed[seed['Language'].isin(LANGUAGES) & seed['Year'].between(*YEARS)]
+    rng = np.random.default_rng(0)
+    os.environ['DATASET_MAX_AGE'] = str(10 ** 9)
+    os.chdir(APP)
+
+    for rows in args.rows:
+        df = synthetic(seed, rows, rng)
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=measure, args=(df, queue))
+        process.start()
+        payload, elapsed = queue.get()
+        process.join()
+
+        baseline = baseline_payload(df) if rows <= 100000 else None
+        baseline_text = f"{baseline / 1e6:8.2f}MB" if baseline else "       -  "
+        print(f"{rows:>8} rows: chart {payload / 1e6:6.2f}MB (previous {baseline_text}), page run {elapsed:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for the sharded repository search behind fetch_github_data.
+
+Compares the former strategy (one page of 100 results per year, years fetched one
+after the other with a one-second pause) with the sharded search, which fetches
+years concurrently and splits any window above the 1000-result cap until every
+repository is reachable. The last runs select languages one after the other to
+show that cached (language, year) shards are reused.
+
+Usage:
+    python benchmarks/bench_search.py [--start 2008] [--end 2025] [--repos-per-day 5] [--latency 0.2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', type=int, default=2008)
+    parser.add_argument('--end', type=int, default=2025)
+    parser.add_argument('--repos-per-day', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, repos_per_day=args.repos_per_day)
+    # The benchmark measures sharding, not the real 30 requests/minute search budget
+    server.limits['search'] = server.remaining['search'] = 100000
+    os.environ['GITHUB_API_URL'] = server.base_url
+    os.environ['GITHUB_CACHE_DIR'] = tempfile.mkdtemp()
+    os.environ['GITHUB_HTTP_CACHE'] = 'off'
+
+    import fetch_data
+    import github_client
+
+    years = range(args.start, args.end + 1)
+    requests_before = server.request_count
+    start = time.perf_counter()
+    rows = 0
+    for year in years:
+        params = {"q": f"stars:>0 created:{year}-01-01..{year}-12-31", "sort": "stars", "order": "desc", "per_page": 100}
+        rows += len(github_client.get("search/repositories", params=params).json()['items'])
+        time.sleep(1)
+    elapsed = time.perf_counter() - start
+    print(f"sequential, 1 page per year  wall={elapsed:6.2f}s requests={server.request_count - requests_before:<5} rows={rows}")
+
+    for top_n in (100, 1000, None):
+        requests_before = server.request_count
+        start = time.perf_counter()
+        df = fetch_data.fetch_github_data(start_year=args.start, end_year=args.end, top_n=top_n)
+        elapsed = time.perf_counter() - start
+        print(f"sharded, top_n={str(top_n):<13} wall={elapsed:6.2f}s requests={server.request_count - requests_before:<5} rows={len(df)}")
+
+    # Language-qualified shards: adding a language only fetches that language's years
+    for languages in (["Python"], ["Python", "Go"]):
+        requests_before = server.request_count
+        start = time.perf_counter()
+        df = fetch_data.fetch_github_data(start_year=args.start, end_year=args.end, languages=languages)
+        elapsed = time.perf_counter() - start
+        print(f"languages={','.join(languages):<18} wall={elapsed:6.2f}s requests={server.request_count - requests_before:<5} rows={len(df)}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark for request coalescing (single-flight) in the fetch cache.
+
+Starts ``--callers`` threads that call the same fetcher with the same arguments at
+the same moment, as sessions opening a shared link do, against the mock GitHub
+server, and counts the upstream requests:
+
+- languages of a user: the callers share one fetch, so the requests are those of a
+  single call (one repository list plus one languages request per repository)
+- details of a missing repository: one 404 for all callers, and callers arriving
+  within the negative-cache window get the failure without a request
+
+Usage:
+    python benchmarks/bench_single_flight.py [--callers 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import start_mock_server
+
+
+def burst(server, callers, func, *args):
+    """Calls ``func(*args)`` from ``callers`` threads released together, returns the upstream requests."""
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def call(i):
+        barrier.wait()
+        results[i] = func(*args)
+
+    requests_before = server.request_count
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return server.request_count - requests_before, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--callers', type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_mock_server(repo_count=5, latency=0.2)
+    os.environ.update(GITHUB_API_URL=server.base_url, GITHUB_CACHE_DIR=tempfile.mkdtemp(), GITHUB_HTTP_CACHE='off')
+
+    import fetch_data
+
+    languages = fetch_data.fetch_user_most_used_languages
+    expected = 1 + server.repo_count
+    requests, results = burst(server, args.callers, languages, 'popular-user')
+    print(f"{args.callers} concurrent callers, user languages: {requests} upstream requests "
+          f"(one call makes {expected}), all results equal: {all(r == results[0] for r in results)}")
+
+    details = fetch_data.fetch_repository_details
+    requests, results = burst(server, args.callers, details, 'missing/repository')
+    print(f"{args.callers} concurrent callers, missing repository: {requests} upstream request, "
+          f"results: {set(map(repr, results))}")
+    requests, _ = burst(server, args.callers, details, 'missing/repository')
+    print(f"{args.callers} callers within the negative-cache window: {requests} upstream requests")
+
+    counts = fetch_data.fetch_cache.stats()['functions']
+    for name in ('fetch_user_most_used_languages', 'fetch_repository_details'):
+        print(f"  {name}: {counts[name]}")
+
+
+if __name__ == '__main__':
+    main()
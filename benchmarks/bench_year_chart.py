@@ -0,0 +1,91 @@
+"""
+Benchmark for the per-year bar chart of the Language Trends page.
+
+Reruns the page many times with streamlit's AppTest (as a user moving widgets does)
+and reports the time per rerun and the resident memory before and after. The
+baseline renders the previous chart, a new 16x10 matplotlib figure per rerun that is
+never closed, the same number of times.
+
+Usage:
+    python benchmarks/bench_year_chart.py [--reruns 300]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PAGE = os.path.join('pages', 'Language Trends Dashboard.py')
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1e6
+
+
+def rerun_page(reruns, queue):
+    from streamlit.testing.v1 import AppTest
+
+    from mock_github import start_mock_server
+
+    server = start_mock_server(repos_per_day=1, latency=0)
+    directory = tempfile.mkdtemp()
+    os.environ.update(
+        DATASET_PATH=os.path.join(directory, 'dataset'), GITHUB_CACHE_DIR=directory, GITHUB_API_URL=server.base_url
+    )
+    os.chdir(APP)
+
+    at = AppTest.from_file(PAGE, default_timeout=600)
+    at.run()
+    before, start = rss_mb(), time.perf_counter()
+    for _ in range(reruns):
+        at.run()
+    queue.put((time.perf_counter() - start, before, rss_mb()))
+    server.shutdown()
+
+
+def render_baseline(reruns, queue):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    df = pd.read_csv(os.path.join(APP, '..', 'data', 'processed_data.csv'))
+    counts = df.groupby(['Language', 'Year']).size().reset_index(name='Repo Count')
+    yearly = counts[counts['Year'] == 2020].sort_values('Repo Count')
+
+    before, start = rss_mb(), time.perf_counter()
+    for _ in range(reruns):
+        fig, ax = plt.subplots(figsize=(16, 10), facecolor='none')
+        ax.barh(yearly['Language'], yearly['Repo Count'], color='skyblue')
+        fig.savefig(os.devnull, format='png')
+    queue.put((time.perf_counter() - start, before, rss_mb()))
+
+
+def run(target, reruns):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(reruns, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reruns', type=int, default=300)
+    args = parser.parse_args()
+
+    for name, target in (("previous chart render", render_baseline), ("page rerun", rerun_page)):
+        elapsed, before, after = run(target, args.reruns)
+        print(f"{name:<22} {elapsed / args.reruns * 1000:7.1f}ms each, RSS {before:6.1f}MB -> {after:6.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+"""
+Minimal local stand-in for the GitHub REST API used by the benchmarks.
+
+Routes are served from generated data and every response is delayed by a fixed
+latency, so wall-clock numbers reflect how many round trips are serialized. Every
+response carries ``X-RateLimit-*`` headers, and ``server.failures`` can queue
+rate-limited responses (429, primary or secondary 403) to be served first.
+List endpoints are paginated with ``page`` / ``per_page`` and ``Link: rel=next``
+headers. ``/search/repositories`` generates ``repos_per_day`` repositories for every
+day of its ``created:`` window, honours ``language:`` qualifiers and, like GitHub,
+refuses to page past the first 1000 results. ``/search/issues`` filters the generated issues
+and pull requests by ``repo:``, ``is:`` and ``created:`` qualifiers. ``POST /graphql`` answers the profile and repository queries of the
+GraphQL backend from the same generated data. Successful responses carry an ``ETag`` and answer a matching ``If-None-Match`` with
+a ``304 Not Modified`` that, as on GitHub, does not use up the rate limit.
+
+User, repository, contributor, issue and pull request responses are built from the
+recorded responses in ``fixtures/``; ``contributor_count``, ``issue_count`` and
+``pull_count`` set the length of the repository lists, and ``member_count`` the number
+of members of every organization and team. As on GitHub, the issues list
+also contains the pull requests (with a ``pull_request`` key), and both lists honour
+``state`` (default ``open``) and the issues list ``since``. The commit list honours ``since``
+and ``until``. Every route of the ``missing`` user, and of its repositories (e.g.
+``repos/missing/repository``), answers 404.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+# User (and owner of repositories) that does not exist: every route under it answers 404
+MISSING_OWNER = 'missing'
+
+
+class MockGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        time.sleep(server.latency)
+
+        with server.lock:
+            failure = server.failures.pop(0) if server.failures else None
+        if failure is not None:
+            status, message, headers = failure
+            self._send(status, {"message": message}, headers)
+            return
+
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        parts = parsed.path.strip('/').split('/')
+        base = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+        if parts[0] in ('repos', 'users') and len(parts) >= 2 and parts[1] == MISSING_OWNER:
+            self._send(404, {"message": "Not Found"})
+        elif len(parts) == 3 and parts[0] == 'users' and parts[2] == 'repos':
+            user = parts[1]
+            items = [
+                {
+                    "name": f"repo-{i}",
+                    "full_name": f"{user}/repo-{i}",
+                    "languages_url": f"{base}/repos/{user}/repo-{i}/languages",
+                }
+                for i in range(server.repo_count)
+            ]
+            self._send_page(items, parsed.path, query)
+        elif len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'languages':
+            self._send(200, {"Python": 1000, "Shell": 10})
+        elif parts == ['search', 'repositories']:
+            items = search_repositories(server.repos_per_day, query.get('q', ''))
+            page, per_page = int(query.get('page', 1)), min(int(query.get('per_page', 30)), 100)
+            if page * per_page > 1000:
+                self._send(422, {"message": "Only the first 1000 search results are available"})
+                return
+            start = (page - 1) * per_page
+            headers = {}
+            if start + per_page < min(len(items), 1000):
+                next_query = urlencode({**query, "page": page + 1})
+                headers["Link"] = f'<{base}{parsed.path}?{next_query}>; rel="next"'
+            body = {"total_count": len(items), "incomplete_results": False, "items": items[start:start + per_page]}
+            self._send(200, body, headers)
+        elif len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'commits':
+            commits = generate_commits(server.commit_count, query.get('since'), query.get('until'))
+            self._send_page(commits, parsed.path, query)
+        elif len(parts) == 2 and parts[0] == 'users':
+            self._send(200, fixture('user', login=parts[1]))
+        elif len(parts) == 3 and parts[0] == 'repos':
+            self._send(200, repository(base, f"{parts[1]}/{parts[2]}"))
+        elif parts[0] == 'orgs' and parts[-1] == 'members' and len(parts) in (3, 5):
+            self._send_page(
+                [{"login": f"{parts[1]}-member-{i}"} for i in range(server.member_count)], parsed.path, query
+            )
+        elif len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'contributors':
+            self._send_page(generate_contributors(server.contributor_count), parsed.path, query)
+        elif len(parts) == 4 and parts[0] == 'repos' and parts[3] in ('issues', 'pulls'):
+            full_name = f"{parts[1]}/{parts[2]}"
+            if parts[3] == 'issues':
+                items = generate_issues(base, full_name, server.issue_count, server.pull_count)
+            else:
+                items = generate_pulls(base, full_name, server.pull_count)
+            state = query.get('state', 'open')
+            since = query.get('since')
+            items = [
+                item for item in items
+                if (state == 'all' or item['state'] == state) and (since is None or item['updated_at'] >= since)
+            ]
+            if query.get('direction') == 'asc':
+                items = items[::-1]
+            self._send_page(items, parsed.path, query)
+        elif parts == ['search', 'issues']:
+            items = search_issues(base, server.issue_count, server.pull_count, query.get('q', ''))
+            if query.get('order') == 'asc':
+                items = items[::-1]
+            page, per_page = int(query.get('page', 1)), min(int(query.get('per_page', 30)), 100)
+            start = (page - 1) * per_page
+            self._send(200, {"total_count": len(items), "incomplete_results": False,
+                             "items": items[start:start + per_page]})
+        else:
+            self._send(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            server.graphql_count += 1
+        time.sleep(server.latency)
+
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        query, variables = body.get('query', ''), body.get('variables') or {}
+        self._send(200, {"data": graphql_data(server, query, variables)})
+
+    def _send_page(self, items, path, query):
+        page, per_page = int(query.get('page', 1)), min(int(query.get('per_page', 30)), 100)
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(items):
+            next_query = urlencode({**query, "page": page + 1})
+            base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            headers["Link"] = f'<{base}{path}?{next_query}>; rel="next"'
+        self._send(200, items[start:start + per_page], headers)
+
+    def _send(self, status, body, headers=None):
+        server = self.server
+        resource = 'search' if self.path.startswith('/search/') else 'graphql' if self.path == '/graphql' else 'core'
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.md5(payload).hexdigest()}"'
+
+        not_modified = status == 200 and self.headers.get('If-None-Match') == etag
+        with server.lock:
+            if not_modified:
+                server.not_modified_count += 1
+            else:
+                server.remaining[resource] = max(server.remaining[resource] - 1, 0)
+            remaining = server.remaining[resource]
+
+        if not_modified:
+            status, payload = 304, b''
+
+        all_headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(payload)),
+            "ETag": etag,
+            "X-RateLimit-Resource": resource,
+            "X-RateLimit-Limit": str(server.limits[resource]),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(server.started + 3600)),
+            **(headers or {}),
+        }
+        self.send_response(status)
+        for name, value in all_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@functools.lru_cache(maxsize=8)
+def generate_commits(count, since=None, until=None):
+    """Generates ``count`` commits, one every six hours, newest first, committed between ``since`` and ``until``."""
+    newest = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    commits = []
+    for i in range(count):
+        date = (newest - timedelta(hours=6 * i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        if since is not None and date < since:
+            break
+        if until is not None and date > until:
+            continue
+        commits.append({
+            "sha": f"{i:040x}",
+            "commit": {"author": {"date": date}, "committer": {"date": date}},
+        })
+    return commits
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@functools.lru_cache(maxsize=None)
+def _fixture_text(name):
+    with open(os.path.join(FIXTURES, f"{name}.json")) as f:
+        return f.read()
+
+
+def fixture(fixture_name, /, **values):
+    """Returns the recorded ``fixtures/<fixture_name>.json`` response with its ``{placeholders}`` filled in."""
+    text = _fixture_text(fixture_name)
+    for key, value in values.items():
+        text = text.replace('{' + key + '}', str(value))
+    return json.loads(text)
+
+
+def repository(base, full_name):
+    owner, name = full_name.split('/', 1)
+    return fixture('repository', base=base, full_name=full_name, owner=owner, name=name)
+
+
+@functools.lru_cache(maxsize=16)
+def generate_contributors(count):
+    """Generates ``count`` contributors, most contributions first."""
+    contributors = []
+    for i in range(count):
+        contributor = fixture('contributor', login=f"contributor-{i}")
+        contributor['id'] = 1000 + i
+        contributor['contributions'] = 5000 // (i + 1)
+        contributors.append(contributor)
+    return contributors
+
+
+def _timestamp(i):
+    return (datetime(2025, 6, 1, tzinfo=timezone.utc) - timedelta(hours=5 * i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@functools.lru_cache(maxsize=16)
+def generate_pulls(base, full_name, count):
+    """Generates ``count`` pull requests, newest first; every third one is closed."""
+    owner = full_name.split('/', 1)[0]
+    pulls = []
+    for i in range(count):
+        number = 2 * i + 2
+        pull = fixture('pull', base=base, full_name=full_name, owner=owner, number=number)
+        pull.update(
+            number=number, id=2100000000 + number, title=f"Pull request {number}",
+            state='closed' if i % 3 == 2 else 'open', created_at=_timestamp(2 * i + 1), updated_at=_timestamp(2 * i),
+        )
+        pulls.append(pull)
+    return pulls
+
+
+@functools.lru_cache(maxsize=16)
+def generate_issues(base, full_name, count, pull_count):
+    """
+    Generates ``count`` issues interleaved with the ``pull_count`` pull requests, newest
+    first, as the issues list returns them; every fourth issue is closed.
+    """
+    issues = []
+    for i in range(count):
+        number = 2 * i + 1
+        issue = fixture('issue', base=base, full_name=full_name, number=number)
+        issue.update(
+            number=number, id=2000000000 + number, title=f"Issue {number}",
+            state='closed' if i % 4 == 3 else 'open', created_at=_timestamp(2 * i + 1), updated_at=_timestamp(2 * i),
+        )
+        issues.append(issue)
+    for pull in generate_pulls(base, full_name, pull_count):
+        issue = fixture('issue', base=base, full_name=full_name, number=pull['number'])
+        issue.update(
+            number=pull['number'], id=pull['id'], title=pull['title'], state=pull['state'],
+            created_at=pull['created_at'], updated_at=pull['updated_at'],
+            pull_request={"url": pull['url'], "html_url": pull['html_url'], "merged_at": None},
+        )
+        issues.append(issue)
+    issues.sort(key=lambda issue: issue['created_at'], reverse=True)
+    return issues
+
+
+def search_issues(base, issue_count, pull_count, q):
+    """Issues and pull requests matching the ``repo:``, ``is:`` and ``created:`` qualifiers, newest first."""
+    tokens = q.split()
+    full_name = next(token for token in tokens if token.startswith('repo:'))[len('repo:'):]
+    items = generate_issues(base, full_name, issue_count, pull_count)
+    for token in tokens:
+        if token == 'is:issue':
+            items = [item for item in items if 'pull_request' not in item]
+        elif token == 'is:pr':
+            items = [item for item in items if 'pull_request' in item]
+        elif token in ('is:open', 'is:closed'):
+            items = [item for item in items if item['state'] == token[len('is:'):]]
+        elif token.startswith('created:'):
+            start, end = token[len('created:'):].split('..')
+            items = [item for item in items if start <= item['created_at'][:10] <= end]
+    return items
+
+
+LANGUAGES = ["Python", "JavaScript", "Java", "C#", "C++", "Ruby", "PHP", "Go", "Swift", "TypeScript"]
+
+
+@functools.lru_cache(maxsize=64)
+def search_repositories(repos_per_day, q):
+    """Generates the repositories matching a search query, most starred first."""
+    created = next(token for token in q.split() if token.startswith('created:'))
+    start, end = (date.fromisoformat(part) for part in created[len('created:'):].split('..'))
+    languages = {token[len('language:'):] for token in q.split() if token.startswith('language:')}
+
+    items = []
+    day = start
+    while day <= end:
+        for j in range(repos_per_day):
+            language = LANGUAGES[(day.toordinal() + j) % len(LANGUAGES)]
+            if languages and language not in languages:
+                continue
+            name = f"repo-{day.isoformat()}-{j}"
+            stars = (day.toordinal() * 7919 + j * 104729) % 50000 + 1
+            items.append({
+                "name": name,
+                "full_name": f"owner-{j}/{name}",
+                "owner": {"login": f"owner-{j}", "id": j, "type": "User", "site_admin": False},
+                "html_url": f"https://github.com/owner-{j}/{name}",
+                "stargazers_count": stars,
+                "forks_count": stars // 10,
+                "language": language,
+                "created_at": f"{day.isoformat()}T12:00:00Z",
+                "updated_at": "2025-05-29T00:00:00Z",
+                "license": {"key": "mit", "name": "MIT License"},
+            })
+        day += timedelta(days=1)
+
+    items.sort(key=lambda item: item["stargazers_count"], reverse=True)
+    return items
+
+
+def _connection(nodes, cursor, first):
+    start = int(cursor or 0)
+    end = start + first
+    return {
+        "totalCount": len(nodes),
+        "pageInfo": {"hasNextPage": end < len(nodes), "endCursor": str(end)},
+        "nodes": nodes[start:end],
+    }
+
+
+def graphql_data(server, query, variables):
+    """Answers the GraphQL backend's queries from the same data as the REST routes."""
+    commits = [{"authoredDate": c["commit"]["author"]["date"]} for c in generate_commits(server.commit_count)]
+
+    if MISSING_OWNER in (variables.get('owner'), variables.get('login')):
+        return {"repository" if 'repository(' in query else "user": None}
+
+    if 'repository(' in query:
+        history = _connection(commits, variables.get('cursor'), 100)
+        return {"repository": {"defaultBranchRef": {"target": {"history": history}}}}
+
+    if 'languages(' in query:
+        languages = {"edges": [{"size": 1000, "node": {"name": "Python"}}, {"size": 10, "node": {"name": "Shell"}}]}
+        nodes = [{"name": f"repo-{i}", "languages": languages} for i in range(server.repo_count)]
+        first = 100
+    else:
+        history = _connection(commits, None, 100)
+        nodes = [
+            {"name": f"repo-{i}", "defaultBranchRef": {"target": {"history": history}}}
+            for i in range(server.repo_count)
+        ]
+        first = 50
+
+    return {"user": {"repositories": _connection(nodes, variables.get('cursor'), first)}}
+
+
+def start_mock_server(repo_count=100, latency=0.05, commit_count=250, repos_per_day=5,
+                      contributor_count=100, issue_count=300, pull_count=100, member_count=50):
+    """
+    Starts the mock server on a free local port in a background thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its base URL is ``server.base_url``.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGitHubHandler)
+    server.daemon_threads = True
+    server.repo_count = repo_count
+    server.commit_count = commit_count
+    server.repos_per_day = repos_per_day
+    server.contributor_count = contributor_count
+    server.issue_count = issue_count
+    server.pull_count = pull_count
+    server.member_count = member_count
+    server.latency = latency
+    server.request_count = 0
+    server.graphql_count = 0
+    server.not_modified_count = 0
+    server.failures = []
+    server.limits = {'core': 5000, 'search': 30, 'graphql': 5000}
+    server.remaining = dict(server.limits)
+    server.started = time.time()
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,195 @@
+"""
+Benchmark suite: every fetcher and the repository preprocessing at several data sizes.
+
+Runs against the mock GitHub server (mock_github.py), which serves the recorded
+fixtures with injected latency, pagination and rate-limit headers. The fetchers are
+called without the fetch cache, and the HTTP cache and commit store are turned off,
+so every run does the full work. Each scenario is run once for the wall time and
+upstream request count, then once more under tracemalloc for the peak memory.
+
+The results are written as JSON (progress goes to stderr); ``--compare`` prints the
+change against an earlier results file.
+
+Usage:
+    python benchmarks/run_suite.py [--sizes small medium large] [--scenarios NAME ...]
+                                   [--latency 0.02] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from mock_github import search_repositories, start_mock_server
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Mock server data per size; ``rows`` is the row count of the preprocessing scenarios
+SIZES = {
+    'small': dict(repo_count=10, commit_count=300, contributor_count=50, issue_count=100, pull_count=50,
+                  repos_per_day=1, rows=1_000),
+    'medium': dict(repo_count=30, commit_count=1_000, contributor_count=300, issue_count=1_000, pull_count=300,
+                   repos_per_day=5, rows=10_000),
+    'large': dict(repo_count=50, commit_count=3_000, contributor_count=1_000, issue_count=5_000, pull_count=1_000,
+                  repos_per_day=20, rows=100_000),
+}
+
+REPO = 'bench-owner/bench-repo'
+USER = 'bench-user'
+
+
+def raw_repositories(rows):
+    """Builds a raw repository frame of about ``rows`` rows, as fetch_repositories_for_year returns."""
+    from data_preprocess import normalize_repositories
+    from records import Repository, project
+
+    per_day = max(rows // 365, 1)
+    items = search_repositories(per_day, "stars:>0 created:2020-01-01..2020-12-31")[:rows]
+    return normalize_repositories(project(items, Repository), 2020)
+
+
+def scenarios(server):
+    """Returns ``{name: function(size) -> callable}``, the callable running the scenario once."""
+    import data_preprocess
+    import fetch_data
+
+    def uncached(fetcher):
+        # The fetch cache wrapper keeps the undecorated fetcher as __wrapped__
+        return fetcher.__wrapped__
+
+    def preprocess(size):
+        df = raw_repositories(SIZES[size]['rows'])
+        return lambda: data_preprocess.preprocess_data(df)
+
+    def count_per_language(size):
+        df = data_preprocess.preprocess_data(raw_repositories(SIZES[size]['rows']))
+        return lambda: data_preprocess.repo_counts_per_language_per_year(df)
+
+    return {
+        'fetch_user_data': lambda size: lambda: uncached(fetch_data.fetch_user_data)(USER),
+        'fetch_user_most_used_languages':
+            lambda size: lambda: uncached(fetch_data.fetch_user_most_used_languages)(USER),
+        'fetch_commit_activity': lambda size: lambda: uncached(fetch_data.fetch_commit_activity)(USER),
+        'fetch_repository_details': lambda size: lambda: uncached(fetch_data.fetch_repository_details)(REPO),
+        'fetch_repository_contributions': lambda size: lambda: uncached(fetch_data.fetch_repository_contributions)(
+            f"{server.base_url}/repos/{REPO}/contributors"),
+        'fetch_repository_issues': lambda size: lambda: uncached(fetch_data.fetch_repository_issues_pulls)(
+            REPO, 'issues'),
+        'fetch_repository_pulls': lambda size: lambda: uncached(fetch_data.fetch_repository_issues_pulls)(
+            REPO, 'pulls'),
+        'fetch_open_issue_counts': lambda size: lambda: uncached(fetch_data.fetch_open_item_counts)(REPO, 'issues'),
+        'fetch_open_pull_counts': lambda size: lambda: uncached(fetch_data.fetch_open_item_counts)(REPO, 'pulls'),
+        'total_commits_over_time': lambda size: lambda: uncached(fetch_data.total_commits_over_time)(REPO),
+        'fetch_repositories_for_year': lambda size: lambda: uncached(fetch_data.fetch_repositories_for_year)(
+            2020, 'Python', 1000),
+        'preprocess_data': preprocess,
+        'repo_counts_per_language_per_year': count_per_language,
+    }
+
+
+def measure(server, run):
+    requests_before = server.request_count
+    start = time.perf_counter()
+    run()
+    wall = time.perf_counter() - start
+    requests = server.request_count - requests_before
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'requests': requests, 'wall_s': round(wall, 4), 'peak_mb': round(peak / 1e6, 3)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['scenario'], r['size']): r for r in json.load(f)['results']}
+    print(f"{'scenario':<34} {'size':<7} {'wall':>16} {'requests':>14} {'peak MB':>16}", file=sys.stderr)
+    for result in results:
+        old = baseline.get((result['scenario'], result['size']))
+        if old is None:
+            continue
+        wall = f"{old['wall_s']:.3f}->{result['wall_s']:.3f}s"
+        requests = f"{old['requests']}->{result['requests']}"
+        peak = f"{old['peak_mb']:.1f}->{result['peak_mb']:.1f}"
+        print(f"{result['scenario']:<34} {result['size']:<7} {wall:>16} {requests:>14} {peak:>16}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--scenarios', nargs='+', help="Scenario names to run (default: all)")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds added to every mock response")
+    parser.add_argument('--output', help="Write the JSON results to this file instead of stdout")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency)
+    # A budget the suite cannot run out of, the headers are still sent
+    server.limits = {resource: 10 ** 9 for resource in server.limits}
+    server.remaining = dict(server.limits)
+    os.environ.update(
+        GITHUB_API_URL=server.base_url,
+        GITHUB_CACHE_DIR=tempfile.mkdtemp(),
+        GITHUB_HTTP_CACHE='off',
+        GITHUB_COMMIT_STORE='off',
+        GITHUB_DATA_STORE='off',
+        GITHUB_BACKEND='rest',
+    )
+
+    available = scenarios(server)
+    names = args.scenarios or list(available)
+    unknown = set(names) - set(available)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = []
+    for size in args.sizes:
+        for key, value in SIZES[size].items():
+            if key != 'rows':
+                setattr(server, key, value)
+        for name in names:
+            result = {'scenario': name, 'size': size, **measure(server, available[name](size))}
+            print(f"{name:<34} {size:<7} {result['wall_s']:8.3f}s {result['requests']:6d} requests "
+                  f"{result['peak_mb']:8.1f}MB", file=sys.stderr)
+            results.append(result)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'latency_s': args.latency,
+            'sizes': {size: SIZES[size] for size in args.sizes},
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
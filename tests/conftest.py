@@ -0,0 +1,58 @@
+"""
+Shared fixtures: the mock GitHub server of the benchmarks and the app modules
+configured against it.
+
+The app modules read their configuration from the environment when they are first
+imported, so the server is started and the environment set when this file is loaded,
+before any test module imports them; every test of the session then talks to the
+same server.
+"""
+import importlib
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from mock_github import start_mock_server  # noqa: E402
+
+mock_server = start_mock_server(repo_count=5, latency=0.01, commit_count=50)
+# A budget the suite cannot run out of, the headers are still sent
+mock_server.limits = {resource: 10 ** 9 for resource in mock_server.limits}
+mock_server.remaining = dict(mock_server.limits)
+os.environ.update(
+    GITHUB_API_URL=mock_server.base_url, GITHUB_CACHE_DIR=tempfile.mkdtemp(), GITHUB_HTTP_CACHE='off',
+    GITHUB_DATA_STORE='off', GITHUB_COMMIT_STORE='off', GITHUB_BACKEND='rest', PAT_TOKEN='mock-token',
+    DATASET_PATH=tempfile.mkdtemp(),
+)
+
+
+@pytest.fixture(scope='session')
+def server():
+    yield mock_server
+    mock_server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_server(request):
+    """Clears queued failures between tests that use the server."""
+    if 'server' in request.fixturenames:
+        server = request.getfixturevalue('server')
+        server.failures = []
+
+
+@pytest.fixture
+def github_client(server):
+    return importlib.import_module('github_client')
+
+
+
+@pytest.fixture
+def fetch_data(server):
+    module = importlib.import_module('fetch_data')
+    module.fetch_cache.clear()
+    return module
@@ -0,0 +1,83 @@
+"""Incremental, resumable commit-history syncs against the mock server."""
+import threading
+
+import pytest
+
+from commit_store import CommitStore
+
+REPO = 'owner/repo'
+
+
+@pytest.fixture
+def fetch_pages(github_client):
+    def fetch_pages(since, until):
+        params = {"until": until} if until is not None else None
+        return github_client.iter_pages(f"repos/{REPO}/commits", params=params, since=since, per_page=10)
+    return fetch_pages
+
+
+def stored_commits(store):
+    return sum(count for _, count in store.daily_counts(REPO))
+
+
+def test_sync_is_incremental(server, tmp_path, fetch_pages):
+    store = CommitStore(str(tmp_path / 'commits.sqlite'))
+    assert store.sync(REPO, fetch_pages) == server.commit_count
+
+    requests_before = server.request_count
+    assert store.sync(REPO, fetch_pages) == 0
+    assert server.request_count - requests_before == 1
+    assert stored_commits(store) == server.commit_count
+
+
+def test_capped_sync_is_completed_by_the_next_one(server, tmp_path, fetch_pages):
+    store = CommitStore(str(tmp_path / 'commits.sqlite'))
+    assert store.sync(REPO, fetch_pages, max_items=15) == 15
+    assert stored_commits(store) == 15
+    assert store.state(REPO).watermark is None
+
+    assert store.sync(REPO, fetch_pages, max_items=15) == 15
+    assert store.sync(REPO, fetch_pages) == server.commit_count - 30
+    assert stored_commits(store) == server.commit_count
+    assert store.state(REPO).cursor is None
+
+
+def test_failed_sync_keeps_the_pages_read(server, tmp_path, fetch_pages):
+    store = CommitStore(str(tmp_path / 'commits.sqlite'))
+
+    def failing_pages(since, until):
+        for i, page in enumerate(fetch_pages(since, until)):
+            if i == 2:
+                raise RuntimeError("rate limited")
+            yield page
+
+    with pytest.raises(RuntimeError):
+        store.sync(REPO, failing_pages)
+    assert stored_commits(store) == 20
+
+    requests_before = server.request_count
+    store.sync(REPO, fetch_pages)
+    assert stored_commits(store) == server.commit_count
+    # The resumed sync reads the pages from the cursor (inclusive) down, then checks for newer commits
+    remaining = server.commit_count - 20 + 1
+    assert server.request_count - requests_before == -(-remaining // 10) + 1
+
+
+@pytest.mark.parametrize('shared_connection', [True, False], ids=['one process', 'two processes'])
+def test_overlapping_syncs_count_every_commit_once(server, tmp_path, fetch_pages, shared_connection):
+    path = str(tmp_path / 'commits.sqlite')
+    stores = [CommitStore(path)] * 2 if shared_connection else [CommitStore(path), CommitStore(path)]
+    barrier = threading.Barrier(len(stores))
+
+    def sync(store, max_items):
+        barrier.wait()
+        store.sync(REPO, fetch_pages, max_items=max_items)
+
+    threads = [threading.Thread(target=sync, args=args) for args in zip(stores, (None, 5000))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stores[0].sync(REPO, fetch_pages)
+    assert stored_commits(stores[0]) == server.commit_count
@@ -0,0 +1,45 @@
+"""Shared data store: keys of older releases are not read, and old entries are pruned."""
+import time
+
+import data_store
+from data_store import DataStore
+
+
+def contributors(repo, limit=10):
+    return [{'login': 'octocat', 'contributions': 3}]
+
+
+def test_entries_of_an_older_schema_are_not_read(tmp_path, monkeypatch):
+    store = DataStore(str(tmp_path / 'store.sqlite'))
+    monkeypatch.setattr(data_store, 'SCHEMA_VERSION', data_store.SCHEMA_VERSION - 1)
+    store.put(DataStore.key(contributors, ('octocat/hello',), {}), contributors('octocat/hello'))
+    monkeypatch.undo()
+
+    assert store.get(DataStore.key(contributors, ('octocat/hello',), {})) is None
+
+
+def test_keys_do_not_depend_on_how_arguments_are_passed():
+    assert DataStore.key(contributors, ('octocat/hello',), {}) == \
+        DataStore.key(contributors, (), {'repo': 'octocat/hello', 'limit': 10})
+
+
+def test_old_entries_are_pruned(tmp_path):
+    store = DataStore(str(tmp_path / 'store.sqlite'), max_age=60)
+    store.put('old', 1)
+    store._conn.execute("UPDATE entries SET updated_at = ?", (time.time() - 120,))
+    store.put('new', 2)
+
+    store.prune()
+
+    assert store.get('old', max_age=10 ** 9) is None
+    assert store.get('new')[0] == 2
+    assert store.pruned == 1
+
+
+def test_oldest_entries_above_max_entries_are_pruned_on_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_store, 'PRUNE_EVERY', 10)
+    store = DataStore(str(tmp_path / 'store.sqlite'), max_entries=5)
+    for i in range(10):
+        store.put(f"user-{i}", i)
+
+    assert [store.get(f"user-{i}") is not None for i in range(10)] == [False] * 5 + [True] * 5
@@ -0,0 +1,67 @@
+"""Fetchers against the mock server: failed or partial fetches must not look like complete results."""
+import pytest
+
+from commit_store import CommitStore
+
+
+@pytest.fixture
+def failing(github_client, monkeypatch):
+    """Makes the requests whose URL contains one of the given strings answer ``status``."""
+    def fail(status, *fragments):
+        get = github_client.get
+
+        def failing_get(path, params=None):
+            if any(fragment in path for fragment in fragments):
+                return github_client.GitHubResponse(status, text="Failed")
+            return get(path, params)
+
+        monkeypatch.setattr(github_client, 'get', failing_get)
+    return fail
+
+
+def test_languages(server, fetch_data):
+    languages = fetch_data.fetch_user_most_used_languages.__wrapped__('octocat')
+    assert languages and all(size > 0 for size in languages.values())
+
+
+@pytest.mark.parametrize('status', [429, 502, 0])
+def test_languages_fail_when_one_repository_fails(server, fetch_data, failing, status):
+    failing(status, 'repo-1/languages')
+    assert fetch_data.fetch_user_most_used_languages.__wrapped__('octocat') is None
+
+
+def test_commit_activity_fails_when_one_repository_fails(server, fetch_data, failing):
+    failing(502, 'repo-1/commits')
+    assert fetch_data.fetch_commit_activity.__wrapped__('octocat') is None
+
+
+def test_commit_activity_counts_empty_repositories_as_no_commits(server, fetch_data, failing):
+    failing(fetch_data.EMPTY_REPOSITORY, 'repo-1/commits')
+    by_repo, by_month = fetch_data.fetch_commit_activity.__wrapped__('octocat')
+
+    assert 'repo-1' not in by_repo
+    assert sum(by_repo.values()) == (server.repo_count - 1) * server.commit_count
+    assert sum(by_month.values()) == sum(by_repo.values())
+
+
+def test_partial_commit_history_is_not_cached(server, fetch_data, tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch_data, 'commit_store', CommitStore(str(tmp_path / 'commits.sqlite')))
+    monkeypatch.setattr(fetch_data, 'COMMIT_FETCH_LIMIT', 20)
+    commits_over_time = fetch_data.total_commits_over_time.memoized
+
+    views = []
+    for _ in range(3):
+        df = commits_over_time('octocat/hello')
+        views.append((int(df['commits'].sum()), fetch_data.commit_history_pending('octocat/hello')))
+    assert views == [(20, True), (40, True), (server.commit_count, False)]
+
+    # The complete history is cached
+    requests_before = server.request_count
+    assert commits_over_time('octocat/hello')['commits'].sum() == server.commit_count
+    assert server.request_count == requests_before
+
+
+def test_commit_history_is_not_capped_without_the_store(server, fetch_data, monkeypatch):
+    monkeypatch.setattr(fetch_data, 'COMMIT_FETCH_LIMIT', 20)
+    df = fetch_data.total_commits_over_time.__wrapped__('octocat/hello')
+    assert df['commits'].sum() == server.commit_count
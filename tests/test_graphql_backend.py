@@ -0,0 +1,98 @@
+"""
+GraphQL backend against recorded responses, and against the REST path on the mock server.
+
+``fixtures/graphql_octocat.json`` holds GraphQL responses recorded per query and
+variables, with the cases the REST path handles differently: paginated repositories
+and histories, an empty repository (no default branch), an unknown repository and
+an unknown user.
+"""
+import json
+import os
+from datetime import date
+
+import pytest
+
+import graphql_backend
+from github_client import GitHubError
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def recorded(github_client, monkeypatch):
+    """Answers the backend's queries from the recorded responses, returns the queries sent."""
+    with open(os.path.join(FIXTURES, 'graphql_octocat.json')) as f:
+        responses = json.load(f)
+    queries = {name: getattr(graphql_backend, name) for name in {response['query'] for response in responses}}
+    sent = []
+
+    def graphql(query, variables=None):
+        for response in responses:
+            if queries[response['query']] == query and response['variables'] == variables:
+                sent.append((response['query'], variables))
+                return response['data']
+        raise AssertionError(f"No recorded response for {variables}")
+
+    monkeypatch.setattr(github_client, 'graphql', graphql)
+    return sent
+
+
+def test_user_most_used_languages(recorded):
+    assert graphql_backend.user_most_used_languages('octocat') == {'Python': 1334, 'Shell': 56, 'HTML': 789}
+    assert len(recorded) == 1
+
+
+def test_commit_activity(recorded):
+    by_repo, by_month = graphql_backend.commit_activity('octocat')
+
+    assert by_repo == {'Hello-World': 3, 'Spoon-Knife': 1}
+    assert by_month == {'2023-11': 1, '2024-02': 1, '2024-03': 2}
+    # Two pages of repositories, and one follow-up page for the only truncated history
+    assert [query for query, _ in recorded].count('REPOSITORY_HISTORY_QUERY') == 1
+    assert len(recorded) == 3
+
+
+def test_commit_activity_of_unknown_user(recorded):
+    with pytest.raises(GitHubError) as error:
+        graphql_backend.commit_activity('ghost-user')
+    assert error.value.status_code == 404
+
+
+def test_commits_over_time(recorded):
+    df = graphql_backend.commits_over_time('octocat/Hello-World')
+
+    assert list(df.columns) == ['day', 'commits']
+    assert list(zip(df['day'], df['commits'])) == [(date(2024, 2, 26), 1), (date(2024, 3, 6), 2)]
+
+
+def test_commits_over_time_of_empty_repository(recorded):
+    df = graphql_backend.commits_over_time('octocat/empty-repo')
+
+    assert list(df.columns) == ['day', 'commits']
+    assert df.empty
+
+
+def test_commits_over_time_of_unknown_repository(recorded):
+    with pytest.raises(GitHubError) as error:
+        graphql_backend.commits_over_time('octocat/missing-repo')
+    assert error.value.status_code == 404
+
+
+@pytest.mark.parametrize('fetcher', ['fetch_user_most_used_languages', 'fetch_commit_activity'])
+def test_backends_return_the_same_results(server, fetch_data, fetcher):
+    fetch = getattr(fetch_data, fetcher).__wrapped__
+    results, requests = {}, {}
+    for backend in ('rest', 'graphql'):
+        requests_before = server.request_count
+        results[backend] = fetch('octocat', backend=backend)
+        requests[backend] = server.request_count - requests_before
+
+    assert results['rest'] == results['graphql']
+    assert requests['graphql'] < requests['rest']
+
+
+@pytest.mark.parametrize('fetcher', ['fetch_user_most_used_languages', 'fetch_commit_activity'])
+def test_backends_fail_alike_for_unknown_users(server, fetch_data, fetcher):
+    fetch = getattr(fetch_data, fetcher).__wrapped__
+    assert fetch('missing', backend='rest') is None
+    assert fetch('missing', backend='graphql') is None
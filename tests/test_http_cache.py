@@ -0,0 +1,41 @@
+"""Pruning of the on-disk response cache."""
+import time
+
+import http_cache
+from http_cache import ResponseCache
+
+HEADERS = {'ETag': '"etag"'}
+
+
+def test_old_responses_are_pruned(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'http.sqlite'), max_age=60)
+    cache.store('old', '[]', HEADERS)
+    cache._conn.execute("UPDATE responses SET stored_at = ?", (time.time() - 120,))
+    cache.store('new', '[]', HEADERS)
+
+    cache.prune()
+
+    assert cache.lookup('old') is None
+    assert cache.lookup('new') is not None
+    assert cache.stats()['pruned'] == 1
+
+
+def test_oldest_responses_above_max_entries_are_pruned_on_insert(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, 'PRUNE_EVERY', 10)
+    cache = ResponseCache(str(tmp_path / 'http.sqlite'), max_entries=5)
+    for i in range(10):
+        cache.store(f"page-{i}", '[]', HEADERS)
+
+    assert cache.stats()['entries'] == 5
+    assert [cache.lookup(f"page-{i}") is not None for i in range(10)] == [False] * 5 + [True] * 5
+
+
+def test_revalidated_responses_are_kept(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'http.sqlite'), max_age=60)
+    cache.store('page', '[]', HEADERS)
+    cache._conn.execute("UPDATE responses SET stored_at = ?", (time.time() - 120,))
+    cache.touch('page')
+
+    cache.prune()
+
+    assert cache.lookup('page') is not None
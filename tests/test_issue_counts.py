@@ -0,0 +1,36 @@
+"""Open issue and pull request counts: listing is only chosen when the list endpoint is small."""
+import pytest
+
+import issue_counts
+
+
+@pytest.fixture
+def listed(github_client, monkeypatch):
+    """Records the paths listed through iter_pages."""
+    paths = []
+    iter_pages = github_client.iter_pages
+
+    def recording_iter_pages(path, params=None, **kwargs):
+        paths.append(path)
+        return iter_pages(path, params=params, **kwargs)
+
+    monkeypatch.setattr(github_client, 'iter_pages', recording_iter_pages)
+    return paths
+
+
+# Open items of the mock repository: every fourth issue and every third pull request is closed
+OPEN = {'issues': 225, 'pulls': 67}
+
+
+@pytest.mark.parametrize('type, list_limit, lists', [
+    # The issues list also returns the open pull requests
+    ('issues', OPEN['issues'], False),
+    ('issues', OPEN['issues'] + OPEN['pulls'], True),
+    ('pulls', OPEN['pulls'], True),
+    ('pulls', OPEN['pulls'] - 1, False),
+])
+def test_lists_only_what_fits_the_list_limit(listed, type, list_limit, lists):
+    counts = issue_counts.open_item_counts('octocat/hello', type, list_limit=list_limit)
+
+    assert listed == ([f"repos/octocat/hello/{type}"] if lists else [])
+    assert sum(count for _, count in counts) == OPEN[type]
@@ -0,0 +1,25 @@
+"""Organization batch mode: which users are ranked and where their summaries run."""
+import org_batch
+
+
+def test_failed_users_are_not_ranked():
+    activity = ({'repo': 3}, {'2025-01': 3})
+    users = [('alice', {'Python': 10}, activity), ('bob', None, activity), ('carol', {'Go': 5}, None)]
+
+    results = org_batch.summarize(users, processes=1)
+
+    assert results['leaderboard']['Login'].tolist() == ['alice']
+    assert results['failed']['Login'].tolist() == ['bob', 'carol']
+
+
+def test_summarize_runs_inline_below_the_pool_threshold(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("the process pool was started")
+
+    monkeypatch.setattr(org_batch, 'ProcessPoolExecutor', no_pool)
+    activity = ({'repo': 1}, {'2025-01': 1})
+    users = [(f"user-{i}", {'Python': i + 1}, activity) for i in range(3 * org_batch.AGGREGATE_CHUNK_SIZE)]
+
+    results = org_batch.summarize(users)
+
+    assert len(results['leaderboard']) == len(users)
@@ -0,0 +1,56 @@
+"""Concurrent writes to the Parquet dataset and its language x year cube."""
+import threading
+
+import pandas as pd
+import pytest
+
+import parquet_store
+
+LANGUAGES = ['Python', 'Go', 'Rust', 'C++']
+
+
+def processed_rows(language, year, count=5):
+    """Rows shaped like the output of data_preprocess.preprocess_data."""
+    created = pd.Timestamp(f"{year}-06-01", tz='UTC')
+    return pd.DataFrame({
+        'Repository Name': [f"{language}-{i}" for i in range(count)],
+        'Stars': range(1, count + 1),
+        'Forks': range(count),
+        'Repository URL': [f"https://github.com/o/{language}-{i}" for i in range(count)],
+        'Created At': created,
+        'Updated At': created,
+        'Repo age days': 100,
+        'Repo age years': 0.3,
+        'Star Growth Rate': 1.0,
+        'Fork Growth Rate': 0.5,
+        'Activity Score': 2.0,
+        'Year': year,
+        'Language': language,
+    })
+
+
+@pytest.mark.parametrize('trial', range(5))
+def test_concurrent_writers_keep_every_cube_cell(tmp_path, trial):
+    path = str(tmp_path)
+    parquet_store.write_dataset(processed_rows('JavaScript', 2020), path)
+    barrier = threading.Barrier(len(LANGUAGES))
+    errors = []
+
+    def write(language):
+        barrier.wait()
+        try:
+            parquet_store.write_dataset(processed_rows(language, 2020), path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(language,)) for language in LANGUAGES]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    cube = parquet_store.load_cube(path)
+    assert sorted(cube['Language']) == sorted(LANGUAGES + ['JavaScript'])
+    assert cube['Repo Count'].tolist() == [5] * 5
+    assert not [name for name in tmp_path.iterdir() if name.suffix == '.tmp']
@@ -0,0 +1,91 @@
+"""Rate-limit handling of github_client against 429 and 403 responses of the mock server."""
+import time
+
+import pytest
+
+from rate_limit import RateLimiter
+
+RETRY_AFTER = {"Retry-After": "1"}
+SECONDARY = (403, "You have exceeded a secondary rate limit.", RETRY_AFTER)
+
+
+def primary(reset_in):
+    return (403, "API rate limit exceeded",
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time() + reset_in))})
+
+
+@pytest.fixture
+def limiter(github_client, monkeypatch):
+    """A fresh scheduler per test, so a back-off does not leak into the next one."""
+    limiter = RateLimiter(authenticated=True, max_wait=10)
+    monkeypatch.setattr(github_client, 'rate_limiter', limiter)
+    return limiter
+
+
+@pytest.mark.parametrize('failure', [
+    lambda: (429, "Too Many Requests", RETRY_AFTER),
+    lambda: SECONDARY,
+    lambda: primary(1),
+], ids=['429', 'secondary 403', 'primary 403'])
+def test_rate_limited_response_is_retried(server, github_client, limiter, failure):
+    server.failures = [failure()]
+    requests_before = server.request_count
+    start = time.perf_counter()
+
+    response = github_client.get("users/test/repos")
+
+    assert response.status_code == 200
+    assert len(response.json()) == server.repo_count
+    assert server.request_count - requests_before == 2
+    assert limiter.retries == 1
+    # Retry-After, or the reset of the primary limit, is waited out before the retry
+    assert time.perf_counter() - start >= 0.9
+
+
+def test_consecutive_rate_limits_are_retried(server, github_client, limiter):
+    server.failures = [(429, "Too Many Requests", RETRY_AFTER), SECONDARY]
+    requests_before = server.request_count
+
+    response = github_client.get("users/test/repos")
+
+    assert response.status_code == 200
+    assert server.request_count - requests_before == 3
+    assert limiter.retries == 2
+
+
+def test_retries_are_bounded(server, github_client, limiter, monkeypatch):
+    monkeypatch.setattr(github_client, 'MAX_RETRIES', 1)
+    server.failures = [SECONDARY, SECONDARY, SECONDARY]
+    requests_before = server.request_count
+
+    response = github_client.get("users/test/repos")
+
+    assert response.status_code == 403
+    assert server.request_count - requests_before == 2
+
+
+def test_exhausted_budget_is_not_sent(server, github_client, limiter):
+    server.failures = [primary(3600)]
+    requests_before = server.request_count
+
+    first = github_client.get("users/test/repos")
+    second = github_client.get("users/test/repos")
+
+    # The first response blocks the core budget for an hour, longer than max_wait
+    assert first.status_code == 429
+    assert second.status_code == 429
+    assert server.request_count - requests_before == 1
+    budget = github_client.rate_limit_budget()['core']
+    assert budget['remaining'] == 0
+    assert budget['blocked_for'] > 3000
+
+
+def test_budgets_are_tracked_per_resource(server, github_client, limiter):
+    github_client.get("users/test/repos")
+    github_client.get("search/repositories", params={"q": "created:2024-01-01..2024-01-01"})
+
+    resources = github_client.rate_limit_budget()
+    assert resources['core']['limit'] == server.limits['core']
+    assert resources['search']['limit'] == server.limits['search']
+    assert resources['core']['remaining'] == server.remaining['core']
+    assert resources['search']['remaining'] == server.remaining['search']
@@ -0,0 +1,15 @@
+"""Refresher jobs against the mock server."""
+import parquet_store
+import refresher
+
+
+def test_language_trends_job_writes_partitions(server, fetch_data):
+    assert parquet_store.missing_partitions((2020, 2020), ['Python']) == [('Python', 2020)]
+
+    refresher.refresh_language_year('Python', 2020, 10)
+
+    assert parquet_store.missing_partitions((2020, 2020), ['Python']) == []
+    rows = parquet_store.load_dataset(years=(2020, 2020), languages=['Python'])
+    assert len(rows) == 10
+    cube = parquet_store.load_cube(years=(2020, 2020), languages=['Python'])
+    assert cube['Repo Count'].tolist() == [10]
@@ -0,0 +1,84 @@
+"""Request coalescing and the negative cache of the fetch cache, counted on the mock server."""
+import time
+
+from bench_single_flight import burst
+from fetch_cache import FetchCache
+
+CALLERS = 20
+
+
+def test_concurrent_callers_share_one_fetch(server, fetch_data):
+    languages = fetch_data.fetch_user_most_used_languages.memoized
+
+    requests, results = burst(server, CALLERS, languages, 'popular-user')
+
+    # One repository list, then one languages request per repository
+    assert requests == 1 + server.repo_count
+    assert all(result == results[0] for result in results)
+    counts = fetch_data.fetch_cache.stats()['functions']['fetch_user_most_used_languages']
+    assert counts['misses'] == 1
+    # A caller released after the fetch landed is served from memory instead
+    assert counts['coalesced'] + counts['hits'] == CALLERS - 1
+
+
+def test_callers_get_their_own_copy(server, fetch_data):
+    languages = fetch_data.fetch_user_most_used_languages.memoized
+
+    _, results = burst(server, CALLERS, languages, 'copied-user')
+
+    results[0]['Python'] = -1
+    assert results[1]['Python'] != -1
+
+
+def test_failure_is_shared_and_remembered(server, fetch_data):
+    details = fetch_data.fetch_repository_details.memoized
+
+    requests, results = burst(server, CALLERS, details, 'missing/repository')
+    assert requests == 1
+    assert results == [None] * CALLERS
+
+    # Callers arriving within the negative-cache window get the failure without a request
+    requests, results = burst(server, CALLERS, details, 'missing/repository')
+    assert requests == 0
+    assert results == [None] * CALLERS
+    counts = fetch_data.fetch_cache.stats()['functions']['fetch_repository_details']
+    assert counts['negative_hits'] == CALLERS
+
+
+def test_failure_is_retried_after_the_negative_cache_window(server, fetch_data, monkeypatch):
+    monkeypatch.setattr(fetch_data.fetch_cache, 'negative_ttl', 0.1)
+    details = fetch_data.fetch_repository_details.memoized
+
+    assert burst(server, CALLERS, details, 'missing/other')[0] == 1
+    time.sleep(0.2)
+    assert burst(server, CALLERS, details, 'missing/other')[0] == 1
+
+
+def test_success_is_served_from_memory(server, fetch_data):
+    details = fetch_data.fetch_repository_details.memoized
+
+    assert burst(server, CALLERS, details, 'octocat/hello')[0] == 1
+    assert burst(server, CALLERS, details, 'octocat/hello')[0] == 0
+
+
+def test_caller_missing_memory_just_before_a_flight_lands_does_not_fetch_again(monkeypatch):
+    cache = FetchCache(max_bytes=10 ** 6)
+    calls = []
+
+    @cache.memoize(ttl=60)
+    def fetch(name):
+        calls.append(name)
+        return {'name': name}
+
+    fetch('octocat')
+    # The lookup before the lock misses, as if it ran just before the first flight landed
+    get, lookups = cache.memory.get, []
+
+    def late_get(key, max_age):
+        lookups.append(key)
+        return None if len(lookups) == 1 else get(key, max_age)
+
+    monkeypatch.setattr(cache.memory, 'get', late_get)
+
+    assert fetch('octocat') == {'name': 'octocat'}
+    assert calls == ['octocat']